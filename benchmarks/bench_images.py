@@ -0,0 +1,94 @@
+"""Per-image cost of trimming and dimension probing, before and after.
+
+    python benchmarks/bench_images.py [IMAGE ...] [--repeat N]
+
+Without arguments a few synthetic slide pictures are generated. "before"
+replays the previous steps: a white trim and a corner trim, each padding the
+image by a pixel, and a full Wand decode to read a converted PNG's size.
+"after" is the current ``trim_border`` and ``probe_size``. Requires
+ImageMagick.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from wand.color import Color  # noqa: E402
+from wand.image import Image as WandImage  # noqa: E402
+
+from ppt_to_web.images import probe_size, trim_border  # noqa: E402
+
+
+def _synthetic_images(directory: Path) -> list[Path]:
+    """A photo-like and a line-art picture, each with a white margin."""
+    paths = []
+    for name, source, size in (
+        ("photo.jpg", "plasma:", (1600, 1200)),
+        ("diagram.png", "gradient:#1f4e79-#ffffff", (1200, 800)),
+    ):
+        with WandImage(filename=source, width=size[0], height=size[1]) as img:
+            img.border(Color("white"), 80, 60)
+            img.save(filename=str(directory / name))
+        paths.append(directory / name)
+    return paths
+
+
+def _trim_before(blob: bytes) -> None:
+    with WandImage(blob=blob) as img:
+        img.trim(color=Color("white"), fuzz=0)
+        img.trim(fuzz=0)
+
+
+def _trim_after(blob: bytes) -> None:
+    with WandImage(blob=blob) as img:
+        trim_border(img)
+
+
+def _size_before(path: Path) -> None:
+    with WandImage(filename=str(path)) as img:
+        img.width, img.height
+
+
+def _size_after(path: Path) -> None:
+    probe_size(path)
+
+
+def _time_ms(func, arg, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.images or _synthetic_images(Path(tmp))
+        print(f"{'image':<24}{'step':<8}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for path in paths:
+            blob = path.read_bytes()
+            for step, before, after, arg in (
+                ("trim", _trim_before, _trim_after, blob),
+                ("size", _size_before, _size_after, path),
+            ):
+                old = _time_ms(before, arg, args.repeat)
+                new = _time_ms(after, arg, args.repeat)
+                print(
+                    f"{path.name:<24}{step:<8}{old:>12.2f}{new:>12.3f}"
+                    f"{old / new if new else float('inf'):>9.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
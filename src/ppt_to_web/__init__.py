@@ -1,5 +1,13 @@
-from .ppt_to_yaml import ppt_to_yaml
-from .yaml_to_html import yaml_to_html
+from .pipeline import ppt_to_html
+from .ppt_to_yaml import extract_deck, iter_slides, ppt_to_yaml
+from .yaml_to_html import render_deck, yaml_to_html
 
 __version__ = "0.1.1"
-__all__ = ["ppt_to_yaml", "yaml_to_html"]
+__all__ = [
+    "extract_deck",
+    "iter_slides",
+    "ppt_to_html",
+    "ppt_to_yaml",
+    "render_deck",
+    "yaml_to_html",
+]
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import urllib.request
+from functools import lru_cache
+from pathlib import Path
+
+from markupsafe import Markup
+
+from .cache import default_cache_dir
+
+ECHARTS_VERSION = "5.4.3"
+ECHARTS_URL = f"https://cdn.jsdelivr.net/npm/echarts@{ECHARTS_VERSION}/dist/echarts.min.js"
+ASSET_MODES = ("cdn", "vendor", "inline")
+ASSETS_DIRNAME = "assets"
+ASSET_MANIFEST_FILENAME = "asset-manifest.json"
+ECHARTS_FILENAME = "echarts.min.js"
+
+
+class EChartsDownloadError(OSError):
+    """The ECharts bundle is not cached and could not be downloaded."""
+
+
+def fingerprinted_name(name: str, digest: str, length: int = 12) -> str:
+    """Insert a digest after the first dot, as in ``echarts.<digest>.min.js``."""
+    base, dot, rest = name.partition(".")
+    return f"{base}.{digest[:length]}{dot}{rest}"
+
+
+def content_name(suffix: str, digest: str, length: int = 12) -> str:
+    """Name a file by its digest alone, as in ``3f2a9c1b0d4e.png``."""
+    return f"{digest[:length]}{suffix}"
+
+
+def hashed_filename(name: str, content: bytes, length: int = 12) -> str:
+    return fingerprinted_name(name, hashlib.sha256(content).hexdigest(), length)
+
+
+@lru_cache(maxsize=None)
+def echarts_bundle(path: str | None = None) -> bytes:
+    """Return the ECharts bundle from ``path``, else from a cached download.
+
+    The download from jsDelivr happens once per cache directory; air-gapped
+    machines pass a local copy through ``path`` instead. Raises
+    ``EChartsDownloadError`` when the download fails.
+    """
+    if path:
+        return Path(path).read_bytes()
+
+    cached = default_cache_dir() / "echarts" / f"echarts-{ECHARTS_VERSION}.min.js"
+    if not cached.exists():
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with urllib.request.urlopen(ECHARTS_URL, timeout=60) as response:
+                content = response.read()
+        except OSError as e:  # URLError, timeouts and connection resets
+            raise EChartsDownloadError(
+                f"Could not download ECharts from {ECHARTS_URL}: {e}"
+            ) from e
+        temp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        temp.write_bytes(content)
+        os.replace(temp, cached)
+    return cached.read_bytes()
+
+
+class AssetContext(dict):
+    """What ``asset_context`` returns: the ECharts entries resolve on first lookup.
+
+    A template that never reads ``echarts_src`` or ``echarts_inline`` never
+    fetches, inlines or vendors the bundle. ``get`` does not resolve them, so
+    it tells afterwards whether the rendered page used them.
+    """
+
+    _LAZY_KEYS = ("echarts_src", "echarts_inline")
+
+    def __init__(self, resolve, **entries):
+        super().__init__(**entries)
+        self._resolve = resolve
+
+    def __missing__(self, key):
+        if self._resolve is None or key not in self._LAZY_KEYS:
+            raise KeyError(key)
+        resolve, self._resolve = self._resolve, None
+        self.update(resolve())
+        return self[key]
+
+
+def asset_context(
+    mode: str, html_dir: Path, echarts_path: str | None = None, with_echarts: bool = True
+) -> AssetContext:
+    """Describe how a page loads ECharts and web fonts.
+
+    ``cdn`` links both from their CDNs. ``vendor`` writes ECharts to
+    ``assets/`` under a content-hashed name, safe to serve with immutable cache
+    headers, and ``inline`` embeds it in the page. Both offline modes leave
+    out the Google Fonts import so the pages fall back to local fonts. Pages
+    without charts (``with_echarts=False``) do not load ECharts at all, and
+    the bundle is only read once a template looks up an ECharts entry.
+    """
+    if mode not in ASSET_MODES:
+        raise ValueError(f"Unknown asset mode: {mode}")
+    web_fonts = mode == "cdn"
+    if not with_echarts:
+        return AssetContext(None, echarts_src=None, echarts_inline=None, web_fonts=web_fonts)
+    if mode == "cdn":
+        return AssetContext(None, echarts_src=ECHARTS_URL, echarts_inline=None, web_fonts=True)
+    return AssetContext(
+        lambda: _offline_echarts(mode, html_dir, echarts_path), web_fonts=web_fonts
+    )
+
+
+def _offline_echarts(mode: str, html_dir: Path, echarts_path: str | None) -> dict:
+    bundle = echarts_bundle(str(echarts_path) if echarts_path else None)
+    if mode == "inline":
+        # A literal "</script" inside the bundle would end the element early
+        code = bundle.decode("utf-8").replace("</script", "<\\/script")
+        return {"echarts_src": None, "echarts_inline": Markup(code)}
+
+    name = hashed_filename(ECHARTS_FILENAME, bundle)
+    target = html_dir / ASSETS_DIRNAME / name
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(bundle)
+    return {"echarts_src": f"{ASSETS_DIRNAME}/{name}", "echarts_inline": None}
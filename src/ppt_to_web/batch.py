@@ -0,0 +1,135 @@
+import glob
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .budget import DeckBudget
+from .cache import MediaCache
+from .charts import DEFAULT_MAX_CHART_POINTS
+from .images import ImageOptions
+from .libreoffice import LibreOfficePool
+from .pipeline import ppt_to_html
+from .profiling import Profiler
+from .yaml_to_html import get_html_env
+
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+def find_decks(sources: list[str]) -> list[Path]:
+    """Expand files, directories (searched recursively) and glob patterns to decks."""
+    decks = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = path.rglob("*.pptx")
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = (Path(match) for match in glob.glob(source, recursive=True))
+        decks.extend(
+            match
+            for match in matches
+            if match.suffix.lower() == ".pptx" and not match.name.startswith("~$")
+        )
+    return sorted(set(decks))
+
+
+def _output_dirs(decks: list[Path], output_dir: Path) -> list[Path]:
+    """Give each deck its own output directory, disambiguating repeated names."""
+    seen: dict[str, int] = {}
+    dirs = []
+    for deck in decks:
+        count = seen.get(deck.stem, 0) + 1
+        seen[deck.stem] = count
+        dirs.append(output_dir / (deck.stem if count == 1 else f"{deck.stem}_{count}"))
+    return dirs
+
+
+def convert_batch(
+    pptx_paths: list[Path],
+    output_dir: str,
+    template_name: str = "index.html",
+    jobs: int = 1,
+    cache: MediaCache | None = None,
+    incremental: bool = False,
+    output_format: str = "yaml",
+    profiler: Profiler | None = None,
+    image_options: ImageOptions | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    asset_mode: str = "cdn",
+    echarts_path: str | None = None,
+    hash_names: bool = False,
+    precompress: bool = False,
+    engine: str = "pptx",
+    low_memory: bool = False,
+    budget: DeckBudget | None = None,
+) -> list[dict]:
+    """Convert many decks in one process and write a summary of the run.
+
+    Up to ``jobs`` decks are converted concurrently on threads; Wand and
+    LibreOffice release the GIL while they work. The decks share one
+    LibreOffice pool, one media cache and one Jinja environment. A failing deck
+    is recorded in the summary and does not stop the others. ``budget`` sets the
+    limits of each deck, timed from the start of its own conversion; images
+    degraded to meet them are listed under the deck's ``degraded`` entry.
+    """
+    output_root = Path(output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+    env = get_html_env()
+    batch_start = time.perf_counter()
+
+    with LibreOfficePool(size=jobs) as converter:
+
+        def convert_one(deck: Path, deck_output: Path) -> dict:
+            entry = {"deck": str(deck), "output": str(deck_output)}
+            start = time.perf_counter()
+            deck_budget = budget.renew() if budget is not None else None
+            deck_profiler = Profiler() if profiler is not None else None
+            try:
+                entry["html"] = ppt_to_html(
+                    str(deck),
+                    str(deck_output),
+                    template_name,
+                    intermediate_format=output_format,
+                    env=env,
+                    profiler=deck_profiler,
+                    converter=converter,
+                    cache=cache,
+                    incremental=incremental,
+                    image_options=image_options,
+                    max_chart_points=max_chart_points,
+                    asset_mode=asset_mode,
+                    echarts_path=echarts_path,
+                    hash_names=hash_names,
+                    precompress=precompress,
+                    engine=engine,
+                    low_memory=low_memory,
+                    budget=deck_budget,
+                )
+                entry["status"] = "ok"
+            except Exception as e:
+                entry["status"] = "failed"
+                entry["error"] = f"{type(e).__name__}: {e}"
+            if deck_profiler is not None:
+                profiler.merge(deck_profiler, str(deck))
+            entry["seconds"] = round(time.perf_counter() - start, 3)
+            if deck_budget is not None and deck_budget.degradations:
+                entry["degraded"] = deck_budget.degradations
+            return entry
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(convert_one, pptx_paths, _output_dirs(pptx_paths, output_root))
+            )
+
+    summary = {
+        "total": len(results),
+        "failed": sum(1 for entry in results if entry["status"] == "failed"),
+        "degraded": sum(len(entry.get("degraded", [])) for entry in results),
+        "seconds": round(time.perf_counter() - batch_start, 3),
+        "decks": results,
+    }
+    with open(output_root / SUMMARY_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return results
@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Result of an item that missed its deadline or never started within the budget
+TIMED_OUT = object()
+
+
+class DeckBudget:
+    """Wall-clock allowance for converting one deck, and the deadline of each item.
+
+    ``deck_seconds`` bounds the whole deck and ``item_seconds`` any single image
+    or LibreOffice conversion; None means no limit. The deck's clock starts when
+    the budget is created, so create one per deck (see ``renew``). Items that run
+    out of time are replaced by a fallback and recorded with ``degrade``.
+    """
+
+    def __init__(
+        self,
+        deck_seconds: float | None = None,
+        item_seconds: float | None = None,
+        clock=time.monotonic,
+    ):
+        self.deck_seconds = deck_seconds
+        self.item_seconds = item_seconds
+        self.clock = clock
+        self.deadline = clock() + deck_seconds if deck_seconds is not None else None
+        self.degradations: list[dict] = []
+        self._timed_out: set = set()
+        self._lock = threading.Lock()
+
+    def renew(self) -> "DeckBudget":
+        """A budget with the same limits whose clock starts now."""
+        return DeckBudget(self.deck_seconds, self.item_seconds, self.clock)
+
+    @property
+    def limited(self) -> bool:
+        return self.deck_seconds is not None or self.item_seconds is not None
+
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.clock())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def item_timeout(self, default: float | None = None, count: int = 1) -> float | None:
+        """Seconds ``count`` items may take, capped by what is left of the deck's budget.
+
+        Each item is allowed ``item_seconds``, or ``default`` without a deadline.
+        """
+        per_item = self.item_seconds if self.item_seconds is not None else default
+        limits = [
+            limit
+            for limit in (per_item * count if per_item is not None else None, self.remaining())
+            if limit is not None
+        ]
+        return min(limits) if limits else None
+
+    def record_timeout(self, items) -> None:
+        """Note ``items`` whose work was stopped for missing a deadline."""
+        with self._lock:
+            self._timed_out.update(items)
+
+    def ran_out(self, item) -> bool:
+        """Whether ``item`` missed its deadline, or the deck has no time left for it."""
+        with self._lock:
+            timed_out = item in self._timed_out
+        return timed_out or self.expired()
+
+    def degrade(self, item: dict, stage: str, fallback: str, slide_number: int) -> None:
+        """Mark a media item as replaced by ``fallback`` after ``stage`` ran out of time.
+
+        The item is listed by its ``path``, or ``chart_id`` for a chart.
+        """
+        reason = "deck budget" if self.expired() else "item deadline"
+        item["degraded"] = {"stage": stage, "reason": reason, "fallback": fallback}
+        with self._lock:
+            self.degradations.append(
+                {
+                    "slide": slide_number,
+                    "path": item.get("path", item.get("chart_id")),
+                    **item["degraded"],
+                }
+            )
+
+
+def _kill_workers(executor: ProcessPoolExecutor) -> None:
+    """Stop a process pool at once, killing the items its workers are running."""
+    if hasattr(executor, "kill_workers"):  # Python 3.14+
+        executor.kill_workers()
+    else:
+        # Earlier versions can only wait for running items, so kill their processes
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def map_with_deadlines(func, arg_lists: list[tuple], jobs: int, budget: DeckBudget) -> list:
+    """Apply ``func`` to each argument tuple in worker processes, within ``budget``.
+
+    At most ``jobs`` items run at once, each timed from its submission. When an
+    item outlives its deadline, or the deck's budget runs out, the pool is killed:
+    the stragglers yield ``TIMED_OUT`` and the items that were running beside them
+    start again in a fresh pool. Items not started before the budget runs out
+    yield ``TIMED_OUT`` as well. Results keep the order of ``arg_lists``.
+    """
+    results = [TIMED_OUT] * len(arg_lists)
+    waiting = deque(range(len(arg_lists)))
+    workers = max(1, min(jobs, len(arg_lists)))
+    executor = None
+    running: dict = {}
+    try:
+        while waiting or running:
+            while waiting and len(running) < workers and not budget.expired():
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                index = waiting.popleft()
+                running[executor.submit(func, *arg_lists[index])] = (index, budget.clock())
+            if not running:
+                break
+
+            deadlines = [budget.deadline] if budget.deadline is not None else []
+            if budget.item_seconds is not None:
+                deadlines += [started + budget.item_seconds for _, started in running.values()]
+            timeout = max(0.0, min(deadlines) - budget.clock()) if deadlines else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, _ = running.pop(future)
+                results[index] = future.result()
+
+            now = budget.clock()
+            late = [
+                future
+                for future, (_, started) in running.items()
+                if budget.expired()
+                or (budget.item_seconds is not None and now - started >= budget.item_seconds)
+            ]
+            if late:
+                for future in late:
+                    running.pop(future)
+                # Items sharing the pool with a straggler die with it, so run them again
+                waiting.extendleft(sorted((index for index, _ in running.values()), reverse=True))
+                running.clear()
+                _kill_workers(executor)
+                executor = None
+    finally:
+        if executor is not None and running:
+            _kill_workers(executor)  # interrupted: do not wait for the items left
+        elif executor is not None:
+            executor.shutdown(wait=True)
+    return results
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+INDEX_FILENAME = "index.json"
+
+
+def default_cache_dir() -> Path:
+    """Root for ppt-to-web caches: $PPT_TO_WEB_CACHE_DIR, else the XDG cache home."""
+    if override := os.environ.get("PPT_TO_WEB_CACHE_DIR"):
+        return Path(override)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    return (Path(xdg_cache) if xdg_cache else Path.home() / ".cache") / "ppt-to-web"
+
+
+class MediaCache:
+    """Content-addressed store of processed media, persisted across runs.
+
+    Entries are keyed by a hash of the source blob plus the processing
+    parameters, and hold the processed file with its pixel dimensions, along
+    with any responsive variants written next to it. When the
+    store grows beyond ``max_bytes`` the least recently used entries are
+    evicted on ``save``. Without a ``directory`` the cache stores nothing, which
+    leaves only the per-run de-duplication done by the media stage.
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = {}
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._index = _load_index(self.directory / INDEX_FILENAME)
+
+    @staticmethod
+    def key(blob: bytes, *params: str) -> str:
+        return _params_key(hashlib.sha256(blob), params)
+
+    @staticmethod
+    def stream_key(stream, *params: str, chunk_size: int = 1024 * 1024) -> str:
+        """``key`` for content read from a binary stream, one chunk at a time."""
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+        return _params_key(digest, params)
+
+    def get(self, key: str) -> dict | None:
+        """Return ``{"file", "width", "height", "variants"}`` for a stored entry, or None.
+
+        Each variant is ``{"file", "suffix", "width", "type"}``; ``suffix`` is
+        what follows the stem in the variant's file name.
+        """
+        if self.directory is None:
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+            paths = [self.directory / f"{key}{suffix}" for suffix in _suffixes(entry)]
+            if entry is None or not all(path.exists() for path in paths):
+                self._index.pop(key, None)
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self.hits += 1
+            return {
+                "file": paths[0],
+                "width": entry["width"],
+                "height": entry["height"],
+                "variants": [
+                    {**variant, "file": self.directory / f"{key}{variant['suffix']}"}
+                    for variant in entry.get("variants", [])
+                ],
+            }
+
+    def put(
+        self,
+        key: str,
+        source: Path,
+        width: int = 0,
+        height: int = 0,
+        variants: list[dict] | None = None,
+    ) -> None:
+        """Store ``source`` and its ``variants`` (``{"file", "width", "type"}`` each).
+
+        Variant files must share ``source``'s stem, like ``<stem>_480w.webp``.
+        """
+        if self.directory is None or not source.exists():
+            return
+        stored = [
+            {
+                "suffix": variant["file"].name[len(source.stem) :],
+                "width": variant["width"],
+                "type": variant["type"],
+            }
+            for variant in variants or []
+        ]
+        size = 0
+        for suffix in {source.suffix, *(variant["suffix"] for variant in stored)}:
+            target = self.directory / f"{key}{suffix}"
+            temp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(source.with_name(f"{source.stem}{suffix}"), temp)
+            os.replace(temp, target)
+            size += target.stat().st_size
+        with self._lock:
+            self._index[key] = {
+                "suffix": source.suffix,
+                "width": width,
+                "height": height,
+                "variants": stored,
+                "size": size,
+                "last_used": time.time(),
+            }
+
+    def save(self) -> None:
+        """Evict least recently used entries over the size cap and write the index."""
+        if self.directory is None:
+            return
+        with self._lock:
+            total = sum(entry["size"] for entry in self._index.values())
+            for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                for suffix in _suffixes(entry):
+                    (self.directory / f"{key}{suffix}").unlink(missing_ok=True)
+                del self._index[key]
+                total -= entry["size"]
+
+            index_path = self.directory / INDEX_FILENAME
+            temp = index_path.with_name(f"{INDEX_FILENAME}.{os.getpid()}.tmp")
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(temp, index_path)
+
+
+def _params_key(digest, params: tuple[str, ...]) -> str:
+    for param in params:
+        digest.update(b"\0" + param.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _suffixes(entry: dict | None) -> list[str]:
+    """File suffixes stored for an index entry, the main file first."""
+    if entry is None:
+        return []
+    variants = [variant["suffix"] for variant in entry.get("variants", [])]
+    return [entry["suffix"], *(suffix for suffix in variants if suffix != entry["suffix"])]
+
+
+def _load_index(index_path: Path) -> dict[str, dict]:
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
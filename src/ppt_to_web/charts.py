@@ -0,0 +1,173 @@
+import math
+
+FONT_FAMILY = "Noto Sans TC, sans-serif"
+# Series longer than this are downsampled at extraction
+DEFAULT_MAX_CHART_POINTS = 2000
+# Series longer than this are rendered with ECharts' large-data options
+LARGE_SERIES_THRESHOLD = 1000
+PROGRESSIVE_CHUNK = 500
+
+
+def lttb_indices(values: list[float], threshold: int) -> list[int]:
+    """Pick ``threshold`` indices of ``values`` by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; from each bucket in between the
+    point forming the largest triangle with the previously kept point and the
+    next bucket's average is kept, which preserves peaks and troughs.
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        avg_x = (end + next_end - 1) / 2
+        avg_y = sum(values[end:next_end]) / (next_end - end)
+
+        best, best_area = start, -1.0
+        prev_y = values[previous]
+        for j in range(start, end):
+            area = abs(
+                (previous - avg_x) * (values[j] - prev_y) - (previous - j) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        previous = best
+    indices.append(n - 1)
+    return indices
+
+
+def bin_indices(values: list[float], max_points: int) -> list[int]:
+    """Keep the first point falling into each cell of a position-by-value grid."""
+    n = len(values)
+    if max_points >= n or max_points < 1:
+        return list(range(n))
+
+    bins = max(1, math.isqrt(max_points))
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    seen = set()
+    indices = []
+    for i, value in enumerate(values):
+        cell = (i * bins // n, min(int((value - low) / span * bins), bins - 1))
+        if cell not in seen:
+            seen.add(cell)
+            indices.append(i)
+    return indices
+
+
+def downsample_chart(chart: dict, max_points: int = DEFAULT_MAX_CHART_POINTS) -> dict:
+    """Thin out line and scatter charts whose series exceed ``max_points`` in place.
+
+    Line charts use LTTB and scatter charts grid binning. The points kept by
+    any series are kept in every series and the categories, so they stay
+    aligned. The original series length is recorded as ``point_count``.
+    """
+    length = max((len(series["data"]) for series in chart["series"]), default=0)
+    if not max_points or length <= max_points or chart["chart_type"] not in ("line", "scatter"):
+        return chart
+
+    pick = lttb_indices if chart["chart_type"] == "line" else bin_indices
+    keep = sorted(set().union(*(pick(series["data"], max_points) for series in chart["series"])))
+    categories = chart["categories"]
+    chart["categories"] = [categories[i] for i in keep if i < len(categories)]
+    for series in chart["series"]:
+        data = series["data"]
+        series["data"] = [data[i] for i in keep if i < len(data)]
+    chart["point_count"] = length
+    return chart
+
+
+def _series_option(chart: dict, series: dict) -> dict:
+    option = {"name": series["name"], "type": chart["chart_type"]}
+    if chart["chart_type"] == "pie":
+        data = series["data"]
+        option["radius"] = "60%"
+        option["data"] = [
+            {"value": data[i] if i < len(data) else 0, "name": category}
+            for i, category in enumerate(chart["categories"])
+        ]
+        return option
+
+    option["data"] = series["data"]
+    if chart.get("is_stacked"):
+        option["stack"] = "total"
+    if chart.get("is_area"):
+        option["areaStyle"] = {}
+    if len(series["data"]) > LARGE_SERIES_THRESHOLD:
+        option.update(_large_series_option(chart["chart_type"]))
+    return option
+
+
+def _large_series_option(chart_type: str) -> dict:
+    """ECharts settings that keep long series responsive."""
+    option = {"progressive": PROGRESSIVE_CHUNK, "animation": False}
+    if chart_type == "line":
+        # Draw at most one point per pixel and skip per-point symbols
+        option.update(sampling="lttb", showSymbol=False)
+    else:
+        option.update(large=True, largeThreshold=LARGE_SERIES_THRESHOLD)
+    return option
+
+
+def _radar_option(chart: dict, option: dict) -> dict:
+    values = [value for series in chart["series"] for value in series["data"]]
+    top = max(values, default=0) or 1
+    option["radar"] = {
+        "indicator": [{"name": category, "max": top} for category in chart["categories"]]
+    }
+    option["series"] = [
+        {
+            "type": "radar",
+            "data": [
+                {"name": series["name"], "value": series["data"]} for series in chart["series"]
+            ],
+        }
+    ]
+    return option
+
+
+def echarts_option(chart: dict) -> dict:
+    """Build the ECharts ``option`` for a chart entry produced by ``_extract_chart``."""
+    chart_type = chart["chart_type"]
+    option = {
+        "tooltip": {"trigger": "item" if chart_type in ("pie", "radar") else "axis"},
+        "legend": {
+            "data": [series["name"] for series in chart["series"]],
+            "bottom": 0,
+            "textStyle": {"fontFamily": FONT_FAMILY},
+        },
+    }
+    if chart_type == "radar":
+        return _radar_option(chart, option)
+
+    if chart_type != "pie":
+        category_axis = {
+            "type": "category",
+            "data": chart["categories"],
+            "axisLabel": {"fontFamily": FONT_FAMILY},
+        }
+        value_axis = {"type": "value"}
+        if chart.get("is_horizontal"):
+            option["yAxis"], option["xAxis"] = category_axis, value_axis
+        else:
+            option["xAxis"], option["yAxis"] = category_axis, value_axis
+
+    option["series"] = [_series_option(chart, series) for series in chart["series"]]
+    return option
+
+
+def chart_options(data: dict) -> dict[str, dict]:
+    """Map the ``chart_id`` of every chart in the deck to its ECharts option."""
+    return {
+        media["chart_id"]: echarts_option(media)
+        for slide in data.get("slides", [])
+        for media in slide.get("media", [])
+        if media.get("type") == "chart"
+    }
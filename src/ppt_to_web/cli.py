@@ -1,6 +1,248 @@
+from contextlib import contextmanager
+from pathlib import Path
+
 import click
 
-from ppt_to_web import ppt_to_yaml, yaml_to_html
+from ppt_to_web import ppt_to_html, ppt_to_yaml, yaml_to_html
+from ppt_to_web.assets import ASSET_MODES, EChartsDownloadError
+from ppt_to_web.batch import SUMMARY_FILENAME, convert_batch, find_decks
+from ppt_to_web.budget import DeckBudget
+from ppt_to_web.cache import MediaCache, default_cache_dir
+from ppt_to_web.charts import DEFAULT_MAX_CHART_POINTS
+from ppt_to_web.images import (
+    DEFAULT_DPI,
+    DEFAULT_FORMATS,
+    DEFAULT_MAX_WIDTH,
+    DEFAULT_QUALITY,
+    ENCODINGS,
+    RESPONSIVE_WIDTHS,
+    ImageOptions,
+)
+from ppt_to_web.intermediate import INTERMEDIATE_FORMATS
+from ppt_to_web.media_sync import MEDIA_MODES
+from ppt_to_web.ooxml import EXTRACTION_ENGINES
+from ppt_to_web.profiling import profile_run
+from ppt_to_web.yaml_to_html import precompile_templates
+
+
+def _split_widths(ctx, param, value: str) -> tuple[int, ...]:
+    try:
+        widths = tuple(int(width) for width in value.split(",") if width.strip())
+    except ValueError:
+        raise click.BadParameter("expected comma-separated pixel widths")
+    if any(width <= 0 for width in widths):
+        raise click.BadParameter("widths must be positive")
+    return widths
+
+
+def _split_formats(ctx, param, value: str) -> tuple[str, ...]:
+    return tuple(fmt.strip().lower() for fmt in value.split(",") if fmt.strip())
+
+
+_EXTRACTION_OPTIONS = [
+    click.option(
+        "--jobs", "-j", default=1, type=click.IntRange(min=1), help="Parallel image workers"
+    ),
+    click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False),
+        default=None,
+        help="Directory for the processed media cache shared across runs",
+    ),
+    click.option(
+        "--incremental",
+        is_flag=True,
+        help="Reuse results for slides unchanged since the previous conversion",
+    ),
+    click.option(
+        "--format",
+        "output_format",
+        type=click.Choice(sorted(INTERMEDIATE_FORMATS)),
+        default="yaml",
+        help="Intermediate file format",
+    ),
+    click.option(
+        "--widths",
+        default=",".join(str(width) for width in RESPONSIVE_WIDTHS),
+        callback=_split_widths,
+        help="Comma-separated widths of responsive image variants ('' to disable)",
+    ),
+    click.option(
+        "--image-formats",
+        default=",".join(DEFAULT_FORMATS),
+        callback=_split_formats,
+        help=(
+            "Extra encodings for images, where ImageMagick supports them ('' to disable); "
+            "add avif for smaller files at several times the encoding time"
+        ),
+    ),
+    click.option(
+        "--image-encoding",
+        type=click.Choice(ENCODINGS),
+        default="auto",
+        help="Lossy JPEG or lossless PNG output; auto picks JPEG for photographs",
+    ),
+    click.option(
+        "--quality",
+        type=click.IntRange(1, 100),
+        default=DEFAULT_QUALITY,
+        help="Quality of lossy image encodings",
+    ),
+    click.option(
+        "--keep-metadata",
+        is_flag=True,
+        help="Keep EXIF and other metadata in extracted images",
+    ),
+    click.option(
+        "--dpi",
+        type=click.IntRange(min=0),
+        default=DEFAULT_DPI,
+        help="Resample images to this density at their on-slide size (0 to disable)",
+    ),
+    click.option(
+        "--max-width",
+        type=click.IntRange(min=0),
+        default=DEFAULT_MAX_WIDTH,
+        help="Largest pixel width kept for any image (0 for no limit)",
+    ),
+    click.option(
+        "--max-chart-points",
+        type=click.IntRange(min=0),
+        default=DEFAULT_MAX_CHART_POINTS,
+        help="Downsample line and scatter series longer than this (0 to keep all points)",
+    ),
+    click.option(
+        "--engine",
+        type=click.Choice(EXTRACTION_ENGINES),
+        default="pptx",
+        help="Read slides through python-pptx, or straight from the slide XML (fast)",
+    ),
+    click.option(
+        "--low-memory",
+        is_flag=True,
+        help="Read images from the .pptx only when processed, for very large decks",
+    ),
+    click.option(
+        "--time-budget",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help="Seconds allowed per deck; images not processed by then get fallbacks",
+    ),
+    click.option(
+        "--item-deadline",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help="Seconds allowed for any one image or LibreOffice conversion",
+    ),
+]
+
+
+_RENDER_OPTIONS = [
+    click.option(
+        "--assets",
+        "asset_mode",
+        type=click.Choice(ASSET_MODES),
+        default="cdn",
+        help="Load ECharts and web fonts from CDNs, or vendor/inline ECharts for offline use",
+    ),
+    click.option(
+        "--echarts-path",
+        type=click.Path(exists=True, dir_okay=False),
+        default=None,
+        help="Local echarts.min.js to vendor or inline instead of downloading it",
+    ),
+    click.option(
+        "--hash-names",
+        is_flag=True,
+        help="Publish media under content-hashed names listed in asset-manifest.json",
+    ),
+    click.option(
+        "--precompress",
+        is_flag=True,
+        help="Also write .gz (and .br with brotli installed) copies of text outputs",
+    ),
+]
+
+
+_PROFILING_OPTIONS = [
+    click.option(
+        "--profile",
+        "profile_path",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Write stage timings and counters as JSON to this file",
+    ),
+    click.option(
+        "--cprofile",
+        "cprofile_path",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Write a cProfile stats dump to this file",
+    ),
+]
+
+
+def extraction_options(func):
+    """Attach the options shared by every command that extracts a deck."""
+    for option in reversed(_EXTRACTION_OPTIONS):
+        func = option(func)
+    return func
+
+
+def render_options(func):
+    """Attach the options shared by every command that renders HTML."""
+    for option in reversed(_RENDER_OPTIONS):
+        func = option(func)
+    return func
+
+
+def profiling_options(func):
+    """Attach the --profile/--cprofile options."""
+    for option in reversed(_PROFILING_OPTIONS):
+        func = option(func)
+    return func
+
+
+def _extraction_kwargs(
+    cache_dir: str | None,
+    widths: tuple[int, ...],
+    image_formats: tuple[str, ...],
+    image_encoding: str,
+    quality: int,
+    keep_metadata: bool,
+    dpi: int,
+    max_width: int,
+    time_budget: float | None,
+    item_deadline: float | None,
+    **options,
+) -> dict:
+    """Turn the parsed extraction options into ``ppt_to_yaml`` keyword arguments."""
+    limited = time_budget is not None or item_deadline is not None
+    return {
+        "cache": MediaCache(cache_dir) if cache_dir else None,
+        "image_options": ImageOptions(
+            widths=widths,
+            formats=image_formats,
+            encoding=image_encoding,
+            quality=quality,
+            strip_metadata=not keep_metadata,
+            dpi=dpi,
+            max_width=max_width,
+        ),
+        "budget": DeckBudget(time_budget, item_deadline) if limited else None,
+        **options,
+    }
+
+
+@contextmanager
+def _echarts_download_errors():
+    """Report a failed ECharts download as a usage problem with its remedy."""
+    try:
+        yield
+    except EChartsDownloadError as e:
+        raise click.ClickException(
+            f"{e}\nPass a local echarts.min.js with --echarts-path to work offline."
+        ) from e
 
 
 @click.group()
@@ -14,9 +256,32 @@ def cli():
 @click.option(
     "--output", "-o", default="./output", help="Output directory for YAML files"
 )
-def convert(pptx_path: str, output: str):
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Write slides one at a time as YAML documents or JSON lines (.jsonl)",
+)
+@extraction_options
+@profiling_options
+def convert(
+    pptx_path: str,
+    output: str,
+    stream: bool,
+    profile_path: str | None,
+    cprofile_path: str | None,
+    **extraction,
+):
     """Convert PPTX to YAML format."""
-    yaml_path = ppt_to_yaml(pptx_path, output)
+    if stream and extraction["incremental"]:
+        raise click.UsageError("--stream cannot be combined with --incremental")
+    with profile_run(profile_path, cprofile_path) as profiler:
+        yaml_path = ppt_to_yaml(
+            pptx_path,
+            output,
+            profiler=profiler,
+            stream=stream,
+            **_extraction_kwargs(**extraction),
+        )
     click.echo(f"YAML file created: {yaml_path}")
 
 
@@ -26,9 +291,39 @@ def convert(pptx_path: str, output: str):
     "--output", "-o", default="./output", help="Output directory for HTML files"
 )
 @click.option("--template", "-t", default="index.html", help="HTML template to use")
-def build(yaml_path: str, output: str, template: str):
+@click.option(
+    "--media-mode",
+    type=click.Choice(MEDIA_MODES),
+    default="copy",
+    help="How media is brought into the output directory",
+)
+@render_options
+@profiling_options
+def build(
+    yaml_path: str,
+    output: str,
+    template: str,
+    media_mode: str,
+    profile_path: str | None,
+    cprofile_path: str | None,
+    asset_mode: str,
+    echarts_path: str | None,
+    hash_names: bool,
+    precompress: bool,
+):
     """Convert YAML to HTML web page."""
-    html_path = yaml_to_html(yaml_path, output, template)
+    with profile_run(profile_path, cprofile_path) as profiler, _echarts_download_errors():
+        html_path = yaml_to_html(
+            yaml_path,
+            output,
+            template,
+            media_mode=media_mode,
+            profiler=profiler,
+            asset_mode=asset_mode,
+            echarts_path=echarts_path,
+            hash_names=hash_names,
+            precompress=precompress,
+        )
     click.echo(f"HTML file created: {html_path}")
 
 
@@ -36,19 +331,112 @@ def build(yaml_path: str, output: str, template: str):
 @click.argument("pptx_path", type=click.Path(exists=True))
 @click.option("--output", "-o", default="./output", help="Output directory")
 @click.option("--template", "-t", default="index.html", help="HTML template to use")
-def run(pptx_path: str, output: str, template: str):
+@extraction_options
+@click.option(
+    "--write-yaml",
+    is_flag=True,
+    help="Also write the intermediate file (in --format) next to the HTML",
+)
+@render_options
+@profiling_options
+def run(
+    pptx_path: str,
+    output: str,
+    template: str,
+    write_yaml: bool,
+    profile_path: str | None,
+    cprofile_path: str | None,
+    asset_mode: str,
+    echarts_path: str | None,
+    hash_names: bool,
+    precompress: bool,
+    **extraction,
+):
     """Convert PPTX to HTML in one step."""
-    click.echo(f"Converting {pptx_path} to YAML...")
-    yaml_path = ppt_to_yaml(pptx_path, output)
-    click.echo(f"YAML file created: {yaml_path}")
-
-    click.echo(f"Converting YAML to HTML...")
-    html_path = yaml_to_html(yaml_path, output, template)
+    output_format = extraction.pop("output_format")
+    click.echo(f"Converting {pptx_path} to HTML...")
+    with profile_run(profile_path, cprofile_path) as profiler, _echarts_download_errors():
+        html_path = ppt_to_html(
+            pptx_path,
+            output,
+            template,
+            intermediate_format=output_format if write_yaml else None,
+            profiler=profiler,
+            asset_mode=asset_mode,
+            echarts_path=echarts_path,
+            hash_names=hash_names,
+            precompress=precompress,
+            **_extraction_kwargs(**extraction),
+        )
     click.echo(f"HTML file created: {html_path}")
 
     click.echo("\nConversion complete!")
     click.echo(f"Open {html_path} in your browser to view the result.")
 
 
+@cli.command()
+@click.argument("sources", nargs=-1, required=True)
+@click.option("--output", "-o", default="./output", help="Output directory")
+@click.option("--template", "-t", default="index.html", help="HTML template to use")
+@extraction_options
+@render_options
+@profiling_options
+def batch(
+    sources: tuple[str, ...],
+    output: str,
+    template: str,
+    profile_path: str | None,
+    cprofile_path: str | None,
+    asset_mode: str,
+    echarts_path: str | None,
+    hash_names: bool,
+    precompress: bool,
+    **extraction,
+):
+    """Convert every PPTX in the given files, directories or glob patterns."""
+    decks = find_decks(list(sources))
+    if not decks:
+        raise click.ClickException("No .pptx files found")
+
+    click.echo(f"Converting {len(decks)} deck(s) with {extraction['jobs']} worker(s)...")
+    with profile_run(profile_path, cprofile_path) as profiler:
+        results = convert_batch(
+            decks,
+            output,
+            template,
+            profiler=profiler,
+            asset_mode=asset_mode,
+            echarts_path=echarts_path,
+            hash_names=hash_names,
+            precompress=precompress,
+            **_extraction_kwargs(**extraction),
+        )
+
+    for entry in results:
+        if entry["status"] == "ok" and entry.get("degraded"):
+            click.echo(
+                f"  ok      {entry['seconds']:8.2f}s  {entry['deck']} "
+                f"({len(entry['degraded'])} item(s) degraded)"
+            )
+        elif entry["status"] == "ok":
+            click.echo(f"  ok      {entry['seconds']:8.2f}s  {entry['deck']}")
+        else:
+            click.echo(f"  FAILED  {entry['seconds']:8.2f}s  {entry['deck']}: {entry['error']}")
+
+    failed = sum(1 for entry in results if entry["status"] == "failed")
+    click.echo(f"\n{len(results) - failed} converted, {failed} failed")
+    click.echo(f"Summary written to {Path(output) / SUMMARY_FILENAME}")
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command()
+def precompile():
+    """Compile the shipped HTML templates into the on-disk bytecode cache."""
+    for name in precompile_templates():
+        click.echo(f"Compiled {name}")
+    click.echo(f"Bytecode cache: {default_cache_dir() / 'jinja'}")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,79 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # optional: only .gz siblings are written
+        brotli = None
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_SUFFIXES = (".html", ".json", ".svg", ".js", ".css", ".txt", ".xml")
+
+
+def _encoders() -> dict:
+    encoders = {".gz": lambda content: gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders[".br"] = lambda content: brotli.compress(content, quality=11)
+    return encoders
+
+
+def _compress_file(path: Path, encoders: dict) -> dict[str, int]:
+    """Write the compressed siblings of ``path`` that are missing or older than it."""
+    stats = {"written": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+    source_mtime = path.stat().st_mtime
+    content = None
+    for suffix, encode in encoders.items():
+        target = path.with_name(path.name + suffix)
+        try:
+            if target.stat().st_mtime >= source_mtime:
+                stats["skipped"] += 1
+                continue
+        except FileNotFoundError:
+            pass
+        if content is None:
+            content = path.read_bytes()
+        compressed = encode(content)
+        if len(compressed) >= len(content):
+            # A larger "compressed" file would only cost the server a lookup
+            target.unlink(missing_ok=True)
+            stats["skipped"] += 1
+            continue
+        temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        temp.write_bytes(compressed)
+        os.replace(temp, target)
+        stats["written"] += 1
+        stats["bytes_in"] += len(content)
+        stats["bytes_out"] += len(compressed)
+    return stats
+
+
+def write_precompressed(paths, jobs: int | None = None) -> dict[str, int]:
+    """Write ``.gz`` (and ``.br`` with brotli installed) siblings for text files.
+
+    Files whose suffix is not in ``COMPRESSIBLE_SUFFIXES`` are ignored, as are
+    siblings already newer than their source. Files are compressed in parallel
+    threads, since zlib and brotli release the GIL. Returns counts of siblings
+    ``written`` and ``skipped`` with the bytes before and after compression.
+    """
+    files = sorted(
+        {
+            Path(path)
+            for path in paths
+            if Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES and Path(path).is_file()
+        }
+    )
+    totals = {"written": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+    if not files:
+        return totals
+
+    encoders = _encoders()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for stats in executor.map(lambda path: _compress_file(path, encoders), files):
+            for name, amount in stats.items():
+                totals[name] += amount
+    return totals
@@ -0,0 +1,255 @@
+import math
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+RESPONSIVE_WIDTHS = (480, 960, 1920)
+# In order of preference: browsers pick the first <source> they can decode
+MODERN_FORMATS = ("avif", "webp")
+# AVIF encodes several times slower than WebP for a modest saving, so it is opt-in
+DEFAULT_FORMATS = ("webp",)
+ENCODINGS = ("auto", "lossless", "lossy")
+DEFAULT_QUALITY = 82
+# 2x the CSS reference density, so images stay sharp on high-DPI screens
+DEFAULT_DPI = 192
+DEFAULT_MAX_WIDTH = 1920
+EMU_PER_INCH = 914400
+# An opaque image with at least this many distinct colours is treated as a photo
+PHOTO_MIN_COLORS = 4096
+LOSSY_SOURCE_FORMATS = ("jpg", "jpeg")
+# Image types with an alpha channel: ImageMagick 7 names them "...alpha", 6 "...matte"
+ALPHA_TYPE_SUFFIXES = ("alpha", "matte")
+MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+class ImageOptions(NamedTuple):
+    """Settings for raster processing; every field is part of the media cache key."""
+
+    widths: tuple[int, ...] = RESPONSIVE_WIDTHS
+    formats: tuple[str, ...] = DEFAULT_FORMATS
+    encoding: str = "auto"
+    quality: int = DEFAULT_QUALITY
+    strip_metadata: bool = True
+    dpi: int = DEFAULT_DPI
+    max_width: int = DEFAULT_MAX_WIDTH
+
+    def cache_params(self) -> tuple[str, ...]:
+        return (
+            f"widths={','.join(str(width) for width in self.widths)}",
+            f"formats={','.join(self.formats)}",
+            f"encoding={self.encoding}",
+            f"quality={self.quality}",
+            f"strip={self.strip_metadata}",
+            f"dpi={self.dpi}",
+            f"max_width={self.max_width}",
+        )
+
+
+@lru_cache(maxsize=None)
+def supported_formats(formats: tuple[str, ...]) -> tuple[str, ...]:
+    """Return the subset of ``formats`` the installed ImageMagick can encode."""
+    try:
+        from wand.version import formats as wand_formats
+
+        available = {name.lower() for name in wand_formats()}
+    except Exception:
+        return ()
+    return tuple(fmt for fmt in formats if fmt in available)
+
+
+def target_width(display_emu: int, visible_fraction: float, options: ImageOptions) -> int | None:
+    """Pixel width to resample a picture to before encoding, or None to keep it.
+
+    The shape's on-slide width at ``options.dpi`` gives the pixels needed for
+    the visible (uncropped) part of the image, which is scaled up to the whole
+    image and capped at ``options.max_width``. A zero ``dpi`` or ``max_width``
+    disables that limit.
+    """
+    limits = []
+    if options.dpi and display_emu > 0 and visible_fraction > 0:
+        visible_pixels = display_emu / EMU_PER_INCH * options.dpi
+        limits.append(math.ceil(visible_pixels / visible_fraction))
+    if options.max_width:
+        limits.append(options.max_width)
+    return min(limits) if limits else None
+
+
+def choose_format(img, source_ext: str, options: ImageOptions) -> str:
+    """Pick ``"jpg"`` for photographs and ``"png"`` for line art and transparency.
+
+    In ``auto`` mode an image counts as a photograph when it came from a JPEG
+    or has at least ``PHOTO_MIN_COLORS`` colours. Images with transparent
+    pixels stay PNG in every mode since JPEG cannot store them.
+    """
+    if options.encoding == "lossless" or img.type.endswith(ALPHA_TYPE_SUFFIXES):
+        return "png"
+    if options.encoding == "lossy" or source_ext in LOSSY_SOURCE_FORMATS:
+        return "jpg"
+    return "jpg" if img.colors >= PHOTO_MIN_COLORS else "png"
+
+
+def apply_encoding(img, fmt: str, options: ImageOptions, lossless: bool = False) -> None:
+    """Set the output format of ``img`` with its quality and compression settings.
+
+    ``lossless`` keeps WebP variants of line art lossless as well.
+    """
+    if options.strip_metadata:
+        img.strip()
+    img.format = fmt
+    if fmt == "png":
+        img.options["png:compression-level"] = "9"
+        img.options["png:compression-filter"] = "5"
+    elif fmt == "webp" and lossless:
+        img.options["webp:lossless"] = "true"
+    else:
+        img.compression_quality = options.quality
+
+
+def trim_border(img) -> None:
+    """Crop away the border matching the top-left pixel's colour.
+
+    One bounding-box pass with the colour given up front, instead of padding
+    a copy of the image by a pixel for each colour trimmed; white margins
+    are the common case of that colour. Page offsets are reset so the PNG
+    does not carry an ``oFFs`` chunk.
+    """
+    with img[0, 0] as corner:
+        img.trim(background_color=corner, fuzz=0, reset_coords=True)
+
+
+def variant_filename(stem: str, fmt: str, width: int | None = None) -> str:
+    """Name of a derivative: ``<stem>_<width>w.<fmt>``, or ``<stem>.<fmt>`` at full size."""
+    return f"{stem}.{fmt}" if width is None else f"{stem}_{width}w.{fmt}"
+
+
+def write_variants(img, output_path: Path, options: ImageOptions) -> list[dict]:
+    """Save downscaled and re-encoded copies of ``img`` next to ``output_path``.
+
+    ``img`` is the processed Wand image already saved at ``output_path``. Only
+    widths smaller than the image are generated. Returns one ``{"path",
+    "width", "type"}`` entry per file, including the original, or [] when
+    there is nothing to add to it.
+    """
+    base_format = output_path.suffix[1:].lower()
+    widths = [width for width in sorted(set(options.widths)) if width < img.width]
+    formats = [base_format] + [
+        fmt for fmt in supported_formats(tuple(options.formats)) if fmt != base_format
+    ]
+    if not widths and len(formats) == 1:
+        return []
+
+    variants = []
+    for fmt in formats:
+        for width in [*widths, None]:
+            filename = variant_filename(output_path.stem, fmt, width)
+            if filename != output_path.name:
+                with img.clone() as copy:
+                    if width is not None:
+                        copy.resize(width, max(1, round(img.height * width / img.width)))
+                    apply_encoding(copy, fmt, options, lossless=base_format == "png")
+                    copy.save(filename=str(output_path.with_name(filename)))
+            variants.append(
+                {
+                    "path": f"media/{filename}",
+                    "width": width or img.width,
+                    "type": MIME_TYPES[fmt],
+                }
+            )
+    return variants
+
+
+def responsive_sources(media: dict) -> dict:
+    """Group an image's variants into ``srcset`` strings for a ``<picture>``.
+
+    Returns ``{"srcset", "sources"}``: ``srcset`` lists the variants in the
+    format of ``media["path"]`` for the ``<img>`` fallback, and ``sources``
+    holds one ``{"type", "srcset"}`` per modern format, most preferred first.
+    """
+    by_type: dict[str, list[dict]] = {}
+    for variant in media.get("variants") or []:
+        by_type.setdefault(variant["type"], []).append(variant)
+
+    def srcset(variants: list[dict]) -> str:
+        return ", ".join(
+            f"{v['path']} {v['width']}w" for v in sorted(variants, key=lambda v: v["width"])
+        )
+
+    base_type = MIME_TYPES.get(Path(media.get("path", "")).suffix[1:].lower())
+    preferred = [MIME_TYPES[fmt] for fmt in MODERN_FORMATS]
+    return {
+        "srcset": srcset(by_type.get(base_type, [])),
+        "sources": [
+            {"type": mime, "srcset": srcset(variants)}
+            for mime, variants in sorted(
+                by_type.items(),
+                key=lambda kv: preferred.index(kv[0]) if kv[0] in preferred else len(preferred),
+            )
+            if mime != base_type
+        ],
+    }
+
+
+def _webp_size(head: bytes) -> tuple[int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20:21] == b"\x2f":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    return None
+
+
+def _jpeg_size(f) -> tuple[int, int] | None:
+    """Walk JPEG segments from just after SOI to the first start-of-frame marker."""
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":  # fill bytes
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue  # standalone markers carry no length
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+
+def probe_size(path: Path) -> tuple[int, int] | None:
+    """Read an image's pixel size from its header without decoding any pixels.
+
+    Understands PNG, GIF, JPEG and WebP; returns None for anything else.
+    """
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    return None
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+_MEDIA_OWNER_RE = re.compile(r"slide_(\d+)_shape_\d+")
+
+
+def manifest_path_for(yaml_path: Path) -> Path:
+    return yaml_path.with_name(f"{yaml_path.stem}.manifest.json")
+
+
+def slide_fingerprint(slide) -> str:
+    """Hash a slide's XML part together with every part it relates to."""
+    digest = hashlib.sha256(slide.part.blob)
+    for r_id, rel in sorted(slide.part.rels.items()):
+        if rel.is_external:
+            digest.update(f"{r_id}:{rel.target_ref}".encode("utf-8"))
+        else:
+            digest.update(r_id.encode("utf-8"))
+            digest.update(rel.target_part.blob)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path, params: tuple[str, ...]) -> list[dict]:
+    """Return the previous run's per-slide entries, or [] if unusable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("params") != list(params)
+    ):
+        return []
+    return manifest.get("slides", [])
+
+
+def write_manifest(
+    path: Path, params: tuple[str, ...], fingerprints: list[str], slides: list[dict]
+) -> None:
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "params": list(params),
+        "slides": [
+            {"fingerprint": fingerprint, "slide": slide}
+            for fingerprint, slide in zip(fingerprints, slides)
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def _media_paths(slide: dict) -> list[str]:
+    return [
+        path
+        for item in slide["media"]
+        if item.get("type") == "image"
+        for path in [item["path"], *(v["path"] for v in item.get("variants", []))]
+    ]
+
+
+def reusable_slides(
+    previous: list[dict], fingerprints: list[str], media_dir: Path
+) -> dict[int, dict]:
+    """Map slide index to the previous extraction of every unchanged slide.
+
+    A slide is reused when the slide at the same position has the same
+    fingerprint, its media files are still present and none of them is a
+    fallback written when time ran out. Duplicate images point at the file of
+    the slide they first appeared on, and re-extracting that slide rewrites its
+    files, so a slide referencing another slide's media is only reused if that
+    slide is reused too.
+    """
+    reused = {}
+    for idx, fingerprint in enumerate(fingerprints):
+        if idx >= len(previous) or previous[idx].get("fingerprint") != fingerprint:
+            continue
+        slide = previous[idx]["slide"]
+        if any(item.get("degraded") for item in slide["media"]):
+            continue
+        if all((media_dir / Path(path).name).exists() for path in _media_paths(slide)):
+            reused[idx] = slide
+
+    changed = True
+    while changed:
+        changed = False
+        for idx, slide in list(reused.items()):
+            owners = {
+                int(match.group(1))
+                for path in _media_paths(slide)
+                if (match := _MEDIA_OWNER_RE.search(path))
+            }
+            if not owners <= reused.keys():
+                del reused[idx]
+                changed = True
+    return reused
@@ -0,0 +1,137 @@
+import json
+from collections.abc import Iterable, Iterator
+from itertools import chain
+from pathlib import Path
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
+INTERMEDIATE_FORMATS = {"yaml": ".yaml", "json": ".json"}
+# Streamed decks: YAML documents or JSON lines, a header followed by one slide each
+STREAM_FORMATS = {"yaml": ".yaml", "json": ".jsonl"}
+STREAM_VERSION = 1
+
+
+def assemble_deck(title: str, slides: Iterable[dict], hero_image: str | None = None) -> dict:
+    """Build deck data from its slides, dropping empty ones.
+
+    The cover title comes from the first slide's title and every highlighted
+    slide contributes a section with its first three content items.
+    """
+    slides_data = []
+    highlighted_sections = []
+    for slide_data in slides:
+        if slide_data["title"] or slide_data["content"] or slide_data["media"]:
+            slides_data.append(slide_data)
+            if slide_data["is_highlighted"]:
+                highlighted_sections.append(
+                    {
+                        "slide_number": slide_data["slide_number"],
+                        "title": slide_data["title"],
+                        "content": slide_data["content"][:3],
+                    }
+                )
+
+    cover_title = title
+    if slides_data and slides_data[0].get("title"):
+        cover_title = slides_data[0]["title"].replace("\n", " ").strip()
+
+    return {
+        "title": title,
+        "cover_title": cover_title,
+        "hero_image": hero_image,
+        "slides": slides_data,
+        "highlighted_sections": highlighted_sections,
+        "total_slides": len(slides_data),
+    }
+
+
+def dump_deck(data: dict, path: Path) -> None:
+    """Write deck data as JSON or YAML, chosen by the file extension."""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.suffix.lower() == ".json":
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            yaml.dump(
+                data,
+                f,
+                Dumper=SafeDumper,
+                allow_unicode=True,
+                default_flow_style=False,
+                sort_keys=False,
+            )
+
+
+def dump_deck_stream(title: str, slides: Iterable[dict], path: Path) -> int:
+    """Write a header and then each slide as soon as ``slides`` yields it.
+
+    ``.jsonl`` paths get JSON lines, anything else one YAML document per
+    entry. Each slide is flushed as it is written, so memory stays flat and
+    readers such as ``iter_deck_stream`` can follow the file. Returns the
+    number of slides written.
+    """
+    header = {"stream_version": STREAM_VERSION, "title": title, "hero_image": None}
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for document in chain([header], slides):
+            if path.suffix.lower() == ".jsonl":
+                f.write(json.dumps(document, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+            else:
+                yaml.dump(
+                    document,
+                    f,
+                    Dumper=SafeDumper,
+                    allow_unicode=True,
+                    default_flow_style=False,
+                    sort_keys=False,
+                    explicit_start=True,
+                )
+            f.flush()
+            count += 1
+    return count - 1
+
+
+def iter_deck_stream(path: Path) -> Iterator[dict]:
+    """Yield the header and then each slide of a streamed deck as it is parsed."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from yaml.load_all(f, Loader=SafeLoader)
+
+
+def _is_stream_header(document) -> bool:
+    return isinstance(document, dict) and "stream_version" in document
+
+
+def _assemble_stream(documents: Iterator[dict]) -> dict:
+    header = next(documents, None)
+    if not _is_stream_header(header):
+        raise ValueError("Not a streamed deck: missing header")
+    return assemble_deck(header["title"], documents, header.get("hero_image"))
+
+
+def load_deck(path: Path) -> dict:
+    """Read deck data, detecting JSON by extension or by its leading brace.
+
+    Streamed decks (``dump_deck_stream``) are assembled into the same shape.
+    """
+    if path.suffix.lower() == ".jsonl":
+        return _assemble_stream(iter_deck_stream(path))
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.suffix.lower() == ".json" or text.lstrip().startswith("{"):
+        return json.loads(text)
+    documents = yaml.load_all(text, Loader=SafeLoader)
+    first = next(documents, None)
+    if _is_stream_header(first):
+        return _assemble_stream(chain([first], documents))
+    return first
@@ -0,0 +1,231 @@
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .budget import DeckBudget
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_TIMEOUT = 60
+
+
+class LibreOfficePool:
+    """Bounded set of headless soffice workers converting files in batches.
+
+    Every worker owns a private user profile, so several instances can run side
+    by side and only the first invocation of each worker pays LibreOffice's
+    first-start initialisation. Files are handed to ``--convert-to`` in batches
+    instead of one process per file. A batch that crashes or times out resets
+    the worker's profile and retries the files it did not produce one by one.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        binary: str = "soffice",
+    ):
+        self.size = max(1, size)
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.binary = binary
+        self._root: Path | None = None
+        self._root_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots: queue.Queue[int] = queue.Queue()
+        for slot in range(self.size):
+            self._slots.put(slot)
+
+    def __enter__(self) -> "LibreOfficePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def is_available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    def convert(
+        self,
+        paths: list[Path],
+        output_dir: Path,
+        fmt: str = "png",
+        budget: DeckBudget | None = None,
+    ) -> dict[Path, Path | None]:
+        """Convert ``paths`` into ``output_dir``, mapping each input to its output.
+
+        With a ``budget`` each file gets its ``item_seconds`` instead of the pool's
+        timeout, soffice is killed when the deck's budget runs out, and batches
+        still waiting for a worker then are not started.
+        """
+        if not paths:
+            return {}
+        if not self.is_available():
+            print(f"Warning: '{self.binary}' not found, skipping {len(paths)} conversion(s)")
+            return {path: None for path in paths}
+
+        batches = [
+            paths[i : i + self.batch_size] for i in range(0, len(paths), self.batch_size)
+        ]
+        results: dict[Path, Path | None] = {}
+        for batch_result in self._get_executor().map(
+            lambda batch: self._run_batch(batch, output_dir, fmt, budget), batches
+        ):
+            results.update(batch_result)
+        return results
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._root is not None:
+            shutil.rmtree(self._root, ignore_errors=True)
+            self._root = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.size, thread_name_prefix="soffice"
+            )
+        return self._executor
+
+    def _profile_dir(self, slot: int) -> Path:
+        with self._root_lock:
+            if self._root is None:
+                self._root = Path(tempfile.mkdtemp(prefix="ppt_to_web_soffice_"))
+            return self._root / f"worker_{slot}"
+
+    def _check_health(self, slot: int) -> None:
+        """Prepare a worker's profile, clearing a lock left by a crashed instance.
+
+        Workers never run two processes at once, so a lock file present while the
+        worker is idle always belongs to a process that died.
+        """
+        profile = self._profile_dir(slot)
+        profile.mkdir(parents=True, exist_ok=True)
+        (profile / ".lock").unlink(missing_ok=True)
+
+    def _restart(self, slot: int) -> None:
+        shutil.rmtree(self._profile_dir(slot), ignore_errors=True)
+
+    def _run_batch(
+        self, batch: list[Path], output_dir: Path, fmt: str, budget: DeckBudget | None = None
+    ) -> dict[Path, Path | None]:
+        slot = self._slots.get()
+        try:
+            if budget is not None and budget.expired():
+                return {path: None for path in batch}
+            # soffice exits 0 even when some files fail, so outputs left by an
+            # earlier run must not pass for this run's
+            before = _clear_outputs(batch, output_dir, fmt)
+            completed = self._invoke(slot, batch, output_dir, fmt, budget)
+            results = {
+                path: _expected_output(path, output_dir, fmt, before.get(path))
+                for path in batch
+            }
+            if not completed and not (budget is not None and budget.expired()):
+                # The process died mid-batch: start from a fresh profile and
+                # retry individually so one bad file cannot sink its neighbours.
+                self._restart(slot)
+                if len(batch) > 1:
+                    for path in [p for p, output in results.items() if output is None]:
+                        if budget is not None and budget.expired():
+                            break
+                        if not self._invoke(slot, [path], output_dir, fmt, budget):
+                            self._restart(slot)
+                        results[path] = _expected_output(
+                            path, output_dir, fmt, before.get(path)
+                        )
+            return results
+        finally:
+            self._slots.put(slot)
+
+    def _invoke(
+        self,
+        slot: int,
+        paths: list[Path],
+        output_dir: Path,
+        fmt: str,
+        budget: DeckBudget | None = None,
+    ) -> bool:
+        """Run one soffice process over ``paths``; return False on crash or timeout."""
+        self._check_health(slot)
+        command = [
+            self.binary,
+            f"-env:UserInstallation={self._profile_dir(slot).as_uri()}",
+            "--headless",
+            "--norestore",
+            "--convert-to", fmt,
+            "--outdir", str(output_dir),
+            *[str(path) for path in paths],
+        ]
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            return False
+        timeout = self.timeout * len(paths)
+        if budget is not None:
+            timeout = budget.item_timeout(self.timeout, len(paths))
+        try:
+            return process.wait(timeout=timeout) == 0
+        except subprocess.TimeoutExpired:
+            # soffice forks soffice.bin, so kill the whole process group.
+            _kill_process_group(process)
+            if budget is not None:
+                budget.record_timeout(paths)
+            return False
+
+
+def _output_path(input_path: Path, output_dir: Path, fmt: str) -> Path:
+    return output_dir / f"{input_path.stem}.{fmt}"
+
+
+def _clear_outputs(paths: list[Path], output_dir: Path, fmt: str) -> dict[Path, int]:
+    """Delete the outputs ``paths`` would produce, left over from an earlier run.
+
+    A source that is its own output (a PNG converted in place) is kept; its
+    modification time is returned instead, to tell a rewrite from a failure.
+    """
+    before = {}
+    for path in paths:
+        output_path = _output_path(path, output_dir, fmt)
+        if output_path == path:
+            before[path] = path.stat().st_mtime_ns
+        else:
+            output_path.unlink(missing_ok=True)
+    return before
+
+
+def _expected_output(
+    input_path: Path, output_dir: Path, fmt: str, before: int | None = None
+) -> Path | None:
+    """The output of ``input_path`` if this run wrote it.
+
+    ``before`` is the modification time of a source converted in place.
+    """
+    output_path = _output_path(input_path, output_dir, fmt)
+    try:
+        mtime = output_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return output_path if before is None or mtime != before else None
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        process.kill()
+    process.wait()
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from .assets import content_name
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MEDIA_MODES = ("copy", "hardlink", "reflink")
+MEDIA_PREFIX = "media/"
+# Linux ioctl that makes ``dst`` share ``src``'s extents (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def referenced_media(data) -> set[str]:
+    """Collect the file names of every ``media/...`` path referenced by deck data."""
+    names = set()
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, str) and value.startswith(MEDIA_PREFIX):
+            names.add(value[len(MEDIA_PREFIX) :])
+    return names
+
+
+def rewrite_media_paths(data, mapping: dict[str, str]):
+    """Return a copy of deck data with ``media/<name>`` paths renamed by ``mapping``."""
+    if isinstance(data, dict):
+        return {key: rewrite_media_paths(value, mapping) for key, value in data.items()}
+    if isinstance(data, list):
+        return [rewrite_media_paths(value, mapping) for value in data]
+    if isinstance(data, str) and data.startswith(MEDIA_PREFIX):
+        name = data[len(MEDIA_PREFIX) :]
+        return MEDIA_PREFIX + mapping.get(name, name)
+    return data
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_up_to_date(src: Path, dst: Path) -> bool:
+    """Check size and mtime first, falling back to a content hash on mtime drift."""
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+    src_stat = src.stat()
+    if dst_stat.st_ino == src_stat.st_ino and dst_stat.st_dev == src_stat.st_dev:
+        return True
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if int(dst_stat.st_mtime) == int(src_stat.st_mtime):
+        return True
+    if _file_hash(src) == _file_hash(dst):
+        # Align the mtime so the next build settles this without hashing
+        shutil.copystat(src, dst)
+        return True
+    return False
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        raise
+    shutil.copystat(src, dst)
+
+
+def _place(src: Path, dst: Path, mode: str) -> str:
+    """Link or copy ``src`` to ``dst``; return how it was placed."""
+    dst.unlink(missing_ok=True)
+    try:
+        if mode == "hardlink":
+            os.link(src, dst)
+            return "linked"
+        if mode == "reflink":
+            _reflink(src, dst)
+            return "linked"
+    except OSError:
+        pass  # cross-device, unsupported filesystem, ...: fall back to a copy
+    shutil.copy2(src, dst)
+    return "copied"
+
+
+def sync_media(
+    names: set[str], source_dir: Path, target_dir: Path, mode: str = "copy"
+) -> dict[str, int]:
+    """Bring ``target_dir`` up to date with the named files from ``source_dir``.
+
+    Returns counts of files ``copied``, ``linked``, ``skipped`` as already up to
+    date, and ``missing`` from the source.
+    """
+    if mode not in MEDIA_MODES:
+        raise ValueError(f"Unknown media mode: {mode}")
+    stats = {"copied": 0, "linked": 0, "skipped": 0, "missing": 0}
+    if not names:
+        return stats
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    if source_dir.resolve() == target_dir.resolve():
+        stats["skipped"] = len(names)
+        return stats
+
+    for name in sorted(names):
+        src = source_dir / name
+        dst = target_dir / name
+        if not src.is_file():
+            stats["missing"] += 1
+        elif _is_up_to_date(src, dst):
+            stats["skipped"] += 1
+        else:
+            stats[_place(src, dst, mode)] += 1
+    return stats
+
+
+def fingerprint_media(
+    names: set[str], source_dir: Path, target_dir: Path, mode: str = "copy"
+) -> tuple[dict[str, str], dict[str, int]]:
+    """Place the named files in ``target_dir`` under content-hashed names.
+
+    ``slide_0_shape_1.png`` becomes ``<sha256 prefix>.png``: the name carries
+    no slide position, so a file's URL changes exactly when its content does,
+    reordering slides renames nothing, and identical files share one URL.
+    ``source_dir`` may be ``target_dir`` itself. Returns the ``{name: hashed
+    name}`` mapping and the same counts as ``sync_media``.
+    """
+    if mode not in MEDIA_MODES:
+        raise ValueError(f"Unknown media mode: {mode}")
+    mapping = {}
+    stats = {"copied": 0, "linked": 0, "skipped": 0, "missing": 0}
+    if names:
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+    for name in sorted(names):
+        src = source_dir / name
+        if not src.is_file():
+            stats["missing"] += 1
+            continue
+        hashed = content_name(Path(name).suffix, _file_hash(src))
+        mapping[name] = hashed
+        dst = target_dir / hashed
+        # The name is derived from the content, so a complete existing file is
+        # current, including one just placed for a duplicate
+        if dst.exists() and dst.stat().st_size == src.stat().st_size:
+            stats["skipped"] += 1
+        else:
+            stats[_place(src, dst, mode)] += 1
+    return mapping, stats
@@ -0,0 +1,1288 @@
+import base64
+import copy
+import gzip
+import html
+import io
+import math
+import struct
+import zlib
+from typing import NamedTuple
+
+from PIL import Image as PIL_Image
+
+# CSS pixels per inch; metafile frames are converted to this for the SVG size
+CSS_DPI = 96
+_WMF_PLACEABLE_KEY = 0x9AC6CDD7
+_EMF_SIGNATURE = b" EMF"
+_EMF_PLUS = b"EMF+"
+# Rough Arial metrics, used to move top- and bottom-aligned text to its baseline
+_ASCENT, _DESCENT = 0.905, 0.212
+# Bezier control distance for a quarter ellipse
+_KAPPA = 4 / 3 * (math.sqrt(2) - 1)
+
+# Raster operations drawn; everything else (masks, inversions) needs LibreOffice
+_SRCCOPY, _PATCOPY, _BLACKNESS, _WHITENESS = 0x00CC0020, 0x00F00021, 0x00000042, 0x00FF0062
+_RGN_AND, _RGN_COPY = 1, 5
+_ALTERNATE = 1
+_TA_UPDATECP, _TA_RIGHT, _TA_CENTER, _TA_BOTTOM, _TA_BASELINE = 1, 2, 6, 8, 24
+_ETO_OPAQUE, _ETO_GLYPH_INDEX, _ETO_PDY = 0x2, 0x10, 0x2000
+_PS_NULL, _PS_USERSTYLE, _PS_ALTERNATE = 5, 7, 8
+_PS_ENDCAP_SQUARE, _PS_ENDCAP_FLAT, _PS_JOIN_BEVEL, _PS_JOIN_MITER = 0x100, 0x200, 0x1000, 0x2000
+_BS_SOLID, _BS_NULL = 0, 1
+_MM_TEXT, _MM_ISOTROPIC, _MM_ANISOTROPIC = 1, 7, 8
+# Logical units per millimetre of the fixed mapping modes, which point y up
+_MM_UNITS_PER_MM = {2: 10, 3: 100, 4: 100 / 25.4, 5: 1000 / 25.4, 6: 1440 / 25.4}
+# Dash patterns of the pen styles, in pen widths
+_DASHES = {1: (18, 6), 2: (3, 3), 3: (9, 6, 3, 6), 4: (9, 3, 3, 3, 3, 3), _PS_ALTERNATE: (1, 1)}
+# Codecs for the LOGFONT charsets of single-byte and DBCS text
+_CHARSET_CODECS = {
+    128: "cp932",
+    129: "cp949",
+    134: "gbk",
+    136: "cp950",
+    161: "cp1253",
+    162: "cp1254",
+    163: "cp1258",
+    177: "cp1255",
+    178: "cp1256",
+    186: "cp1257",
+    204: "cp1251",
+    222: "cp874",
+    238: "cp1250",
+}
+_GENERIC_FAMILIES = {0x10: "serif", 0x30: "monospace", 0x40: "cursive"}
+
+
+class _Unsupported(Exception):
+    """A record, or a use of one, the translator does not reproduce faithfully."""
+
+
+class _Pen(NamedTuple):
+    style: int = 0
+    width: float = 0
+    color: int = 0
+    dashes: tuple = ()
+
+
+class _Brush(NamedTuple):
+    style: int = _BS_SOLID
+    color: int = 0xFFFFFF
+
+
+class _Font(NamedTuple):
+    height: int = -16
+    escapement: int = 0
+    weight: int = 400
+    italic: bool = False
+    underline: bool = False
+    strikeout: bool = False
+    charset: int = 0
+    pitch_family: int = 0
+    face: str = ""
+
+
+# GDI stock objects, selected by index with the high bit set
+_STOCK_OBJECTS = {
+    0: _Brush(color=0xFFFFFF),
+    1: _Brush(color=0xC0C0C0),
+    2: _Brush(color=0x808080),
+    3: _Brush(color=0x404040),
+    4: _Brush(color=0x000000),
+    5: _Brush(style=_BS_NULL),
+    6: _Pen(color=0xFFFFFF),
+    7: _Pen(color=0x000000),
+    8: _Pen(style=_PS_NULL),
+    10: _Font(face="Courier New"),
+    11: _Font(face="Courier New"),
+    12: _Font(),
+    13: _Font(),
+    14: _Font(),
+    16: _Font(face="Courier New"),
+    17: _Font(height=-11, face="Segoe UI"),
+    18: _Brush(color=0xFFFFFF),
+    19: _Pen(color=0x000000),
+}
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _compose(first: tuple, second: tuple) -> tuple:
+    """The affine matrix applying ``first`` and then ``second`` (SVG ``a b c d e f`` order)."""
+    a1, b1, c1, d1, e1, f1 = first
+    a2, b2, c2, d2, e2, f2 = second
+    return (
+        a1 * a2 + b1 * c2,
+        a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2,
+        c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2,
+        e1 * b2 + f1 * d2 + f2,
+    )
+
+
+def _num(value: float, places: int = 2) -> str:
+    text = f"{value:.{places}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def _color(colorref: int) -> str:
+    """A COLORREF (0x00BBGGRR) as the shortest CSS hex color."""
+    r, g, b = colorref & 0xFF, (colorref >> 8) & 0xFF, (colorref >> 16) & 0xFF
+    if r % 17 == g % 17 == b % 17 == 0:
+        return f"#{r // 17:x}{g // 17:x}{b // 17:x}"
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _text_content(text: str) -> str:
+    # Control characters are not allowed in XML
+    return html.escape("".join(ch for ch in text if ch >= " " or ch == "\t"), quote=False)
+
+
+def _dib_image(
+    bmi: bytes, bits: bytes, src: tuple[int, int, int, int] | None, alpha: bool = False
+) -> tuple[str, int, int]:
+    """Return a device-independent bitmap as a data URI with its pixel size.
+
+    ``src`` (x, y, width, height) crops it; ``alpha`` reads 32-bit pixels as
+    premultiplied BGRA, as ``AlphaBlend`` does.
+    """
+    if len(bmi) < 40:
+        raise _Unsupported("OS/2 bitmap header")
+    _, width, height, _, bit_count, compression = struct.unpack_from("<IiiHHI", bmi)
+    full = (0, 0, width, abs(height))
+    if compression in (4, 5):  # BI_JPEG, BI_PNG: the bits are the compressed file
+        if src not in (None, full):
+            raise _Unsupported("cropped compressed bitmap")
+        mime = "jpeg" if compression == 4 else "png"
+        return f"data:image/{mime};base64,{base64.b64encode(bits).decode()}", *full[2:]
+
+    if alpha and bit_count == 32 and compression in (0, 3):
+        image = PIL_Image.frombuffer(
+            "RGBA", full[2:], bits, "raw", "BGRa", 0, -1 if height > 0 else 1
+        )
+    else:
+        offset = 14 + len(bmi)
+        header = b"BM" + struct.pack("<IHHI", offset + len(bits), 0, 0, offset)
+        image = PIL_Image.open(io.BytesIO(header + bmi + bits))
+        image.load()
+    if src not in (None, full):
+        x, y, w, h = src
+        image = image.crop((x, y, x + w, y + h))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/png;base64,{data}", image.width, image.height
+
+
+def _dib_split(dib: bytes) -> tuple[bytes, bytes]:
+    """Split a packed DIB into its BITMAPINFO (header and color table) and bits."""
+    header_size, _, _, _, bit_count, compression = struct.unpack_from("<IiiHHI", dib)
+    colors = struct.unpack_from("<I", dib, 32)[0] if header_size >= 40 else 0
+    if not colors and bit_count <= 8:
+        colors = 1 << bit_count
+    masks = 12 if compression == 3 and header_size == 40 else 0
+    info_size = header_size + masks + 4 * colors
+    return dib[:info_size], dib[info_size:]
+
+
+class _DC:
+    """GDI device-context state, saved and restored as a whole by SaveDC/RestoreDC."""
+
+    def __init__(self):
+        self.pen = _Pen()
+        self.brush = _Brush()
+        self.font = _Font()
+        self.text_color = 0x000000
+        self.bk_color = 0xFFFFFF
+        self.fill_mode = _ALTERNATE
+        self.text_align = 0
+        self.map_mode = _MM_TEXT
+        self.window_org = (0, 0)
+        self.window_ext = (1, 1)
+        self.viewport_org = (0, 0)
+        self.viewport_ext = (1, 1)
+        self.world = _IDENTITY
+        self.position = (0, 0)
+        self.clockwise = False
+        self.clip: tuple[str, ...] = ()
+
+
+class _SvgCanvas:
+    """Replays GDI drawing calls as SVG elements in device coordinates.
+
+    Every point is mapped from logical to device space when it is drawn, so
+    the document needs no transforms and pen widths, fonts and bitmaps are
+    scaled the way GDI scales them. Consecutive stroked lines in the same
+    style are merged into one ``<path>``.
+    """
+
+    def __init__(self, px_per_mm: tuple[float, float] = (1.0, 1.0)):
+        self.dc = _DC()
+        self.px_per_mm = px_per_mm
+        self.objects: dict[int, object] = {}
+        self._saved: list[_DC] = []
+        self._defs: list[str] = []
+        self._body: list[str] = []
+        self._groups: tuple[str, ...] = ()
+        self._run: list | None = None
+        self._path: list[str] | None = None
+        self._recorded = ""
+        self._figure_open = False
+        self._elements = 0
+
+    @property
+    def drawn(self) -> bool:
+        # A line run is only appended when the next element or the document ends
+        return bool(self._elements or self._run)
+
+    # --- state ---
+
+    def save(self) -> None:
+        self._saved.append(copy.copy(self.dc))
+
+    def restore(self, relative: int) -> None:
+        if relative >= 0 or -relative > len(self._saved):
+            raise _Unsupported("RestoreDC to an absolute or unknown level")
+        self.dc = self._saved[relative]
+        del self._saved[relative:]
+
+    def select(self, index: int) -> None:
+        obj = _STOCK_OBJECTS.get(index & 0x7FFFFFFF) if index & 0x80000000 else None
+        if obj is None:
+            obj = self.objects.get(index)
+        if isinstance(obj, _Pen):
+            self.dc.pen = obj
+        elif isinstance(obj, _Brush):
+            self.dc.brush = obj
+        elif isinstance(obj, _Font):
+            self.dc.font = obj
+
+    def set_map_mode(self, mode: int) -> None:
+        if mode != _MM_TEXT and mode not in _MM_UNITS_PER_MM and mode not in (
+            _MM_ISOTROPIC,
+            _MM_ANISOTROPIC,
+        ):
+            raise _Unsupported(f"mapping mode {mode}")
+        self.dc.map_mode = mode
+
+    def matrix(self) -> tuple:
+        """The current logical-to-device transform: world, then window to viewport."""
+        dc = self.dc
+        if dc.map_mode == _MM_TEXT:
+            sx = sy = 1.0
+        elif dc.map_mode in _MM_UNITS_PER_MM:
+            units = _MM_UNITS_PER_MM[dc.map_mode]
+            sx, sy = self.px_per_mm[0] / units, -self.px_per_mm[1] / units
+        else:
+            (wx, wy), (vx, vy) = dc.window_ext, dc.viewport_ext
+            sx, sy = (vx / wx if wx else 1.0), (vy / wy if wy else 1.0)
+            if dc.map_mode == _MM_ISOTROPIC:
+                scale = min(abs(sx), abs(sy))
+                sx, sy = math.copysign(scale, sx), math.copysign(scale, sy)
+        (ox, oy), (px, py) = dc.window_org, dc.viewport_org
+        return _compose(dc.world, (sx, 0.0, 0.0, sy, px - ox * sx, py - oy * sy))
+
+    def _points(self, points) -> list[str]:
+        a, b, c, d, e, f = self.matrix()
+        return [f"{_num(a * x + c * y + e)} {_num(b * x + d * y + f)}" for x, y in points]
+
+    # --- styles ---
+
+    def _fill(self, rule: bool = True) -> str:
+        brush = self.dc.brush
+        if brush.style == _BS_NULL:
+            return ' fill="none"'
+        if brush.style != _BS_SOLID:
+            raise _Unsupported(f"brush style {brush.style}")
+        even_odd = ' fill-rule="evenodd"' if rule and self.dc.fill_mode == _ALTERNATE else ""
+        return f' fill="{_color(brush.color)}"{even_odd}'
+
+    def _stroke(self) -> str:
+        pen = self.dc.pen
+        style = pen.style & 0x0F
+        if style == _PS_NULL:
+            return ""
+        a, b, c, d, _, _ = self.matrix()
+        scale = math.sqrt(abs(a * d - b * c))
+        width = max(pen.width * scale, 1.0)
+        attrs = f' stroke="{_color(pen.color)}"'
+        if width != 1.0:
+            attrs += f' stroke-width="{_num(width)}"'
+        if style == _PS_USERSTYLE:
+            # Geometric pens give their dashes in logical units, cosmetic ones in pixels
+            dashes = [v * (scale if pen.width else 1.0) for v in pen.dashes]
+        else:
+            dashes = [v * width for v in _DASHES.get(style, ())]
+        if dashes:
+            attrs += f' stroke-dasharray="{" ".join(_num(v) for v in dashes)}"'
+        cap = pen.style & 0x0F00
+        if cap:
+            attrs += ' stroke-linecap="square"' if cap == _PS_ENDCAP_SQUARE else ""
+            attrs += ' stroke-linecap="butt"' if cap == _PS_ENDCAP_FLAT else ""
+        join = pen.style & 0xF000
+        if join:
+            attrs += ' stroke-linejoin="bevel"' if join == _PS_JOIN_BEVEL else ""
+            attrs += ' stroke-linejoin="miter"' if join == _PS_JOIN_MITER else ""
+        return attrs
+
+    # --- output ---
+
+    def _emit(self, element: str, clip: tuple[str, ...] | None = None) -> None:
+        """Append an element inside nested groups for each clip in effect."""
+        self._flush_run()
+        self._append(element, self.dc.clip if clip is None else clip)
+
+    def _append(self, element: str, clip: tuple[str, ...]) -> None:
+        common = 0
+        while (
+            common < min(len(clip), len(self._groups))
+            and clip[common] == self._groups[common]
+        ):
+            common += 1
+        self._body.extend("</g>" for _ in self._groups[common:])
+        self._body.extend(f'<g clip-path="url(#{clip_id})">' for clip_id in clip[common:])
+        self._groups = clip
+        self._body.append(element)
+        self._elements += 1
+
+    def _flush_run(self) -> None:
+        if self._run:
+            attrs, clip, parts, _ = self._run
+            self._run = None
+            self._append(f'<path d="{"".join(parts)}"{attrs}/>', clip)
+
+    def _shape(self, d: str, fill: bool, stroke: bool, rule: bool = True) -> None:
+        """Record ``d`` into the open path, or draw it filled and/or outlined."""
+        if self._path is not None:
+            self._path.append(d)
+            return
+        attrs = (self._fill(rule) if fill else ' fill="none"') + (self._stroke() if stroke else "")
+        if attrs != ' fill="none"':
+            self._emit(f'<path d="{d}"{attrs}/>')
+
+    def _polyline(self, points: list[str]) -> None:
+        """Stroke connected points, continuing the previous line when it ends where this starts."""
+        if self._path is not None:
+            self._path_start(points[0])
+            self._path.append("L" + " ".join(points[1:]))
+            return
+        attrs = self._stroke()
+        if not attrs or len(points) < 2:
+            return
+        attrs += ' fill="none"'
+        run = self._run
+        if run and run[0] == attrs and run[1] == self.dc.clip and run[3] == points[0]:
+            run[2].append(" " + " ".join(points[1:]))
+        else:
+            self._flush_run()
+            run = self._run = [attrs, self.dc.clip, [f"M{points[0]}L{' '.join(points[1:])}"], None]
+        run[3] = points[-1]
+
+    # --- paths ---
+
+    def begin_path(self) -> None:
+        self._path = []
+        self._figure_open = False
+
+    def end_path(self) -> None:
+        if self._path is None:
+            raise _Unsupported("EndPath without BeginPath")
+        self._recorded = "".join(self._path)
+        self._path = None
+
+    def close_figure(self) -> None:
+        if self._path is not None:
+            self._path.append("Z")
+            self._figure_open = False
+
+    def _path_start(self, point: str) -> None:
+        if not self._figure_open:
+            self._path.append(f"M{point}")
+            self._figure_open = True
+
+    def _take_path(self) -> str:
+        if self._path is not None:
+            self.end_path()
+        d, self._recorded = self._recorded, ""
+        return d
+
+    def draw_path(self, fill: bool, stroke: bool) -> None:
+        d = self._take_path()
+        if d:
+            self._shape(d, fill, stroke)
+
+    def abort_path(self) -> None:
+        self._path = None
+        self._recorded = ""
+
+    # --- clipping ---
+
+    def _add_clip(self, d: str, mode: int, rule: bool = False) -> None:
+        if mode not in (_RGN_AND, _RGN_COPY):
+            raise _Unsupported(f"clip combine mode {mode}")
+        clip_id = f"c{len(self._defs)}"
+        clip_rule = ' clip-rule="evenodd"' if rule and self.dc.fill_mode == _ALTERNATE else ""
+        self._defs.append(f'<clipPath id="{clip_id}"><path d="{d}"{clip_rule}/></clipPath>')
+        self.dc.clip = (self.dc.clip if mode == _RGN_AND else ()) + (clip_id,)
+
+    def intersect_clip(self, left: float, top: float, right: float, bottom: float) -> None:
+        corners = self._points([(left, top), (right, top), (right, bottom), (left, bottom)])
+        self._add_clip(f"M{corners[0]}L{' '.join(corners[1:])}Z", _RGN_AND)
+
+    def clip_region(self, rects: list[tuple[int, int, int, int]], mode: int) -> None:
+        """Clip to device-space rectangles; no rectangles with RGN_COPY removes the clip."""
+        if not rects:
+            if mode != _RGN_COPY:
+                raise _Unsupported("empty clip region")
+            self.dc.clip = ()
+            return
+        d = "".join(f"M{l} {t}H{r}V{b}H{l}Z" for l, t, r, b in rects)
+        self._add_clip(d, mode)
+
+    def clip_path(self, mode: int) -> None:
+        self._add_clip(self._take_path(), mode, rule=True)
+
+    # --- drawing ---
+
+    def move_to(self, x: float, y: float) -> None:
+        self.dc.position = (x, y)
+        if self._path is not None:
+            self._path.append(f"M{self._points([(x, y)])[0]}")
+            self._figure_open = True
+
+    def line_to(self, points: list[tuple[float, float]]) -> None:
+        self._polyline(self._points([self.dc.position, *points]))
+        self.dc.position = points[-1]
+
+    def polyline(self, points: list[tuple[float, float]]) -> None:
+        if self._path is not None:
+            self._figure_open = False
+        self._polyline(self._points(points))
+
+    def polygons(self, polygons: list[list[tuple[float, float]]]) -> None:
+        d = "".join(
+            f"M{pts[0]}L{' '.join(pts[1:])}Z"
+            for pts in (self._points(points) for points in polygons)
+            if len(pts) > 1
+        )
+        if d:
+            self._shape(d, fill=True, stroke=True)
+            self._figure_open = False
+
+    def beziers(self, points: list[tuple[float, float]], continue_from_position: bool) -> None:
+        """Stroke cubic Beziers: a start point and then three points per curve."""
+        if continue_from_position:
+            points = [self.dc.position, *points]
+            self.dc.position = points[-1]
+        pts = self._points(points)
+        if self._path is not None:
+            if not continue_from_position:
+                self._figure_open = False
+            self._path_start(pts[0])
+            self._path.append("C" + " ".join(pts[1:]))
+            return
+        self._shape(f"M{pts[0]}C{' '.join(pts[1:])}", fill=False, stroke=True)
+
+    def rectangle(self, left: float, top: float, right: float, bottom: float) -> None:
+        self.polygons([[(left, top), (right, top), (right, bottom), (left, bottom)]])
+
+    def _ellipse_arc(self, box, start: float, sweep: float) -> tuple[list, list]:
+        """Bezier segments of an arc of the ellipse in ``box``, by parameter angle."""
+        left, top, right, bottom = box
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        rx, ry = (right - left) / 2, (bottom - top) / 2
+        segments = max(1, math.ceil(abs(sweep) / (math.pi / 2) - 1e-9))
+        step = sweep / segments
+        k = 4 / 3 * math.tan(step / 4)
+        points = [(cx + rx * math.cos(start), cy + ry * math.sin(start))]
+        angle = start
+        for _ in range(segments):
+            end = angle + step
+            x0, y0 = points[-1]
+            x3, y3 = cx + rx * math.cos(end), cy + ry * math.sin(end)
+            points += [
+                (x0 - k * rx * math.sin(angle), y0 + k * ry * math.cos(angle)),
+                (x3 + k * rx * math.sin(end), y3 - k * ry * math.cos(end)),
+                (x3, y3),
+            ]
+            angle = end
+        return points[:1], points[1:]
+
+    def ellipse(self, left: float, top: float, right: float, bottom: float) -> None:
+        (start,), curve = self._ellipse_arc((left, top, right, bottom), 0.0, 2 * math.pi)
+        pts = self._points([start, *curve])
+        self._shape(f"M{pts[0]}C{' '.join(pts[1:])}Z", fill=True, stroke=True, rule=False)
+        self._figure_open = False
+
+    def round_rect(self, left, top, right, bottom, width: float, height: float) -> None:
+        rx = min(abs(width) / 2, abs(right - left) / 2)
+        ry = min(abs(height) / 2, abs(bottom - top) / 2)
+        kx, ky = rx * _KAPPA, ry * _KAPPA
+        points = [
+            (left + rx, top),
+            (right - rx, top),
+            (right - rx + kx, top), (right, top + ry - ky), (right, top + ry),
+            (right, bottom - ry),
+            (right, bottom - ry + ky), (right - rx + kx, bottom), (right - rx, bottom),
+            (left + rx, bottom),
+            (left + rx - kx, bottom), (left, bottom - ry + ky), (left, bottom - ry),
+            (left, top + ry),
+            (left, top + ry - ky), (left + rx - kx, top), (left + rx, top),
+        ]  # fmt: skip
+        p = self._points(points)
+        d = (
+            f"M{p[0]}L{p[1]}C{' '.join(p[2:5])}L{p[5]}C{' '.join(p[6:9])}"
+            f"L{p[9]}C{' '.join(p[10:13])}L{p[13]}C{' '.join(p[14:17])}Z"
+        )
+        self._shape(d, fill=True, stroke=True, rule=False)
+        self._figure_open = False
+
+    def arc(self, box, start_point, end_point, kind: str) -> None:
+        """Draw an ``arc``, ``arcto``, ``chord`` or ``pie`` between two radial points."""
+        left, top, right, bottom = box
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        rx, ry = abs(right - left) / 2 or 1, abs(bottom - top) / 2 or 1
+
+        def angle(point):
+            return math.atan2((point[1] - cy) / ry, (point[0] - cx) / rx)
+
+        start, sweep = angle(start_point), angle(end_point) - angle(start_point)
+        a, b, c, d, _, _ = self.matrix()
+        # Arcs run counterclockwise as seen on the device unless SetArcDirection says otherwise
+        clockwise = self.dc.clockwise != (a * d - b * c < 0)
+        if clockwise:
+            sweep = sweep % (2 * math.pi) or 2 * math.pi
+        else:
+            sweep = -((-sweep) % (2 * math.pi) or 2 * math.pi)
+        (first,), curve = self._ellipse_arc((cx - rx, cy - ry, cx + rx, cy + ry), start, sweep)
+        pts = self._points([first, *curve])
+        arc_d = f"C{' '.join(pts[1:])}"
+        if kind == "arcto":
+            self.line_to([first])
+            if self._path is not None:
+                self._path.append(arc_d)
+            else:
+                self._shape(f"M{pts[0]}{arc_d}", fill=False, stroke=True)
+            self.dc.position = curve[-1]
+        elif kind == "arc":
+            if self._path is not None:
+                self._path.append(f"M{pts[0]}{arc_d}")
+                self._figure_open = True
+            else:
+                self._shape(f"M{pts[0]}{arc_d}", fill=False, stroke=True)
+        elif kind == "chord":
+            self._shape(f"M{pts[0]}{arc_d}Z", fill=True, stroke=True, rule=False)
+            self._figure_open = False
+        else:
+            center = self._points([(cx, cy)])[0]
+            self._shape(f"M{center}L{pts[0]}{arc_d}Z", fill=True, stroke=True, rule=False)
+            self._figure_open = False
+
+    def fill_rect(self, left, top, right, bottom, color: int | None = None) -> None:
+        """Fill a rectangle with ``color``, or the current brush, without outlining it."""
+        if color is not None:
+            brush, self.dc.brush = self.dc.brush, _Brush(color=color)
+        try:
+            pts = self._points([(left, top), (right, top), (right, bottom), (left, bottom)])
+            self._shape(f"M{pts[0]}L{' '.join(pts[1:])}Z", fill=True, stroke=False, rule=False)
+        finally:
+            if color is not None:
+                self.dc.brush = brush
+
+    def image(self, x, y, width, height, href: str, src_width: int, src_height: int, opacity=1.0):
+        """Draw a bitmap stretched over the logical rectangle at (x, y)."""
+        if self._path is not None:
+            raise _Unsupported("bitmap inside a path")
+        p0, p1, p2 = (
+            tuple(map(float, p.split()))
+            for p in self._points([(x, y), (x + width, y), (x, y + height)])
+        )
+        alpha = f' opacity="{_num(opacity)}"' if opacity < 1 else ""
+        if p1[1] == p0[1] and p2[0] == p0[0] and p1[0] > p0[0] and p2[1] > p0[1]:
+            geometry = (
+                f'x="{_num(p0[0])}" y="{_num(p0[1])}" '
+                f'width="{_num(p1[0] - p0[0])}" height="{_num(p2[1] - p0[1])}"'
+            )
+        else:
+            matrix = (
+                (p1[0] - p0[0]) / src_width,
+                (p1[1] - p0[1]) / src_width,
+                (p2[0] - p0[0]) / src_height,
+                (p2[1] - p0[1]) / src_height,
+                p0[0],
+                p0[1],
+            )
+            geometry = (
+                f'width="{src_width}" height="{src_height}" '
+                f'transform="matrix({" ".join(_num(v, 5) for v in matrix)})"'
+            )
+        self._emit(f'<image {geometry} preserveAspectRatio="none"{alpha} href="{href}"/>')
+
+    def text(self, x: float, y: float, string: str, dx: list[int] | None = None) -> None:
+        """Draw a string at a reference point, aligned as SetTextAlign says."""
+        if self._path is not None:
+            raise _Unsupported("text inside a path")
+        dc, font = self.dc, self.dc.font
+        if dc.text_align & _TA_UPDATECP:
+            raise _Unsupported("text at the current position")
+        if not string:
+            return
+        a, b, c, d, e, f = self.matrix()
+        x0, y0 = a * x + c * y + e, b * x + d * y + f
+        advance, size = math.hypot(a, b), math.hypot(c, d) * (abs(font.height) or 16)
+        rotation = math.degrees(math.atan2(dc.world[1], dc.world[0])) - font.escapement / 10
+
+        vertical = dc.text_align & _TA_BASELINE
+        if vertical == 0:
+            y0 += size * _ASCENT
+        elif vertical == _TA_BOTTOM:
+            y0 -= size * _DESCENT
+        horizontal = dc.text_align & _TA_CENTER
+        anchor = ""
+        if dx and len(dx) == len(string) and len(string) > 1:
+            offsets = [0.0]
+            for value in dx[:-1]:
+                offsets.append(offsets[-1] + value * advance)
+            total = offsets[-1] + dx[-1] * advance
+            shift = {_TA_RIGHT: -total, _TA_CENTER: -total / 2}.get(horizontal, 0.0)
+            xs = " ".join(_num(x0 + shift + offset) for offset in offsets)
+        else:
+            xs = _num(x0)
+            anchor = {_TA_RIGHT: ' text-anchor="end"', _TA_CENTER: ' text-anchor="middle"'}.get(
+                horizontal, ""
+            )
+
+        family = _GENERIC_FAMILIES.get(font.pitch_family & 0xF0, "sans-serif")
+        face = html.escape(font.face.replace("'", ""))
+        if face.strip():
+            family = f"'{face}', {family}"
+        attrs = f' font-family="{family}"'
+        attrs += f' font-size="{_num(size)}"'
+        if font.weight and font.weight != 400:
+            weight = "bold" if font.weight == 700 else font.weight
+            attrs += f' font-weight="{weight}"'
+        if font.italic:
+            attrs += ' font-style="italic"'
+        decorations = " ".join(
+            name for name, on in (("underline", font.underline), ("line-through", font.strikeout))
+            if on
+        )
+        if decorations:
+            attrs += f' text-decoration="{decorations}"'
+        if dc.text_color:
+            attrs += f' fill="{_color(dc.text_color)}"'
+        if abs(rotation) > 0.01:
+            attrs += f' transform="rotate({_num(rotation)} {_num(x0)} {_num(y0)})"'
+        if string != string.strip(" ") or "  " in string:
+            attrs += ' xml:space="preserve"'
+        self._emit(f'<text x="{xs}" y="{_num(y0)}"{anchor}{attrs}>{_text_content(string)}</text>')
+
+    # --- document ---
+
+    def svg(self, view_box: tuple[float, float, float, float], size: tuple[float, float]) -> str:
+        self._flush_run()
+        self._body.extend("</g>" for _ in self._groups)
+        self._groups = ()
+        x, y, w, h = view_box
+        defs = f"<defs>{''.join(self._defs)}</defs>" if self._defs else ""
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(size[0])}" '
+            f'height="{_num(size[1])}" viewBox="{_num(x)} {_num(y)} {_num(w)} {_num(h)}" '
+            'stroke-linecap="round" stroke-linejoin="round" stroke-miterlimit="10">'
+            f"{defs}{''.join(self._body)}</svg>"
+        )
+
+
+# EMF records changing nothing the translation reproduces
+_EMF_IGNORED = {
+    13,  # SETBRUSHORGEX
+    16,  # SETMAPPERFLAGS
+    21,  # SETSTRETCHBLTMODE
+    23,  # SETCOLORADJUSTMENT
+    28,  # SETMETARGN
+    48,  # SELECTPALETTE
+    50,  # SETPALETTEENTRIES
+    51,  # RESIZEPALETTE
+    52,  # REALIZEPALETTE
+    58,  # SETMITERLIMIT
+    65,  # FLATTENPATH: curves are kept as curves
+    98,  # SETICMMODE
+    99,  # CREATECOLORSPACE
+    100,  # SETCOLORSPACE
+    101,  # DELETECOLORSPACE
+    111,  # COLORCORRECTPALETTE
+    112,  # SETICMPROFILEA
+    113,  # SETICMPROFILEW
+    115,  # SETLAYOUT
+    119,  # SETLINKEDUFIS
+    122,  # CREATECOLORSPACEW
+}
+
+
+class _EmfPlayer:
+    """Plays the records of an enhanced metafile onto an ``_SvgCanvas``."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        bounds = struct.unpack_from("<4i", data, 8)
+        frame = struct.unpack_from("<4i", data, 24)
+        device = struct.unpack_from("<2i", data, 72)
+        millimeters = struct.unpack_from("<2i", data, 80)
+        if min(*device, *millimeters) <= 0:
+            raise _Unsupported("no reference device")
+        self.px_per_mm = (device[0] / millimeters[0], device[1] / millimeters[1])
+        self.canvas = _SvgCanvas(self.px_per_mm)
+        self.bounds, self.frame = bounds, frame
+        self.emf_plus = False
+
+    def play(self) -> tuple[str, int, int]:
+        data, offset = self.data, 0
+        while offset + 8 <= len(data):
+            record_type, size = struct.unpack_from("<II", data, offset)
+            if size < 8 or size % 4 or offset + size > len(data):
+                raise _Unsupported("malformed record")
+            if record_type == 14:  # EOF
+                break
+            self._record(record_type, data[offset : offset + size])
+            offset += size
+        if not self.canvas.drawn:
+            raise _Unsupported("EMF+ only" if self.emf_plus else "nothing drawn")
+
+        # The frame, in 0.01 mm, is the picture's extent; bounds only cover the ink
+        left, top, right, bottom = self.frame
+        sx, sy = self.px_per_mm[0] / 100, self.px_per_mm[1] / 100
+        view_box = (left * sx, top * sy, (right - left) * sx, (bottom - top) * sy)
+        if view_box[2] <= 0 or view_box[3] <= 0:
+            raise _Unsupported("empty frame")
+        size = ((right - left) / 2540 * CSS_DPI, (bottom - top) / 2540 * CSS_DPI)
+        return self.canvas.svg(view_box, size), round(size[0]), round(size[1])
+
+    def _record(self, record_type: int, rec: bytes) -> None:
+        canvas, dc = self.canvas, self.canvas.dc
+
+        def ints(offset: int, count: int) -> tuple:
+            return struct.unpack_from(f"<{count}i", rec, offset)
+
+        def uint(offset: int) -> int:
+            return struct.unpack_from("<I", rec, offset)[0]
+
+        if record_type == 1 or record_type in _EMF_IGNORED:
+            return
+        if record_type == 70:  # GDICOMMENT
+            if len(rec) >= 16 and rec[12:16] == _EMF_PLUS:
+                self.emf_plus = True
+            return
+        if record_type in (2, 3, 4, 5, 6, 85, 86, 87, 88, 89):
+            count = uint(24)
+            fmt = "h" if record_type >= 85 else "i"
+            values = struct.unpack_from(f"<{2 * count}{fmt}", rec, 28)
+            points = list(zip(values[::2], values[1::2]))
+            kind = record_type - 83 if record_type >= 85 else record_type
+            if kind == 2:
+                canvas.beziers(points, continue_from_position=False)
+            elif kind == 3:
+                canvas.polygons([points])
+            elif kind == 4:
+                canvas.polyline(points)
+            elif kind == 5:
+                canvas.beziers(points, continue_from_position=True)
+            else:
+                canvas.line_to(points)
+        elif record_type in (7, 8, 90, 91):
+            polys, total = uint(24), uint(28)
+            counts = struct.unpack_from(f"<{polys}I", rec, 32)
+            fmt = "h" if record_type >= 90 else "i"
+            values = struct.unpack_from(f"<{2 * total}{fmt}", rec, 32 + 4 * polys)
+            points = list(zip(values[::2], values[1::2]))
+            groups, start = [], 0
+            for count in counts:
+                groups.append(points[start : start + count])
+                start += count
+            if record_type in (8, 91):
+                canvas.polygons(groups)
+            else:
+                for group in groups:
+                    canvas.polyline(group)
+        elif record_type == 9:
+            dc.window_ext = ints(8, 2)
+        elif record_type == 10:
+            dc.window_org = ints(8, 2)
+        elif record_type == 11:
+            dc.viewport_ext = ints(8, 2)
+        elif record_type == 12:
+            dc.viewport_org = ints(8, 2)
+        elif record_type == 15:  # SETPIXELV
+            x, y = ints(8, 2)
+            canvas.fill_rect(x, y, x + 1, y + 1, uint(16))
+        elif record_type == 17:
+            canvas.set_map_mode(uint(8))
+        elif record_type == 18:
+            pass  # SETBKMODE: opaque text and hatch backgrounds are not drawn
+        elif record_type == 19:
+            dc.fill_mode = uint(8)
+        elif record_type == 20:
+            if uint(8) != 13:  # R2_COPYPEN
+                raise _Unsupported(f"ROP2 {uint(8)}")
+        elif record_type == 22:
+            dc.text_align = uint(8)
+        elif record_type == 24:
+            dc.text_color = uint(8)
+        elif record_type == 25:
+            dc.bk_color = uint(8)
+        elif record_type == 27:
+            canvas.move_to(*ints(8, 2))
+        elif record_type == 30:
+            canvas.intersect_clip(*ints(8, 4))
+        elif record_type == 33:
+            canvas.save()
+        elif record_type == 34:
+            canvas.restore(ints(8, 1)[0])
+        elif record_type in (35, 36):
+            xform = struct.unpack_from("<6f", rec, 8)
+            mode = 4 if record_type == 35 else uint(32)
+            if mode == 1:
+                dc.world = _IDENTITY
+            elif mode == 2:
+                dc.world = _compose(xform, dc.world)
+            elif mode == 3:
+                dc.world = _compose(dc.world, xform)
+            elif mode == 4:
+                dc.world = xform
+            else:
+                raise _Unsupported(f"world transform mode {mode}")
+        elif record_type == 37:
+            canvas.select(uint(8))
+        elif record_type == 38:
+            style, width, _, color = struct.unpack_from("<IiiI", rec, 12)
+            canvas.objects[uint(8)] = _Pen(style, width, color)
+        elif record_type == 95:  # EXTCREATEPEN
+            style, width, brush_style, color, _, entries = struct.unpack_from("<6I", rec, 28)
+            if brush_style != _BS_SOLID:
+                raise _Unsupported("patterned pen")
+            dashes = struct.unpack_from(f"<{entries}I", rec, 52) if entries else ()
+            # Cosmetic pens are one device pixel wide whatever their width says
+            canvas.objects[uint(8)] = _Pen(style, width if style & 0x10000 else 0, color, dashes)
+        elif record_type == 39:
+            style, color, _ = struct.unpack_from("<3I", rec, 12)
+            canvas.objects[uint(8)] = _Brush(style, color)
+        elif record_type == 40:
+            canvas.objects.pop(uint(8), None)
+        elif record_type == 42:
+            canvas.ellipse(*ints(8, 4))
+        elif record_type == 43:
+            canvas.rectangle(*ints(8, 4))
+        elif record_type == 44:
+            canvas.round_rect(*ints(8, 6))
+        elif record_type in (45, 46, 47, 55):
+            box, start, end = ints(8, 4), ints(24, 2), ints(32, 2)
+            kind = {45: "arc", 46: "chord", 47: "pie", 55: "arcto"}[record_type]
+            canvas.arc(box, start, end, kind)
+        elif record_type == 49:  # CREATEPALETTE: only its handle matters
+            canvas.objects[uint(8)] = None
+        elif record_type == 54:
+            canvas.line_to([ints(8, 2)])
+        elif record_type == 57:
+            dc.clockwise = uint(8) == 2
+        elif record_type == 59:
+            canvas.begin_path()
+        elif record_type == 60:
+            canvas.end_path()
+        elif record_type == 61:
+            canvas.close_figure()
+        elif record_type in (62, 63, 64):
+            canvas.draw_path(fill=record_type != 64, stroke=record_type != 62)
+        elif record_type == 67:
+            canvas.clip_path(uint(8))
+        elif record_type == 68:
+            canvas.abort_path()
+        elif record_type == 75:
+            size, mode = uint(8), uint(12)
+            rects = []
+            if size:
+                count = uint(24)
+                values = ints(48, 4 * count)
+                rects = [values[i : i + 4] for i in range(0, len(values), 4)]
+            canvas.clip_region(rects, mode)
+        elif record_type in (76, 77, 114):
+            self._blit(record_type, rec)
+        elif record_type == 81:
+            self._stretch_dibits(rec)
+        elif record_type == 82:
+            self._font(rec)
+        elif record_type in (83, 84):
+            self._text(rec, wide=record_type == 84)
+        else:
+            raise _Unsupported(f"EMF record {record_type}")
+
+    def _bitmap(self, rec: bytes, at: int) -> tuple[bytes, bytes] | None:
+        """The BITMAPINFO and bits whose offset/size fields start at ``at``."""
+        bmi_offset, bmi_size, bits_offset, bits_size = struct.unpack_from("<4I", rec, at)
+        if not bmi_size:
+            return None
+        return (
+            rec[bmi_offset : bmi_offset + bmi_size],
+            rec[bits_offset : bits_offset + bits_size],
+        )
+
+    def _blit(self, record_type: int, rec: bytes) -> None:
+        x, y, width, height = struct.unpack_from("<4i", rec, 24)
+        rop = struct.unpack_from("<I", rec, 40)[0]
+        src_x, src_y = struct.unpack_from("<2i", rec, 44)
+        usage = struct.unpack_from("<I", rec, 80)[0]
+        bitmap = self._bitmap(rec, 84)
+        src_width, src_height = (
+            struct.unpack_from("<2i", rec, 100) if record_type != 76 else (width, height)
+        )
+        if bitmap is None:
+            color = {_BLACKNESS: 0x000000, _WHITENESS: 0xFFFFFF}.get(rop)
+            if rop != _PATCOPY and color is None:
+                raise _Unsupported(f"raster operation {rop:#x}")
+            self.canvas.fill_rect(x, y, x + width, y + height, color)
+            return
+        if usage != 0:
+            raise _Unsupported("palette-indexed bitmap")
+        opacity, alpha = 1.0, False
+        if record_type == 114:  # ALPHABLEND: rop holds a BLENDFUNCTION
+            opacity, alpha = ((rop >> 16) & 0xFF) / 255, bool((rop >> 24) & 1)
+        elif rop != _SRCCOPY:
+            raise _Unsupported(f"raster operation {rop:#x}")
+        href, w, h = _dib_image(*bitmap, (src_x, src_y, src_width, src_height), alpha)
+        self.canvas.image(x, y, width, height, href, w, h, opacity)
+
+    def _stretch_dibits(self, rec: bytes) -> None:
+        x, y, src_x, src_y, src_width, src_height = struct.unpack_from("<6i", rec, 24)
+        usage, rop = struct.unpack_from("<2I", rec, 64)
+        width, height = struct.unpack_from("<2i", rec, 72)
+        bitmap = self._bitmap(rec, 48)
+        if bitmap is None or usage != 0 or rop != _SRCCOPY:
+            raise _Unsupported(f"StretchDIBits with raster operation {rop:#x}")
+        href, w, h = _dib_image(*bitmap, (src_x, src_y, src_width, src_height))
+        self.canvas.image(x, y, width, height, href, w, h)
+
+    def _font(self, rec: bytes) -> None:
+        height, _, escapement, _, weight = struct.unpack_from("<5i", rec, 12)
+        italic, underline, strikeout, charset, _, _, _, pitch_family = rec[32:40]
+        face = rec[40:104].decode("utf-16-le", "replace").split("\0", 1)[0]
+        self.canvas.objects[struct.unpack_from("<I", rec, 8)[0]] = _Font(
+            height,
+            escapement,
+            weight,
+            bool(italic),
+            bool(underline),
+            bool(strikeout),
+            charset,
+            pitch_family,
+            face,
+        )
+
+    def _text(self, rec: bytes, wide: bool) -> None:
+        x, y, count, string_offset, options = struct.unpack_from("<2i3I", rec, 36)
+        if options & _ETO_GLYPH_INDEX:
+            raise _Unsupported("glyph-indexed text")
+        dx_offset = struct.unpack_from("<I", rec, 72)[0]
+        if wide:
+            string = rec[string_offset : string_offset + 2 * count].decode("utf-16-le", "replace")
+        else:
+            codec = _CHARSET_CODECS.get(self.canvas.dc.font.charset, "cp1252")
+            string = rec[string_offset : string_offset + count].decode(codec, "replace")
+        dx = None
+        if dx_offset and count:
+            step = 2 if options & _ETO_PDY else 1
+            dx = list(struct.unpack_from(f"<{count * step}i", rec, dx_offset))[::step]
+        if options & _ETO_OPAQUE:
+            self.canvas.fill_rect(*struct.unpack_from("<4i", rec, 56), self.canvas.dc.bk_color)
+        self.canvas.text(x, y, string, dx)
+
+
+# WMF records changing nothing the translation reproduces
+_WMF_IGNORED = {
+    0x0035,  # REALIZEPALETTE
+    0x0102,  # SETBKMODE
+    0x0103,  # SETMAPMODE: the window is always mapped onto the picture frame
+    0x0105,  # SETRELABS
+    0x0107,  # SETSTRETCHBLTMODE
+    0x020D,  # SETVIEWPORTORG
+    0x020E,  # SETVIEWPORTEXT
+    0x0231,  # SETMAPPERFLAGS
+    0x0234,  # SELECTPALETTE
+    0x0626,  # ESCAPE
+}
+
+
+class _WmfPlayer:
+    """Plays the records of a Windows metafile onto an ``_SvgCanvas``.
+
+    The window is mapped onto the placeable header's bounding box, or onto
+    the first window extent set when there is no placeable header.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.canvas = _SvgCanvas()
+        self.canvas.dc.map_mode = _MM_ANISOTROPIC
+        self.frame: tuple[int, int, int, int] | None = None
+        self.inch = 0
+        self.offset = 0
+        if struct.unpack_from("<I", data)[0] == _WMF_PLACEABLE_KEY:
+            left, top, right, bottom, self.inch = struct.unpack_from("<4hH", data, 6)
+            self._set_frame((left, top, right - left, bottom - top))
+            self.canvas.dc.window_org = (left, top)
+            self.canvas.dc.window_ext = (right - left, bottom - top)
+            self.offset = 22
+        header_type, header_size = struct.unpack_from("<HH", data, self.offset)
+        if header_type not in (1, 2) or header_size != 9:
+            raise _Unsupported("not a Windows metafile")
+        self.offset += 18
+
+    def _set_frame(self, frame: tuple[int, int, int, int]) -> None:
+        """Make ``frame`` (x, y, width, height) the picture and the window's viewport."""
+        if frame[2] <= 0 or frame[3] <= 0:
+            raise _Unsupported("empty frame")
+        self.frame = frame
+        self.canvas.dc.viewport_org, self.canvas.dc.viewport_ext = frame[:2], frame[2:]
+
+    def play(self) -> tuple[str, int, int]:
+        data, offset = self.data, self.offset
+        while offset + 6 <= len(data):
+            size, function = struct.unpack_from("<IH", data, offset)
+            if size < 3 or offset + 2 * size > len(data):
+                raise _Unsupported("malformed record")
+            if function == 0:  # EOF
+                break
+            self._record(function, data[offset + 6 : offset + 2 * size])
+            offset += 2 * size
+        if self.frame is None or not self.canvas.drawn:
+            raise _Unsupported("nothing drawn")
+        x, y, width, height = self.frame
+        scale = CSS_DPI / self.inch if self.inch else 1.0
+        size = (width * scale, height * scale)
+        return self.canvas.svg(self.frame, size), round(size[0]), round(size[1])
+
+    def _add_object(self, obj) -> None:
+        objects, index = self.canvas.objects, 0
+        while index in objects:
+            index += 1
+        objects[index] = obj
+
+    def _decode(self, raw: bytes) -> str:
+        codec = _CHARSET_CODECS.get(self.canvas.dc.font.charset, "cp1252")
+        return raw.decode(codec, "replace")
+
+    def _record(self, function: int, params: bytes) -> None:
+        canvas, dc = self.canvas, self.canvas.dc
+
+        def shorts(count: int, offset: int = 0) -> tuple:
+            return struct.unpack_from(f"<{count}h", params, offset)
+
+        def color(offset: int = 0) -> int:
+            return struct.unpack_from("<I", params, offset)[0] & 0xFFFFFF
+
+        if function in _WMF_IGNORED:
+            return
+        if function in (0x0418, 0x041B, 0x0416):
+            bottom, right, top, left = shorts(4)
+            if function == 0x0418:
+                canvas.ellipse(left, top, right, bottom)
+            elif function == 0x041B:
+                canvas.rectangle(left, top, right, bottom)
+            else:
+                canvas.intersect_clip(left, top, right, bottom)
+        elif function in (0x0324, 0x0325):
+            count = shorts(1)[0]
+            values = shorts(2 * count, 2)
+            points = list(zip(values[::2], values[1::2]))
+            if function == 0x0324:
+                canvas.polygons([points])
+            else:
+                canvas.polyline(points)
+        elif function == 0x0538:
+            polys = shorts(1)[0]
+            counts = shorts(polys, 2)
+            values = shorts(2 * sum(counts), 2 + 2 * polys)
+            points = list(zip(values[::2], values[1::2]))
+            groups, start = [], 0
+            for count in counts:
+                groups.append(points[start : start + count])
+                start += count
+            canvas.polygons(groups)
+        elif function == 0x061C:
+            height, width, bottom, right, top, left = shorts(6)
+            canvas.round_rect(left, top, right, bottom, width, height)
+        elif function in (0x0817, 0x081A, 0x0830):
+            y_end, x_end, y_start, x_start, bottom, right, top, left = shorts(8)
+            kind = {0x0817: "arc", 0x081A: "pie", 0x0830: "chord"}[function]
+            canvas.arc((left, top, right, bottom), (x_start, y_start), (x_end, y_end), kind)
+        elif function == 0x0213:
+            y, x = shorts(2)
+            canvas.line_to([(x, y)])
+        elif function == 0x0214:
+            y, x = shorts(2)
+            canvas.move_to(x, y)
+        elif function == 0x020B:
+            y, x = shorts(2)
+            dc.window_org = (x, y)
+        elif function == 0x020C:
+            y, x = shorts(2)
+            if self.frame is None:
+                self._set_frame((0, 0, abs(x), abs(y)))
+            dc.window_ext = (x, y)
+        elif function == 0x0106:
+            dc.fill_mode = shorts(1)[0]
+        elif function == 0x0104:
+            if shorts(1)[0] != 13:
+                raise _Unsupported(f"ROP2 {shorts(1)[0]}")
+        elif function == 0x0108:
+            if shorts(1)[0]:
+                raise _Unsupported("character spacing")
+        elif function == 0x012E:
+            dc.text_align = struct.unpack_from("<H", params)[0]
+        elif function == 0x0209:
+            dc.text_color = color()
+        elif function == 0x0201:
+            dc.bk_color = color()
+        elif function == 0x001E:
+            canvas.save()
+        elif function == 0x0127:
+            canvas.restore(shorts(1)[0])
+        elif function == 0x012D:
+            canvas.select(struct.unpack_from("<H", params)[0])
+        elif function == 0x01F0:
+            canvas.objects.pop(struct.unpack_from("<H", params)[0], None)
+        elif function == 0x02FA:
+            style, width = struct.unpack_from("<Hh", params)
+            self._add_object(_Pen(style, width, color(6)))
+        elif function == 0x02FC:
+            style = struct.unpack_from("<H", params)[0]
+            self._add_object(_Brush(style, color(2)))
+        elif function == 0x02FB:
+            height, _, escapement, _, weight = shorts(5)
+            italic, underline, strikeout, charset, _, _, _, pitch_family = params[10:18]
+            font = _Font(
+                height,
+                escapement,
+                weight,
+                bool(italic),
+                bool(underline),
+                bool(strikeout),
+                charset,
+                pitch_family,
+            )
+            codec = _CHARSET_CODECS.get(charset, "cp1252")
+            face = params[18:50].split(b"\0", 1)[0].decode(codec, "replace")
+            self._add_object(font._replace(face=face))
+        elif function in (0x00F7, 0x06FF):  # CREATEPALETTE, CREATEREGION: hold a slot
+            self._add_object(None)
+        elif function == 0x0521:
+            count = shorts(1)[0]
+            padded = count + count % 2
+            y, x = shorts(2, 2 + padded)
+            canvas.text(x, y, self._decode(params[2 : 2 + count]))
+        elif function == 0x0A32:
+            self._ext_text(params)
+        elif function in (0x0940, 0x0B41, 0x0F43):
+            self._blit(function, params)
+        else:
+            raise _Unsupported(f"WMF record {function:#06x}")
+
+    def _ext_text(self, params: bytes) -> None:
+        y, x, count, options = struct.unpack_from("<3hH", params)
+        offset = 8
+        rect = None
+        if options & 0x6:  # ETO_OPAQUE or ETO_CLIPPED carry a rectangle
+            left, top, right, bottom = struct.unpack_from("<4h", params, offset)
+            rect = (left, top, right, bottom)
+            offset += 8
+        if options & _ETO_GLYPH_INDEX:
+            raise _Unsupported("glyph-indexed text")
+        string = self._decode(params[offset : offset + count])
+        offset += count + count % 2
+        dx = None
+        if len(params) >= offset + 2 * count:
+            dx = list(struct.unpack_from(f"<{count}h", params, offset))
+        if rect and options & _ETO_OPAQUE:
+            self.canvas.fill_rect(*rect, self.canvas.dc.bk_color)
+        # Byte advances do not map to characters of a double-byte string
+        self.canvas.text(x, y, string, dx if len(string) == count else None)
+
+    def _blit(self, function: int, params: bytes) -> None:
+        rop = struct.unpack_from("<I", params)[0]
+        # The high byte of the function is the record size in words without a bitmap,
+        # less the three-word record header
+        has_bitmap = len(params) != 2 * (function >> 8)
+        if function == 0x0F43:  # STRETCHDIB
+            src_height, src_width, src_y, src_x, height, width, y, x = struct.unpack_from(
+                "<8h", params, 6
+            )
+            dib = params[22:]
+        elif function == 0x0B41:  # DIBSTRETCHBLT
+            src_height, src_width, src_y, src_x = struct.unpack_from("<4h", params, 4)
+            at = 12 if has_bitmap else 14
+            height, width, y, x = struct.unpack_from("<4h", params, at)
+            dib = params[at + 8 :]
+        else:  # DIBBITBLT
+            src_y, src_x = struct.unpack_from("<2h", params, 4)
+            at = 8 if has_bitmap else 10
+            height, width, y, x = struct.unpack_from("<4h", params, at)
+            src_width, src_height = width, height
+            dib = params[at + 8 :]
+        if not has_bitmap and function != 0x0F43:
+            color = {_BLACKNESS: 0x000000, _WHITENESS: 0xFFFFFF}.get(rop)
+            if rop != _PATCOPY and color is None:
+                raise _Unsupported(f"raster operation {rop:#x}")
+            self.canvas.fill_rect(x, y, x + width, y + height, color)
+            return
+        if rop != _SRCCOPY:
+            raise _Unsupported(f"raster operation {rop:#x}")
+        href, w, h = _dib_image(*_dib_split(dib), (src_x, src_y, src_width, src_height))
+        self.canvas.image(x, y, width, height, href, w, h)
+
+
+def metafile_to_svg(data: bytes) -> tuple[str, int, int] | None:
+    """Translate an EMF or WMF picture, optionally gzipped (.emz/.wmz), into SVG.
+
+    Covers the records Office writes for charts, diagrams and logos: paths,
+    polygons, ellipses and arcs, solid pens and brushes, clipping, text and
+    embedded bitmaps, mapping modes and world transforms. Returns the SVG with
+    its size in CSS pixels, or None for anything else (including EMF+-only
+    files and raster operations other than a plain copy), so the caller can
+    fall back to rasterizing the picture with LibreOffice.
+    """
+    try:
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        if data[:4] == b"\x01\0\0\0" and data[40:44] == _EMF_SIGNATURE:
+            return _EmfPlayer(data).play()
+        if len(data) >= 18:
+            return _WmfPlayer(data).play()
+    except Exception:  # _Unsupported, or a truncated or corrupt file
+        return None
+    return None
+
+
+def placeholder_svg(data: bytes) -> tuple[str, int, int]:
+    """A blank stand-in for a picture that could not be converted in time.
+
+    It takes the picture's size from its header (the EMF frame or the WMF
+    placeable bounds) so the slide keeps its layout, else a 4:3 box. Only the
+    header is read, so this is cheap whatever the picture holds.
+    """
+    width, height = 320, 240
+    try:
+        if data[:2] == b"\x1f\x8b":
+            data = zlib.decompressobj(wbits=31).decompress(data, 64)
+        size = None
+        if data[:4] == b"\x01\0\0\0" and data[40:44] == _EMF_SIGNATURE:
+            left, top, right, bottom = struct.unpack_from("<4i", data, 24)
+            size = ((right - left) / 2540 * CSS_DPI, (bottom - top) / 2540 * CSS_DPI)
+        elif struct.unpack_from("<I", data)[0] == _WMF_PLACEABLE_KEY:
+            left, top, right, bottom, inch = struct.unpack_from("<4hH", data, 6)
+            size = ((right - left) * CSS_DPI / inch, (bottom - top) * CSS_DPI / inch)
+        if size and min(size) >= 1:
+            width, height = round(size[0]), round(size[1])
+    except (struct.error, zlib.error, ZeroDivisionError):
+        pass
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}"><rect width="100%" height="100%" fill="#f2f2f2"/></svg>'
+    )
+    return svg, width, height
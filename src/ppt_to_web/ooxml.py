@@ -0,0 +1,290 @@
+import hashlib
+import os
+import posixpath
+import shutil
+import zipfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from lxml import etree
+from PIL import Image as PIL_Image
+from pptx.enum.dml import MSO_FILL
+
+EXTRACTION_ENGINES = ("pptx", "fast")
+
+_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "c": "http://schemas.openxmlformats.org/drawingml/2006/chart",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_OFFICE_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+_SLIDE_LAYOUT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+_CHART_URI = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+_R_ID = f"{{{_NS['r']}}}id"
+_R_EMBED = f"{{{_NS['r']}}}embed"
+# Parts are read and copied in chunks of this size
+CHUNK_SIZE = 1024 * 1024
+# PIL formats as python-pptx's Image.ext names them
+_IMAGE_EXTS = {
+    "BMP": "bmp",
+    "GIF": "gif",
+    "JPEG": "jpg",
+    "PNG": "png",
+    "TIFF": "tiff",
+    "WMF": "wmf",
+}
+
+
+def _qn(tag: str) -> str:
+    prefix, name = tag.split(":")
+    return f"{{{_NS[prefix]}}}{name}"
+
+
+_SP_TREE = _qn("p:spTree")
+_SP, _PIC, _GRAPHIC_FRAME = _qn("p:sp"), _qn("p:pic"), _qn("p:graphicFrame")
+# The spTree children python-pptx exposes as slide.shapes
+_SHAPE_TAGS = {
+    _SP,
+    _PIC,
+    _GRAPHIC_FRAME,
+    _qn("p:grpSp"),
+    _qn("p:cxnSp"),
+    _qn("p:contentPart"),
+}
+# spPr fill elements, typed as python-pptx's FillFormat.type reports them
+_FILL_TYPES = {
+    _qn("a:noFill"): MSO_FILL.BACKGROUND,
+    _qn("a:solidFill"): MSO_FILL.SOLID,
+    _qn("a:gradFill"): MSO_FILL.GRADIENT,
+    _qn("a:blipFill"): MSO_FILL.PICTURE,
+    _qn("a:pattFill"): MSO_FILL.PATTERNED,
+    _qn("a:grpFill"): MSO_FILL.GROUP,
+}
+
+
+class SlideShape(NamedTuple):
+    """One top-level shape of a slide, read straight from the slide XML.
+
+    ``text`` is None for shapes without a text frame and ``fill_type`` is only
+    meaningful when ``has_fill``. Pictures and charts carry the zip member of
+    their image or chart part, None when the reference cannot be resolved.
+    """
+
+    text: str | None = None
+    has_fill: bool = False
+    fill_type: MSO_FILL | None = None
+    is_picture: bool = False
+    image_part: str | None = None
+    has_chart: bool = False
+    chart_part: str | None = None
+    width: int = 0
+    crop_left: float = 0.0
+    crop_right: float = 0.0
+
+
+class PackagePart(NamedTuple):
+    """A zip member of a .pptx, read from the archive only when needed.
+
+    It holds no content, so it is cheap to keep for every picture of a deck
+    and to send to worker processes, which open the archive themselves.
+    """
+
+    archive: str
+    name: str
+    size: int
+
+    @contextmanager
+    def open(self):
+        with zipfile.ZipFile(self.archive) as archive, archive.open(self.name) as stream:
+            yield stream
+
+    def read(self) -> bytes:
+        with self.open() as stream:
+            return stream.read()
+
+    def copy_to(self, target: Path) -> None:
+        """Write the part to ``target`` in chunks, never holding it in memory whole."""
+        temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with self.open() as stream, open(temp, "wb") as f:
+            shutil.copyfileobj(stream, f, CHUNK_SIZE)
+        os.replace(temp, target)
+
+    def image_ext(self) -> str:
+        """The part's image type as ``pptx.parts.image.Image.ext`` reports it.
+
+        Only the image header is decoded, from the compressed stream.
+        """
+        with self.open() as stream, PIL_Image.open(stream) as image:
+            image_format = image.format
+        if image_format not in _IMAGE_EXTS:
+            raise ValueError(f"unsupported image format: {image_format}")
+        return _IMAGE_EXTS[image_format]
+
+
+def _percentage(value: str | None) -> float:
+    if not value:
+        return 0.0
+    if value.endswith("%"):
+        return float(value[:-1]) / 100
+    return int(value) / 100000
+
+
+def _shape_text(sp) -> str:
+    # Runs only, as python-pptx's paragraph.runs: fields and breaks are skipped
+    return "\n".join(
+        run.findtext("a:t", default="", namespaces=_NS)
+        for run in sp.iterfind("p:txBody/a:p/a:r", _NS)
+    )
+
+
+def _fill_type(sp) -> MSO_FILL | None:
+    sp_pr = sp.find("p:spPr", _NS)
+    if sp_pr is None:
+        return None
+    for child in sp_pr:
+        if child.tag in _FILL_TYPES:
+            return _FILL_TYPES[child.tag]
+    return None
+
+
+class OoxmlPackage:
+    """A read-only .pptx opened as a zip, resolving parts through their relationships.
+
+    Slides are parsed without python-pptx's object model: each slide part is
+    streamed through ``lxml.etree.iterparse`` once, and every top-level shape
+    is reduced to a ``SlideShape`` and cleared as soon as it has been read.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = str(path)
+        self._zip = zipfile.ZipFile(path)
+        self._rels = lru_cache(maxsize=None)(self._read_rels)
+        self._layout_name = lru_cache(maxsize=None)(self._read_layout_name)
+
+    def __enter__(self) -> "OoxmlPackage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def read(self, part: str) -> bytes:
+        return self._zip.read(part)
+
+    def part(self, name: str) -> PackagePart:
+        """A handle reading the member ``name`` on demand, instead of its bytes."""
+        return PackagePart(self._path, name, self._zip.getinfo(name).file_size)
+
+    def _read_rels(self, part: str) -> dict[str, tuple[str, str, bool]]:
+        """Map rId to ``(type, target, is_external)``; internal targets are zip members."""
+        directory, name = posixpath.split(part)
+        rels_name = posixpath.join(directory, "_rels", f"{name}.rels")
+        try:
+            root = etree.fromstring(self._zip.read(rels_name))
+        except KeyError:
+            return {}
+        rels = {}
+        for rel in root.iterfind("pr:Relationship", _NS):
+            target = rel.get("Target")
+            external = rel.get("TargetMode") == "External"
+            if not external:
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join(directory, target))
+            rels[rel.get("Id")] = (rel.get("Type"), target, external)
+        return rels
+
+    def _target(self, part: str, r_id: str | None) -> str | None:
+        rel = self._rels(part).get(r_id) if r_id else None
+        return rel[1] if rel and not rel[2] else None
+
+    def slide_parts(self) -> list[str]:
+        """Zip members of the slides, in presentation order."""
+        presentation = next(
+            target
+            for rel_type, target, _ in self._rels("").values()
+            if rel_type == _OFFICE_DOCUMENT
+        )
+        root = etree.fromstring(self._zip.read(presentation))
+        return [
+            self._target(presentation, slide_id.get(_R_ID))
+            for slide_id in root.iterfind("p:sldIdLst/p:sldId", _NS)
+        ]
+
+    def layout_name(self, slide_part: str) -> str:
+        for rel_type, target, external in self._rels(slide_part).values():
+            if rel_type == _SLIDE_LAYOUT and not external:
+                return self._layout_name(target)
+        return ""
+
+    def _read_layout_name(self, layout_part: str) -> str:
+        c_sld = etree.fromstring(self._zip.read(layout_part)).find("p:cSld", _NS)
+        return c_sld.get("name", "") if c_sld is not None else ""
+
+    def fingerprint(self, slide_part: str) -> str:
+        """Hash a slide's XML together with every part it relates to."""
+        digest = hashlib.sha256(self._zip.read(slide_part))
+        for r_id, (_, target, external) in sorted(self._rels(slide_part).items()):
+            if external:
+                digest.update(f"{r_id}:{target}".encode("utf-8"))
+            else:
+                digest.update(r_id.encode("utf-8"))
+                with self._zip.open(target) as stream:
+                    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def slide_shapes(self, slide_part: str) -> list[SlideShape]:
+        """Read a slide's top-level shapes in document order in one streaming pass."""
+        shapes = []
+        with self._zip.open(slide_part) as stream:
+            for _, element in etree.iterparse(stream, events=("end",), tag=_SHAPE_TAGS):
+                parent = element.getparent()
+                if parent is None or parent.tag != _SP_TREE:
+                    continue
+                shapes.append(self._read_shape(slide_part, element))
+                # Drop the shapes already read so memory stays bounded by one shape
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+        return shapes
+
+    def _read_shape(self, slide_part: str, element) -> SlideShape:
+        if element.tag == _SP:
+            return SlideShape(
+                text=_shape_text(element), has_fill=True, fill_type=_fill_type(element)
+            )
+        if element.tag == _PIC:
+            if element.find("p:nvPicPr/p:nvPr/a:videoFile", _NS) is not None:
+                return SlideShape()  # a movie, which has no image
+            blip = element.find("p:blipFill/a:blip", _NS)
+            r_embed = blip.get(_R_EMBED) if blip is not None else None
+            src_rect = element.find("p:blipFill/a:srcRect", _NS)
+            ext = element.find("p:spPr/a:xfrm/a:ext", _NS)
+            return SlideShape(
+                is_picture=True,
+                image_part=self._target(slide_part, r_embed),
+                width=int(ext.get("cx", 0)) if ext is not None else 0,
+                crop_left=_percentage(src_rect.get("l")) if src_rect is not None else 0.0,
+                crop_right=_percentage(src_rect.get("r")) if src_rect is not None else 0.0,
+            )
+        if element.tag == _GRAPHIC_FRAME:
+            graphic_data = element.find("a:graphic/a:graphicData", _NS)
+            if graphic_data is not None and graphic_data.get("uri") == _CHART_URI:
+                chart = graphic_data.find("c:chart", _NS)
+                return SlideShape(
+                    has_chart=True,
+                    chart_part=self._target(
+                        slide_part, chart.get(_R_ID) if chart is not None else None
+                    )
+                )
+        return SlideShape()
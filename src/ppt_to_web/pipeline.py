@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from jinja2 import Environment
+
+from .intermediate import INTERMEDIATE_FORMATS, dump_deck
+from .ppt_to_yaml import extract_deck
+from .profiling import Profiler
+from .yaml_to_html import render_deck
+
+
+def ppt_to_html(
+    pptx_path: str,
+    output_dir: str,
+    template_name: str = "index.html",
+    output_filename: str | None = None,
+    intermediate_format: str | None = None,
+    env: Environment | None = None,
+    profiler: Profiler | None = None,
+    asset_mode: str = "cdn",
+    echarts_path: str | None = None,
+    hash_names: bool = False,
+    precompress: bool = False,
+    **extract_options,
+) -> str:
+    """Convert a deck straight to HTML, handing the extracted data over in memory.
+
+    The intermediate file is only written when ``intermediate_format`` is given;
+    it is never read back. ``extract_options`` are passed to ``extract_deck``.
+    """
+    profiler = profiler or Profiler()
+    data = extract_deck(pptx_path, output_dir, profiler=profiler, **extract_options)
+    if intermediate_format:
+        extension = INTERMEDIATE_FORMATS[intermediate_format]
+        with profiler.stage("dump"):
+            dump_deck(data, Path(output_dir) / f"{Path(pptx_path).stem}{extension}")
+
+    # Media was extracted into output_dir/media, which is already where the
+    # page expects it, so there is nothing to copy.
+    return render_deck(
+        data,
+        None,
+        output_dir,
+        template_name,
+        output_filename=output_filename,
+        env=env,
+        profiler=profiler,
+        asset_mode=asset_mode,
+        echarts_path=echarts_path,
+        hash_names=hash_names,
+        precompress=precompress,
+    )
@@ -1,9 +1,50 @@
-import subprocess
+import shutil
+from collections import Counter
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from typing import NamedTuple
 
-import yaml
 from pptx import Presentation
+from pptx.chart.chart import Chart
 from pptx.enum.chart import XL_CHART_TYPE
+from pptx.oxml import parse_xml
+from pptx.parts.image import Image as PptxImage
+
+from .budget import TIMED_OUT, DeckBudget, map_with_deadlines
+from .cache import MediaCache
+from .charts import DEFAULT_MAX_CHART_POINTS, downsample_chart
+from .images import (
+    LOSSY_SOURCE_FORMATS,
+    ImageOptions,
+    apply_encoding,
+    choose_format,
+    probe_size,
+    target_width,
+    trim_border,
+    write_variants,
+)
+from .incremental import (
+    load_manifest,
+    manifest_path_for,
+    reusable_slides,
+    slide_fingerprint,
+    write_manifest,
+)
+from .intermediate import (
+    INTERMEDIATE_FORMATS,
+    STREAM_FORMATS,
+    assemble_deck,
+    dump_deck,
+    dump_deck_stream,
+)
+from .libreoffice import LibreOfficePool
+from .metafile import metafile_to_svg, placeholder_svg
+from .ooxml import EXTRACTION_ENGINES, OoxmlPackage, PackagePart, SlideShape
+from .profiling import Profiler
 
 
 def _extract_text_from_shape(shape) -> str:
@@ -79,17 +120,34 @@ def _extract_chart_categories(chart) -> list[str]:
     return []
 
 
+def _series_values(series) -> list[float]:
+    """Read a series' cached values in one pass, with 0 for missing points.
+
+    python-pptx's ``series.values`` runs an XPath query per point, which takes
+    quadratic time on long series; this walks the ``c:pt`` elements once.
+    """
+    ser = series._element
+    source = ser.val if ser.val is not None else ser.yVal
+    if source is None:
+        return []
+    values = [0] * source.ptCount_val
+    # Reversed so the first of duplicate points wins, as with python-pptx
+    for pt in reversed(source.xpath(".//c:pt")):
+        idx = int(pt.get("idx"))
+        if idx < len(values):
+            values[idx] = float(pt.value)
+    return values
+
+
 def _extract_chart_series(chart) -> list[dict]:
     """Extract series data from chart."""
     series_data = []
     for idx, series in enumerate(chart.series):
         series_name = str(series.name) if series.name else f"Series {idx + 1}"
-        series_values = []
         try:
-            if series.values:
-                series_values = [float(v) if v is not None else 0 for v in series.values]
+            series_values = _series_values(series)
         except Exception:
-            pass
+            series_values = []
         series_data.append({"name": series_name, "data": series_values})
     return series_data
 
@@ -101,69 +159,67 @@ HORIZONTAL_BAR_TYPES = {
 }
 
 
-def _extract_chart(shape, slide_idx: int, shape_idx: int) -> dict | None:
-    """Extract chart data from a shape containing a chart."""
+def _extract_chart(
+    shape, slide_idx: int, shape_idx: int, max_points: int = DEFAULT_MAX_CHART_POINTS
+) -> dict | None:
+    """Extract chart data from a shape containing a chart.
+
+    Line and scatter series longer than ``max_points`` are downsampled.
+    """
     if not shape.has_chart:
         return None
 
     try:
-        chart = shape.chart
-        chart_type_enum = chart.chart_type
-
-        series_data = _extract_chart_series(chart)
-        if not series_data or all(not s["data"] for s in series_data):
-            return None
-
-        return {
-            "type": "chart",
-            "chart_type": _map_chart_type(chart_type_enum),
-            "title": _extract_chart_title(chart),
-            "categories": _extract_chart_categories(chart),
-            "series": series_data,
-            "is_stacked": "STACKED" in chart_type_enum.name,
-            "is_horizontal": chart_type_enum in HORIZONTAL_BAR_TYPES,
-            "is_area": "AREA" in chart_type_enum.name,
-            "chart_id": f"chart_{slide_idx}_{shape_idx}",
-        }
-
+        return _chart_data(shape.chart, slide_idx, shape_idx, max_points)
     except Exception as e:
         print(f"Warning: Failed to extract chart from slide {slide_idx}, shape {shape_idx}: {e}")
         return None
 
 
-def _convert_with_libreoffice(input_path: Path, output_dir: Path) -> Path | None:
-    """Convert image using LibreOffice (best for WMF/EMF)."""
-    try:
-        result = subprocess.run(
-            [
-                "soffice",
-                "--headless",
-                "--convert-to", "png",
-                "--outdir", str(output_dir),
-                str(input_path),
-            ],
-            capture_output=True,
-            timeout=60,
-        )
-        if result.returncode == 0:
-            output_path = output_dir / f"{input_path.stem}.png"
-            if output_path.exists():
-                return output_path
-    except Exception:
-        pass
-    return None
+def _chart_data(chart, slide_idx: int, shape_idx: int, max_points: int) -> dict | None:
+    """Build the chart entry for a python-pptx ``Chart``, or None when it has no data."""
+    chart_type_enum = chart.chart_type
+
+    series_data = _extract_chart_series(chart)
+    if not series_data or all(not s["data"] for s in series_data):
+        return None
+
+    chart_data = {
+        "type": "chart",
+        "chart_type": _map_chart_type(chart_type_enum),
+        "title": _extract_chart_title(chart),
+        "categories": _extract_chart_categories(chart),
+        "series": series_data,
+        "is_stacked": "STACKED" in chart_type_enum.name,
+        "is_horizontal": chart_type_enum in HORIZONTAL_BAR_TYPES,
+        "is_area": "AREA" in chart_type_enum.name,
+        "chart_id": f"chart_{slide_idx}_{shape_idx}",
+    }
+    return downsample_chart(chart_data, max_points)
+
+
+def _out_of_time(budget: DeckBudget | None, slide_idx: int, shape_idx: int) -> bool:
+    """Whether the deck's budget ran out before a chart, recording the chart as left out."""
+    if budget is None or not budget.expired():
+        return False
+    chart = {"chart_id": f"chart_{slide_idx}_{shape_idx}"}
+    budget.degrade(chart, "chart", "omitted", slide_idx + 1)
+    return True
 
 
 def _get_image_dimensions(filepath: Path) -> tuple[int, int, float]:
-    """Get image dimensions using wand or return defaults."""
+    """Get image dimensions from the file header, else using wand, or return defaults."""
     width, height, aspect_ratio = 0, 0, 1.0
     try:
-        from wand.image import Image as WandImage
-        with WandImage(filename=str(filepath)) as img:
-            width = img.width
-            height = img.height
-            if height > 0:
-                aspect_ratio = width / height
+        size = probe_size(filepath)
+        if size is None:
+            from wand.image import Image as WandImage
+
+            with WandImage(filename=str(filepath)) as img:
+                size = img.width, img.height
+        width, height = size
+        if height > 0:
+            aspect_ratio = width / height
     except Exception:
         pass
     return width, height, aspect_ratio
@@ -171,6 +227,13 @@ def _get_image_dimensions(filepath: Path) -> tuple[int, int, float]:
 
 WEB_IMAGE_FORMATS = ("png", "jpg", "jpeg", "gif", "webp")
 VECTOR_IMAGE_FORMATS = ("wmf", "emf", "wmz", "emz")
+# Part of every media cache key; change it whenever image processing changes
+MEDIA_CACHE_PARAMS = ("trim=corner", "format=png", "vector=svg")
+# Slides whose media iter_slides processes together, sharing one LibreOffice batch
+STREAM_WINDOW = 8
+# Flags a media result whose file is a staged source awaiting LibreOffice; the
+# media stage removes it before results reach the slide data
+_NEEDS_CONVERSION = "needs_conversion"
 
 
 def _make_media_result(path: str, width: int = 0, height: int = 0) -> dict:
@@ -179,71 +242,253 @@ def _make_media_result(path: str, width: int = 0, height: int = 0) -> dict:
     return {"path": path, "width": width, "height": height, "aspect_ratio": aspect_ratio}
 
 
-def _process_web_image(image_bytes: bytes, output_path: Path) -> dict | None:
-    """Process web-compatible image formats using Wand."""
+def _media_params(image_options: ImageOptions) -> tuple[str, ...]:
+    return MEDIA_CACHE_PARAMS + image_options.cache_params()
+
+
+def _process_web_image(
+    image_bytes: bytes | PackagePart,
+    output_path: Path,
+    image_options: ImageOptions = ImageOptions(),
+    source_ext: str = "png",
+    max_width: int | None = None,
+) -> dict | None:
+    """Process web-compatible image formats using Wand, writing responsive variants.
+
+    The blob is decoded once: images wider than ``max_width`` are resampled
+    before anything else runs, and JPEGs are decoded at a reduced scale to
+    begin with. The suffix of ``output_path`` is replaced by the encoding
+    ``choose_format`` picks, and the dimensions come from the encoded image.
+    A ``PackagePart`` is read here, in the worker, and released once decoded.
+    """
     try:
         from wand.image import Image as WandImage
-        from wand.color import Color
 
-        with WandImage(blob=image_bytes) as img:
-            img.trim(color=Color('white'), fuzz=0)
-            img.trim(fuzz=0)
-            img.format = 'png'
+        with WandImage() as img:
+            if max_width and source_ext in LOSSY_SOURCE_FORMATS:
+                # Lets libjpeg skip DCT scales the output will never need
+                img.options["jpeg:size"] = f"{max_width}x{max_width}"
+            img.read(blob=_read_blob(image_bytes))
+            if max_width and img.width > max_width:
+                img.resize(max_width, max(1, round(img.height * max_width / img.width)))
+            trim_border(img)
+            fmt = choose_format(img, source_ext, image_options)
+            apply_encoding(img, fmt, image_options)
+            output_path = output_path.with_suffix(f".{fmt}")
             img.save(filename=str(output_path))
-            return _make_media_result(f"media/{output_path.name}", img.width, img.height)
+            result = _make_media_result(f"media/{output_path.name}", img.width, img.height)
+            variants = write_variants(img, output_path, image_options)
+            if variants:
+                result["variants"] = variants
+            return result
     except Exception:
         return None
 
 
 def _process_vector_image(
-    image_bytes: bytes, ext: str, slide_idx: int, shape_idx: int, media_dir: Path
+    image_bytes: bytes | PackagePart,
+    ext: str,
+    slide_idx: int,
+    shape_idx: int,
+    media_dir: Path,
+    translate: bool = True,
 ) -> dict:
-    """Process vector image formats (WMF/EMF) using LibreOffice."""
-    temp_filename = f"slide_{slide_idx}_shape_{shape_idx}.{ext}"
-    temp_filepath = media_dir / temp_filename
-    png_filename = f"slide_{slide_idx}_shape_{shape_idx}.png"
+    """Translate a vector image (WMF/EMF) to SVG, else stage it for LibreOffice.
 
-    with open(temp_filepath, "wb") as f:
-        f.write(image_bytes)
+    ``metafile_to_svg`` covers the records Office writes for charts and logos.
+    Anything else, including rasters browsers cannot show (TIFF, BMP) and those
+    Wand failed on, or everything without ``translate``, is written to the media
+    directory as-is and flagged; ``_convert_vector_media`` later swaps in the
+    PNG once the batch completes.
+    """
+    if translate and ext in VECTOR_IMAGE_FORMATS:
+        converted = metafile_to_svg(_read_blob(image_bytes))
+        if converted:
+            svg, width, height = converted
+            filename = f"slide_{slide_idx}_shape_{shape_idx}.svg"
+            (media_dir / filename).write_text(svg, encoding="utf-8")
+            return _make_media_result(f"media/{filename}", width, height)
 
-    converted = _convert_with_libreoffice(temp_filepath, media_dir)
-    if converted and converted.exists():
-        temp_filepath.unlink(missing_ok=True)
-        width, height, aspect_ratio = _get_image_dimensions(converted)
-        return _make_media_result(f"media/{png_filename}", width, height)
+    filename = f"slide_{slide_idx}_shape_{shape_idx}.{ext}"
+    _write_blob(image_bytes, media_dir / filename)
+    return {**_make_media_result(f"media/{filename}"), _NEEDS_CONVERSION: True}
 
-    print(f"Warning: LibreOffice conversion failed for slide {slide_idx}, shape {shape_idx}")
-    return _make_media_result(f"media/{temp_filename}")
 
+def _write_placeholder(source: Path, item: dict) -> None:
+    """Replace a vector source that ran out of time with a blank SVG of its size."""
+    svg, width, height = placeholder_svg(source.read_bytes())
+    target = source.with_suffix(".svg")
+    target.write_text(svg, encoding="utf-8")
+    source.unlink(missing_ok=True)
+    item.update(_make_media_result(f"media/{target.name}", width, height))
 
-def _extract_media(
-    shape, slide_idx: int, shape_idx: int, media_dir: Path
-) -> dict | None:
-    """Extract and process media from a shape."""
+
+def _convert_vector_media(
+    media_results: list[dict],
+    media_dir: Path,
+    converter: LibreOfficePool,
+    budget: DeckBudget | None = None,
+) -> list[dict]:
+    """Convert every media result flagged as a staged source in one batch.
+
+    Converted and placeholder results lose the flag; failures keep it. With a
+    ``budget``, sources LibreOffice did not convert in time are replaced by
+    placeholders; those results are returned.
+    """
+    items = [item for item in media_results if item.get(_NEEDS_CONVERSION)]
+    if not items:
+        return []
+
+    sources = [media_dir / Path(item["path"]).name for item in items]
+    converted = converter.convert(sources, media_dir, budget=budget)
+    late = []
+    for item, source in zip(items, sources):
+        png_path = converted.get(source)
+        if png_path is None and budget is not None and budget.ran_out(source):
+            _write_placeholder(source, item)
+            del item[_NEEDS_CONVERSION]
+            late.append(item)
+            continue
+        if png_path is None:
+            print(f"Warning: LibreOffice conversion failed for {source.name}")
+            continue
+        if source != png_path:  # a PNG Wand failed on is converted in place
+            source.unlink(missing_ok=True)
+        width, height, _ = _get_image_dimensions(png_path)
+        del item[_NEEDS_CONVERSION]
+        item.update(_make_media_result(f"media/{png_path.name}", width, height))
+    return late
+
+
+class _MediaTask(NamedTuple):
+    """An image collected during the slide walk, processed in the media stage.
+
+    In low-memory mode ``blob`` is the ``PackagePart`` holding the image, read
+    only while it is hashed, decoded or copied.
+    """
+
+    slide_idx: int
+    shape_idx: int
+    blob: bytes | PackagePart
+    ext: str
+    item: dict
+    display_width: int = 0
+    visible_fraction: float = 1.0
+
+
+def _read_blob(blob: bytes | PackagePart) -> bytes:
+    return blob.read() if isinstance(blob, PackagePart) else blob
+
+
+def _write_blob(blob: bytes | PackagePart, path: Path) -> None:
+    """Write an image unchanged, streaming it from the archive when it is a part."""
+    if isinstance(blob, PackagePart):
+        blob.copy_to(path)
+    else:
+        with open(path, "wb") as f:
+            f.write(blob)
+
+
+def _blob_size(blob: bytes | PackagePart) -> int:
+    return blob.size if isinstance(blob, PackagePart) else len(blob)
+
+
+def _blob_key(cache: MediaCache, blob: bytes | PackagePart, *params: str) -> str:
+    if isinstance(blob, PackagePart):
+        with blob.open() as stream:
+            return cache.stream_key(stream, *params)
+    return cache.key(blob, *params)
+
+
+def _collect_media(shape, slide_idx: int, shape_idx: int) -> _MediaTask | None:
+    """Read a picture's blob and reserve its slot in the slide's media list."""
     if not hasattr(shape, "image"):
         return None
 
     try:
-        image_bytes = shape.image.blob
-        ext = shape.image.ext.lower()
-        png_filename = f"slide_{slide_idx}_shape_{shape_idx}.png"
-        png_filepath = media_dir / png_filename
+        image = shape.image
+        return _MediaTask(
+            slide_idx,
+            shape_idx,
+            image.blob,
+            image.ext.lower(),
+            {"type": "image"},
+            *_display_extent(shape),
+        )
+    except Exception as e:
+        print(f"Warning: Failed to extract media from slide {slide_idx}, shape {shape_idx}: {e}")
+        return None
+
+
+def _display_extent(shape) -> tuple[int, float]:
+    """Return a picture's on-slide width in EMU and the fraction cropping leaves visible."""
+    try:
+        visible = 1.0 - shape.crop_left - shape.crop_right
+        return int(shape.width or 0), visible if visible > 0 else 1.0
+    except (AttributeError, TypeError):
+        return 0, 1.0
+
+
+def _map_jobs(
+    func,
+    arg_lists: list[tuple],
+    jobs: int,
+    budget: DeckBudget | None = None,
+    executor: ProcessPoolExecutor | None = None,
+) -> list:
+    """Apply ``func`` to each argument tuple, in a process pool when ``jobs > 1``.
+
+    ``executor`` is a pool to reuse instead of starting one for this call. A
+    ``budget`` with limits always uses its own worker processes, even for one
+    job, so stragglers can be killed (``map_with_deadlines``); their results
+    are ``TIMED_OUT``.
+    """
+    if budget is not None and budget.limited and arg_lists:
+        return map_with_deadlines(func, arg_lists, jobs, budget)
+    if jobs <= 1 or len(arg_lists) <= 1:
+        return [func(*args) for args in arg_lists]
+    if executor is not None:
+        return list(executor.map(func, *zip(*arg_lists)))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(arg_lists))) as pool:
+        return list(pool.map(func, *zip(*arg_lists)))
+
+
+def _finish_media(
+    task: _MediaTask, result, media_dir: Path, budget: DeckBudget | None = None
+) -> dict | None:
+    """Resolve a task after Wand ran, falling back to vector staging or the raw file.
+
+    Out of time, a web image Wand did not finish is written unchanged and a
+    vector image is staged without translating it; ``budget`` records the former.
+    """
+    slide_idx, shape_idx, image_bytes, ext = task.slide_idx, task.shape_idx, task.blob, task.ext
+    png_filepath = media_dir / f"slide_{slide_idx}_shape_{shape_idx}.png"
+
+    try:
+        if result is TIMED_OUT:
+            filename = f"slide_{slide_idx}_shape_{shape_idx}.{ext}"
+            _write_blob(image_bytes, media_dir / filename)
+            # Header sizes only: decoding is what ran out of time
+            size = probe_size(media_dir / filename) or (0, 0)
+            result = _make_media_result(f"media/{filename}", *size)
+            budget.degrade(result, "image", "original", slide_idx + 1)
+            return result
 
-        # Try Wand for web-compatible formats
         if ext in WEB_IMAGE_FORMATS:
-            result = _process_web_image(image_bytes, png_filepath)
             if result:
                 return result
             print(f"Warning: Wand processing failed for slide {slide_idx}, shape {shape_idx}")
 
-        # Try LibreOffice for vector formats or if Wand failed
+        # Stage for LibreOffice for vector formats or if Wand failed
         if ext in VECTOR_IMAGE_FORMATS or not png_filepath.exists():
-            return _process_vector_image(image_bytes, ext, slide_idx, shape_idx, media_dir)
+            translate = budget is None or not budget.expired()
+            return _process_vector_image(
+                image_bytes, ext, slide_idx, shape_idx, media_dir, translate
+            )
 
         # Fallback: save original format
         filename = f"slide_{slide_idx}_shape_{shape_idx}.{ext}"
-        with open(media_dir / filename, "wb") as f:
-            f.write(image_bytes)
+        _write_blob(image_bytes, media_dir / filename)
         return _make_media_result(f"media/{filename}")
 
     except Exception as e:
@@ -251,86 +496,654 @@ def _extract_media(
         return None
 
 
-def ppt_to_yaml(pptx_path: str, yaml_output_dir: str) -> str:
+def _restore_cached(cached: dict, task: _MediaTask, media_dir: Path) -> dict:
+    stem = f"slide_{task.slide_idx}_shape_{task.shape_idx}"
+    filename = f"{stem}{cached['file'].suffix}"
+    shutil.copyfile(cached["file"], media_dir / filename)
+    result = _make_media_result(f"media/{filename}", cached["width"], cached["height"])
+    if cached["variants"]:
+        for variant in cached["variants"]:
+            if variant["file"] != cached["file"]:
+                shutil.copyfile(variant["file"], media_dir / f"{stem}{variant['suffix']}")
+        result["variants"] = [
+            {"path": f"media/{stem}{v['suffix']}", "width": v["width"], "type": v["type"]}
+            for v in cached["variants"]
+        ]
+    return result
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _report_savings(
+    processed: list[tuple[_MediaTask, dict]],
+    media_dir: Path,
+    profiler: Profiler,
+    savings: Counter | None = None,
+) -> None:
+    """Count and print embedded image bytes against the bytes written for them.
+
+    With ``savings`` the bytes are added to it instead of printed, for callers
+    reporting once over several batches.
+    """
+    if not processed:
+        return
+    bytes_in = sum(_blob_size(task.blob) for task, _ in processed)
+    bytes_out = 0
+    for _, result in processed:
+        path = media_dir / Path(result["path"]).name
+        bytes_out += path.stat().st_size if path.exists() else 0
+    profiler.count("image_bytes_in", bytes_in)
+    profiler.count("image_bytes_out", bytes_out)
+    if savings is not None:
+        savings.update(bytes_in=bytes_in, bytes_out=bytes_out)
+    else:
+        _print_savings(bytes_in, bytes_out)
+
+
+def _print_savings(bytes_in: int, bytes_out: int) -> None:
+    saved = bytes_in - bytes_out
+    print(
+        f"Images: {_format_size(bytes_in)} embedded, {_format_size(bytes_out)} written "
+        f"({_format_size(abs(saved))} {'saved' if saved >= 0 else 'added'})"
+    )
+
+
+def _print_degradations(budget: DeckBudget | None) -> None:
+    if budget is None or not budget.degradations:
+        return
+    for entry in budget.degradations:
+        outcome = (
+            "was left out"
+            if entry["fallback"] == "omitted"
+            else f"fell back to the {entry['fallback']}"
+        )
+        print(
+            f"Warning: {entry['path']} on slide {entry['slide']} {outcome} "
+            f"({entry['reason']} reached in the {entry['stage']} stage)"
+        )
+    print(f"Time budget: {len(budget.degradations)} item(s) degraded")
+
+
+def _process_media(
+    tasks: list[_MediaTask],
+    media_dir: Path,
+    jobs: int = 1,
+    converter: LibreOfficePool | None = None,
+    cache: MediaCache | None = None,
+    profiler: Profiler | None = None,
+    image_options: ImageOptions | None = None,
+    processed: dict[str, dict | None] | None = None,
+    savings: Counter | None = None,
+    budget: DeckBudget | None = None,
+    executor: ProcessPoolExecutor | None = None,
+    save_cache: bool = True,
+) -> list[_MediaTask]:
+    """Process each distinct image once and fill in every media item showing it.
+
+    Images are grouped by content hash and target width (``target_width``);
+    the first occurrence of each group is restored from ``cache`` or processed
+    (Wand, then batched LibreOffice for vector art) and every occurrence
+    shares the resulting files. ``processed`` carries results across calls on
+    the same ``media_dir`` and is updated in place, so pictures repeated on
+    later slides reuse the earlier files. Returns the tasks that produced
+    nothing so their placeholders can be dropped.
+
+    ``budget`` bounds the time spent: images not processed in time get the
+    fallbacks of ``_finish_media`` and ``_convert_vector_media``, carry a
+    ``degraded`` entry and are not cached, so a later run tries them again.
+
+    Callers processing a deck in several batches pass a shared process pool as
+    ``executor`` and ``save_cache=False``, saving ``cache`` once at the end.
+    """
+    if cache is None:
+        cache = MediaCache()
+    profiler = profiler or Profiler()
+    image_options = image_options or ImageOptions()
+
+    groups: dict[str, list[_MediaTask]] = {}
+    widths: dict[str, int | None] = {}
+    for task in tasks:
+        width = None
+        if task.ext in WEB_IMAGE_FORMATS:
+            width = target_width(task.display_width, task.visible_fraction, image_options)
+        # The same picture shown at different sizes is resampled separately
+        key = _blob_key(
+            cache, task.blob, task.ext, f"width={width}", *_media_params(image_options)
+        )
+        groups.setdefault(key, []).append(task)
+        widths[key] = width
+
+    profiler.count("images", len(tasks))
+    profiler.count("duplicate_images", len(tasks) - len(groups))
+
+    processed = {} if processed is None else processed
+    earlier = {key for key in groups if key in processed}
+    results: dict[str, dict | None] = {key: processed[key] for key in earlier}
+    pending: dict[str, _MediaTask] = {}
+    with profiler.stage("media.cache_lookup"):
+        for key, group in groups.items():
+            if key in earlier:
+                continue
+            cached = cache.get(key)
+            if cached:
+                results[key] = _restore_cached(cached, group[0], media_dir)
+            else:
+                pending[key] = group[0]
+    profiler.count("cache_hits", len(groups) - len(pending))
+    profiler.count("cache_misses", len(pending))
+
+    web = [(key, task) for key, task in pending.items() if task.ext in WEB_IMAGE_FORMATS]
+    with profiler.stage("media.wand"):
+        web_results = _map_jobs(
+            _process_web_image,
+            [
+                (
+                    task.blob,
+                    media_dir / f"slide_{task.slide_idx}_shape_{task.shape_idx}.png",
+                    image_options,
+                    task.ext,
+                    widths[key],
+                )
+                for key, task in web
+            ],
+            jobs,
+            budget,
+            executor,
+        )
+    web_by_key = {key: result for (key, _), result in zip(web, web_results)}
+    # Web images Wand did not process are written as the raw blob
+    unprocessed = {key for key, _ in web if not web_by_key[key]}
+    with profiler.stage("media.fallback"):
+        for key, task in pending.items():
+            results[key] = _finish_media(task, web_by_key.get(key), media_dir, budget)
+
+    staged = [results[key] for key in pending if results[key]]
+    profiler.count("vector_svg", sum(r["path"].endswith(".svg") for r in staged))
+    profiler.count("vector_conversions", sum(bool(r.get(_NEEDS_CONVERSION)) for r in staged))
+    with profiler.stage("media.libreoffice"):
+        if converter is None:
+            with LibreOfficePool(size=jobs) as pool:
+                late = _convert_vector_media(staged, media_dir, pool, budget)
+        else:
+            late = _convert_vector_media(staged, media_dir, converter, budget)
+    late_ids = {id(item) for item in late}
+    for key, task in pending.items():
+        if id(results[key]) in late_ids:
+            budget.degrade(results[key], "vector", "placeholder", task.slide_idx + 1)
+    profiler.count("degraded_images", sum(bool(r.get("degraded")) for r in staged))
+
+    with profiler.stage("media.cache_store"):
+        for key in pending:
+            result = results[key]
+            # Unconverted vector sources, raw blobs and fallbacks are not cached
+            # so a later run can retry them
+            if (
+                result
+                and key not in unprocessed
+                and not result.get(_NEEDS_CONVERSION)
+                and not result.get("degraded")
+            ):
+                path = media_dir / Path(result["path"]).name
+                variants = [
+                    {**variant, "file": media_dir / Path(variant["path"]).name}
+                    for variant in result.get("variants", [])
+                ]
+                cache.put(key, path, result["width"], result["height"], variants)
+        if save_cache:
+            cache.save()
+    for result in staged:
+        result.pop(_NEEDS_CONVERSION, None)
+
+    processed.update(results)
+    _report_savings(
+        [
+            (group[0], results[key])
+            for key, group in groups.items()
+            if results[key] and key not in earlier
+        ],
+        media_dir,
+        profiler,
+        savings,
+    )
+
+    failed = []
+    for key, group in groups.items():
+        for task in group:
+            if results[key]:
+                task.item.update(results[key])
+            else:
+                failed.append(task)
+    return failed
+
+
+def _new_slide_data(slide_idx: int, layout: str) -> dict:
+    return {
+        "slide_number": slide_idx + 1,
+        "title": "",
+        "content": [],
+        "media": [],
+        "is_highlighted": False,
+        "layout": layout,
+    }
+
+
+def _collect_slide(
+    slide,
+    slide_idx: int,
+    tasks: list[_MediaTask],
+    profiler: Profiler | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    budget: DeckBudget | None = None,
+) -> dict:
+    """Extract a slide's text and charts, queueing its pictures onto ``tasks``.
+
+    Charts reached after ``budget`` has run out are left out unread.
+    """
+    profiler = profiler or Profiler()
+    slide_data = _new_slide_data(
+        slide_idx, slide.slide_layout.name if slide.slide_layout else ""
+    )
+
+    for shape_idx, shape in enumerate(slide.shapes):
+        if shape.has_text_frame:
+            with profiler.stage("extract.text"):
+                text = _extract_text_from_shape(shape).strip()
+            if text:
+                if shape_idx == 0 and not slide_data["title"]:
+                    slide_data["title"] = text
+                else:
+                    slide_data["content"].append({"type": "text", "value": text})
+
+        # Check for chart BEFORE image (charts may also have image representations)
+        if shape.has_chart:
+            chart_data = None
+            if not _out_of_time(budget, slide_idx, shape_idx):
+                with profiler.stage("extract.chart"):
+                    chart_data = _extract_chart(shape, slide_idx, shape_idx, max_chart_points)
+            if chart_data:
+                profiler.count("charts")
+                slide_data["media"].append(chart_data)
+        elif hasattr(shape, "image"):
+            with profiler.stage("extract.image_blob"):
+                task = _collect_media(shape, slide_idx, shape_idx)
+            if task:
+                slide_data["media"].append(task.item)
+                tasks.append(task)
+
+        if _is_highlighted(shape):
+            slide_data["is_highlighted"] = True
+
+    return slide_data
+
+
+def _collect_xml_media(
+    package: OoxmlPackage,
+    shape: SlideShape,
+    slide_idx: int,
+    shape_idx: int,
+    low_memory: bool = False,
+) -> _MediaTask | None:
+    """``_collect_media`` for a picture read by the fast engine.
+
+    With ``low_memory`` the task refers to the image part instead of its bytes.
+    """
+    try:
+        if shape.image_part is None:
+            raise ValueError("no embedded image")
+        if low_memory:
+            blob = package.part(shape.image_part)
+            ext = blob.image_ext()
+        else:
+            blob = package.read(shape.image_part)
+            ext = PptxImage(blob, None).ext
+        visible = 1.0 - shape.crop_left - shape.crop_right
+        return _MediaTask(
+            slide_idx,
+            shape_idx,
+            blob,
+            ext.lower(),
+            {"type": "image"},
+            shape.width,
+            visible if visible > 0 else 1.0,
+        )
+    except Exception as e:
+        print(f"Warning: Failed to extract media from slide {slide_idx}, shape {shape_idx}: {e}")
+        return None
+
+
+def _collect_xml_chart(
+    package: OoxmlPackage, shape: SlideShape, slide_idx: int, shape_idx: int, max_points: int
+) -> dict | None:
+    """``_extract_chart`` for a chart read by the fast engine."""
+    try:
+        if shape.chart_part is None:
+            raise KeyError("chart part not found")
+        chart = Chart(parse_xml(package.read(shape.chart_part)), None)
+        return _chart_data(chart, slide_idx, shape_idx, max_points)
+    except Exception as e:
+        print(f"Warning: Failed to extract chart from slide {slide_idx}, shape {shape_idx}: {e}")
+        return None
+
+
+def _collect_slide_xml(
+    package: OoxmlPackage,
+    slide_part: str,
+    slide_idx: int,
+    tasks: list[_MediaTask],
+    profiler: Profiler | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    low_memory: bool = False,
+    budget: DeckBudget | None = None,
+) -> dict:
+    """``_collect_slide`` for the fast engine, reading the slide part directly.
+
+    Produces the same slide data as the python-pptx walk without building its
+    shape proxies; charts are still interpreted by python-pptx's ``Chart``.
+    ``low_memory`` queues pictures as parts to read later (``PackagePart``).
+    """
+    profiler = profiler or Profiler()
+    with profiler.stage("extract.xml"):
+        slide_data = _new_slide_data(slide_idx, package.layout_name(slide_part))
+        shapes = package.slide_shapes(slide_part)
+
+    for shape_idx, shape in enumerate(shapes):
+        if shape.text is not None:
+            text = shape.text.strip()
+            if text:
+                if shape_idx == 0 and not slide_data["title"]:
+                    slide_data["title"] = text
+                else:
+                    slide_data["content"].append({"type": "text", "value": text})
+
+        if shape.has_chart:
+            chart_data = None
+            if not _out_of_time(budget, slide_idx, shape_idx):
+                with profiler.stage("extract.chart"):
+                    chart_data = _collect_xml_chart(
+                        package, shape, slide_idx, shape_idx, max_chart_points
+                    )
+            if chart_data:
+                profiler.count("charts")
+                slide_data["media"].append(chart_data)
+        elif shape.is_picture:
+            with profiler.stage("extract.image_blob"):
+                task = _collect_xml_media(package, shape, slide_idx, shape_idx, low_memory)
+            if task:
+                slide_data["media"].append(task.item)
+                tasks.append(task)
+
+        if shape.has_fill and shape.fill_type != 0:
+            slide_data["is_highlighted"] = True
+
+    return slide_data
+
+
+class _DeckReader(NamedTuple):
+    """The slides of an opened deck with the engine's functions to read them."""
+
+    slides: list
+    fingerprint: Callable[..., str]
+    collect: Callable[..., dict]
+
+
+@contextmanager
+def _open_deck(
+    pptx_file: Path, engine: str = "pptx", low_memory: bool = False
+) -> Iterator[_DeckReader]:
+    """Open a deck with python-pptx, or as a zip of XML parts for the ``fast`` engine.
+
+    ``low_memory`` always opens the zip, since python-pptx reads every part
+    of the package into memory up front.
+    """
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(f"Unknown extraction engine: {engine}")
+    if engine == "fast" or low_memory:
+        with OoxmlPackage(pptx_file) as package:
+            yield _DeckReader(
+                package.slide_parts(),
+                package.fingerprint,
+                partial(_collect_slide_xml, package, low_memory=low_memory),
+            )
+    else:
+        prs = Presentation(str(pptx_file))
+        yield _DeckReader(list(prs.slides), slide_fingerprint, _collect_slide)
+
+
+def extract_deck(
+    pptx_path: str,
+    output_dir: str,
+    converter: LibreOfficePool | None = None,
+    jobs: int = 1,
+    cache: MediaCache | None = None,
+    incremental: bool = False,
+    profiler: Profiler | None = None,
+    image_options: ImageOptions | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    engine: str = "pptx",
+    low_memory: bool = False,
+    budget: DeckBudget | None = None,
+) -> dict:
+    """Extract a deck into an in-memory dict, writing its media under ``output_dir``.
+
+    ``engine`` picks how slides are read: ``pptx`` through python-pptx, or
+    ``fast`` straight from the slide XML in the zip (see ``OoxmlPackage``).
+    ``low_memory`` reads with the ``fast`` parser and keeps no image in
+    memory between the slide walk and the media stage: pictures are read from
+    the still-open archive when processed, and written unchanged files are
+    copied from it in chunks. ``budget`` bounds the time spent on the deck:
+    charts the slide walk reaches after it runs out are left out, and media
+    is degraded as described for ``_process_media``.
+    """
+    profiler = profiler or Profiler()
+    image_options = image_options or ImageOptions()
+    manifest_params = _media_params(image_options) + (
+        f"max_chart_points={max_chart_points}",
+        f"engine={engine}",
+    )
     pptx_file = Path(pptx_path)
-    yaml_dir = Path(yaml_output_dir)
-    yaml_dir.mkdir(parents=True, exist_ok=True)
+    deck_dir = Path(output_dir)
+    deck_dir.mkdir(parents=True, exist_ok=True)
 
-    media_dir = yaml_dir / "media"
+    media_dir = deck_dir / "media"
     media_dir.mkdir(parents=True, exist_ok=True)
 
-    prs = Presentation(str(pptx_file))
+    manifest_path = manifest_path_for(deck_dir / f"{pptx_file.stem}.yaml")
+    with ExitStack() as stack:
+        with profiler.stage("parse"):
+            deck = stack.enter_context(_open_deck(pptx_file, engine, low_memory))
+        slides = deck.slides
+        profiler.count("slides", len(slides))
 
-    slides_data = []
-    highlighted_sections = []
+        fingerprints = []
+        reused = {}
+        if incremental:
+            with profiler.stage("incremental.fingerprint"):
+                fingerprints = [deck.fingerprint(slide) for slide in slides]
+                previous = load_manifest(manifest_path, manifest_params)
+                reused = reusable_slides(previous, fingerprints, media_dir)
+            profiler.count("slides_reused", len(reused))
 
-    for slide_idx, slide in enumerate(prs.slides):
-        slide_data = {
-            "slide_number": slide_idx + 1,
-            "title": "",
-            "content": [],
-            "media": [],
-            "is_highlighted": False,
-            "layout": slide.slide_layout.name if slide.slide_layout else "",
-        }
+        # Phase 1: walk the deck, collecting image blobs behind media placeholders
+        tasks: list[_MediaTask] = []
+        all_slides = []
+        with profiler.stage("extract"):
+            for slide_idx, slide in enumerate(slides):
+                if slide_idx in reused:
+                    all_slides.append(reused[slide_idx])
+                    continue
+                with profiler.slide(slide_idx + 1):
+                    all_slides.append(
+                        deck.collect(
+                            slide, slide_idx, tasks, profiler, max_chart_points, budget=budget
+                        )
+                    )
 
-        for shape_idx, shape in enumerate(slide.shapes):
-            if shape.has_text_frame:
-                text = _extract_text_from_shape(shape).strip()
-                if text:
-                    if shape_idx == 0 and not slide_data["title"]:
-                        slide_data["title"] = text
-                    else:
-                        slide_data["content"].append({"type": "text", "value": text})
-
-            # Check for chart BEFORE image (charts may also have image representations)
-            if shape.has_chart:
-                chart_data = _extract_chart(shape, slide_idx, shape_idx)
-                if chart_data:
-                    slide_data["media"].append(chart_data)
-            elif hasattr(shape, "image"):
-                media_info = _extract_media(shape, slide_idx, shape_idx, media_dir)
-                if media_info:
-                    media_item = {"type": "image"}
-                    media_item.update(media_info)
-                    slide_data["media"].append(media_item)
-
-            if _is_highlighted(shape):
-                slide_data["is_highlighted"] = True
-
-        if slide_data["title"] or slide_data["content"] or slide_data["media"]:
-            slides_data.append(slide_data)
-            if slide_data["is_highlighted"]:
-                highlighted_sections.append(
-                    {
-                        "slide_number": slide_idx + 1,
-                        "title": slide_data["title"],
-                        "content": slide_data["content"][:3],
-                    }
+    # Phase 2: process distinct images concurrently and convert vector art in batches
+    with profiler.stage("media"):
+        failed = _process_media(
+            tasks, media_dir, jobs, converter, cache, profiler, image_options, budget=budget
+        )
+    failed_items = {id(task.item) for task in failed}
+    for slide_data in all_slides:
+        slide_data["media"] = [m for m in slide_data["media"] if id(m) not in failed_items]
+
+    if incremental:
+        # Slides with a fallback or a chart left out for lack of time are redone next run
+        omitted = {entry["slide"] for entry in budget.degradations} if budget else set()
+        fingerprints = [
+            "" if idx + 1 in omitted else fingerprint
+            for idx, fingerprint in enumerate(fingerprints)
+        ]
+        write_manifest(manifest_path, manifest_params, fingerprints, all_slides)
+        print(f"Incremental build: reused {len(reused)} of {len(slides)} slides")
+    _print_degradations(budget)
+
+    return assemble_deck(pptx_file.stem, all_slides)
+
+
+def iter_slides(
+    pptx_path: str,
+    output_dir: str,
+    converter: LibreOfficePool | None = None,
+    jobs: int = 1,
+    cache: MediaCache | None = None,
+    profiler: Profiler | None = None,
+    image_options: ImageOptions | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    engine: str = "pptx",
+    low_memory: bool = False,
+    budget: DeckBudget | None = None,
+    window: int = STREAM_WINDOW,
+) -> Iterator[dict]:
+    """Yield each non-empty slide's data as soon as it and its media are extracted.
+
+    Slides are extracted ``window`` at a time and their pictures processed
+    together, so unlike ``extract_deck`` only that many slides' text, chart
+    data and image blobs are held at once. One process pool and one
+    LibreOffice batch per window serve all of its slides, and ``cache`` is
+    saved once the iteration ends. Media goes to ``output_dir/media`` as usual
+    and a picture repeated on a later slide reuses the file written for it.
+    ``low_memory`` and ``budget`` are as for ``extract_deck``.
+    """
+    profiler = profiler or Profiler()
+    image_options = image_options or ImageOptions()
+    cache = cache if cache is not None else MediaCache()
+    media_dir = Path(output_dir) / "media"
+    media_dir.mkdir(parents=True, exist_ok=True)
+
+    processed: dict[str, dict | None] = {}
+    savings = Counter()
+    with ExitStack() as stack:
+        # Saved even when the caller stops iterating early
+        stack.callback(cache.save)
+        if converter is None:
+            converter = stack.enter_context(LibreOfficePool(size=jobs))
+        executor = None
+        if jobs > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        with profiler.stage("parse"):
+            deck = stack.enter_context(_open_deck(Path(pptx_path), engine, low_memory))
+        slides = enumerate(deck.slides)
+        while chunk := list(islice(slides, max(1, window))):
+            tasks: list[_MediaTask] = []
+            chunk_data = []
+            for slide_idx, slide in chunk:
+                profiler.count("slides")
+                with profiler.slide(slide_idx + 1):
+                    with profiler.stage("extract"):
+                        chunk_data.append(
+                            deck.collect(
+                                slide, slide_idx, tasks, profiler, max_chart_points, budget=budget
+                            )
+                        )
+            with profiler.stage("media"):
+                failed = _process_media(
+                    tasks,
+                    media_dir,
+                    jobs,
+                    converter,
+                    cache,
+                    profiler,
+                    image_options,
+                    processed=processed,
+                    savings=savings,
+                    budget=budget,
+                    executor=executor,
+                    save_cache=False,
                 )
+            failed_items = {id(task.item) for task in failed}
+            for slide_data in chunk_data:
+                slide_data["media"] = [
+                    m for m in slide_data["media"] if id(m) not in failed_items
+                ]
+                if slide_data["title"] or slide_data["content"] or slide_data["media"]:
+                    yield slide_data
+    if savings:
+        _print_savings(savings["bytes_in"], savings["bytes_out"])
+    _print_degradations(budget)
 
-    # Extract cover title from first slide
-    cover_title = pptx_file.stem
-    if slides_data and slides_data[0].get("title"):
-        cover_title = slides_data[0]["title"].replace("\n", " ").strip()
-
-    output_data = {
-        "title": pptx_file.stem,
-        "cover_title": cover_title,
-        "hero_image": None,
-        "slides": slides_data,
-        "highlighted_sections": highlighted_sections,
-        "total_slides": len(slides_data),
-    }
 
-    yaml_path = yaml_dir / f"{pptx_file.stem}.yaml"
-    with open(yaml_path, "w", encoding="utf-8") as f:
-        yaml.dump(
-            output_data,
-            f,
-            allow_unicode=True,
-            default_flow_style=False,
-            sort_keys=False,
+def ppt_to_yaml(
+    pptx_path: str,
+    yaml_output_dir: str,
+    converter: LibreOfficePool | None = None,
+    jobs: int = 1,
+    cache: MediaCache | None = None,
+    incremental: bool = False,
+    output_format: str = "yaml",
+    profiler: Profiler | None = None,
+    image_options: ImageOptions | None = None,
+    max_chart_points: int = DEFAULT_MAX_CHART_POINTS,
+    stream: bool = False,
+    engine: str = "pptx",
+    low_memory: bool = False,
+    budget: DeckBudget | None = None,
+) -> str:
+    profiler = profiler or Profiler()
+    if stream:
+        if incremental:
+            raise ValueError("Incremental conversion cannot be streamed")
+        extension = STREAM_FORMATS[output_format]
+        yaml_path = Path(yaml_output_dir) / f"{Path(pptx_path).stem}{extension}"
+        yaml_path.parent.mkdir(parents=True, exist_ok=True)
+        slides = iter_slides(
+            pptx_path,
+            yaml_output_dir,
+            converter=converter,
+            jobs=jobs,
+            cache=cache,
+            profiler=profiler,
+            image_options=image_options,
+            max_chart_points=max_chart_points,
+            engine=engine,
+            low_memory=low_memory,
+            budget=budget,
         )
+        dump_deck_stream(Path(pptx_path).stem, slides, yaml_path)
+        return str(yaml_path)
+
+    output_data = extract_deck(
+        pptx_path,
+        yaml_output_dir,
+        converter=converter,
+        jobs=jobs,
+        cache=cache,
+        incremental=incremental,
+        profiler=profiler,
+        image_options=image_options,
+        max_chart_points=max_chart_points,
+        engine=engine,
+        low_memory=low_memory,
+        budget=budget,
+    )
+    extension = INTERMEDIATE_FORMATS[output_format]
+    yaml_path = Path(yaml_output_dir) / f"{Path(pptx_path).stem}{extension}"
+    with profiler.stage("dump"):
+        dump_deck(output_data, yaml_path)
 
     return str(yaml_path)
@@ -0,0 +1,130 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb(who) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _slide_report(slides: dict[int, float]) -> dict[str, float]:
+    return {str(number): round(seconds, 6) for number, seconds in sorted(slides.items())}
+
+
+class Profiler:
+    """Collects stage timings, per-slide timings and counters for one run.
+
+    Repeated stages accumulate, so wrapping every shape's text extraction in
+    ``stage("extract.text")`` reports the total time spent on text. Updates are
+    locked so threads can share a profiler; batch conversions give each deck
+    its own and ``merge`` them, keeping slide timings apart per deck.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, dict] = {}
+        self.slides: dict[int, float] = {}
+        self.decks: dict[str, dict[int, float]] = {}
+        self.counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += elapsed
+                entry["calls"] += 1
+
+    @contextmanager
+    def slide(self, slide_number: int):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.slides[slide_number] = self.slides.get(slide_number, 0.0) + elapsed
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def merge(self, other: "Profiler", deck: str) -> None:
+        """Add ``other``'s stages and counters, keeping its slide timings under ``deck``."""
+        with other._lock:
+            stages = {name: dict(entry) for name, entry in other.stages.items()}
+            slides = dict(other.slides)
+            counters = Counter(other.counters)
+        with self._lock:
+            for name, entry in stages.items():
+                total = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                total["seconds"] += entry["seconds"]
+                total["calls"] += entry["calls"]
+            self.counters.update(counters)
+            self.decks[deck] = slides
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            report = {
+                "total_seconds": round(time.perf_counter() - self._start, 6),
+                "stages": {
+                    name: {"seconds": round(entry["seconds"], 6), "calls": entry["calls"]}
+                    for name, entry in self.stages.items()
+                },
+                "slides": _slide_report(self.slides),
+                "counters": dict(sorted(self.counters.items())),
+                "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+                "peak_children_rss_mb": (
+                    _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+                ),
+            }
+            if self.decks:
+                report["decks"] = {
+                    deck: {"slides": _slide_report(slides)}
+                    for deck, slides in sorted(self.decks.items())
+                }
+            return report
+
+    def write(self, path: str | Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+@contextmanager
+def profile_run(profile_path: str | None = None, cprofile_path: str | None = None):
+    """Yield a Profiler (or None) and write the requested reports on exit.
+
+    ``profile_path`` receives the Profiler's JSON report and ``cprofile_path``
+    a cProfile stats dump readable with ``pstats``.
+    """
+    profiler = Profiler() if profile_path else None
+    python_profiler = cProfile.Profile() if cprofile_path else None
+    if python_profiler:
+        python_profiler.enable()
+    try:
+        yield profiler
+    finally:
+        if python_profiler:
+            python_profiler.disable()
+            python_profiler.dump_stats(cprofile_path)
+        if profiler:
+            profiler.write(profile_path)
@@ -1,36 +1,134 @@
 import json
-import shutil
+import threading
 from pathlib import Path
 
-import yaml
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from jinja2.utils import htmlsafe_json_dumps
 
+from .assets import (
+    ASSET_MANIFEST_FILENAME,
+    ASSETS_DIRNAME,
+    ECHARTS_FILENAME,
+    asset_context,
+)
+from .cache import default_cache_dir
+from .charts import chart_options
+from .compress import write_precompressed
+from .images import responsive_sources
+from .intermediate import load_deck
+from .media_sync import (
+    MEDIA_PREFIX,
+    fingerprint_media,
+    referenced_media,
+    rewrite_media_paths,
+    sync_media,
+)
+from .profiling import Profiler
 
-def _create_html_env() -> Environment:
-    template_dir = Path(__file__).parent / "templates"
-    env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
-    # Add tojson filter for ECharts data serialization
-    env.filters['tojson'] = lambda x: json.dumps(x, ensure_ascii=False)
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+_html_env: Environment | None = None
+_html_env_lock = threading.Lock()
+
+
+def _bytecode_cache(directory: Path) -> FileSystemBytecodeCache | None:
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+def _create_html_env(bytecode_cache_dir: Path | None = None) -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        bytecode_cache=_bytecode_cache(bytecode_cache_dir) if bytecode_cache_dir else None,
+    )
+    # Add tojson filter for ECharts data serialization; the output is safe to
+    # embed in <script> since <, > and & are escaped as JSON unicode escapes
+    env.filters['tojson'] = lambda x: htmlsafe_json_dumps(
+        x, ensure_ascii=False, separators=(",", ":")
+    )
+    # Group image variants into srcset strings for <picture>
+    env.filters['responsive'] = responsive_sources
     return env
 
 
-def yaml_to_html(
-    yaml_path: str,
+def get_html_env() -> Environment:
+    """Return the shared environment, compiled templates cached on disk and in memory."""
+    global _html_env
+    with _html_env_lock:
+        if _html_env is None:
+            _html_env = _create_html_env(default_cache_dir() / "jinja")
+        return _html_env
+
+
+def precompile_templates(env: Environment | None = None) -> list[str]:
+    """Compile every shipped template so later renders skip parsing entirely."""
+    env = env or get_html_env()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def render_deck(
+    data: dict,
+    media_source_dir: Path | None,
     html_output_dir: str,
     template_name: str = "index.html",
     output_filename: str | None = None,
+    env: Environment | None = None,
+    media_mode: str = "copy",
+    profiler: Profiler | None = None,
+    asset_mode: str = "cdn",
+    echarts_path: str | None = None,
+    hash_names: bool = False,
+    precompress: bool = False,
 ) -> str:
-    yaml_file = Path(yaml_path)
+    """Render in-memory deck data to HTML, bringing over the media it references.
+
+    Media is taken from ``media_source_dir`` by copy, hardlink or reflink
+    (``media_mode``); files already up to date in the output are left alone.
+    ``asset_mode`` and ``echarts_path`` control how ECharts and web fonts are
+    delivered (see ``asset_context``). With ``hash_names`` media is published
+    under content-hashed names, which the page links to, and
+    ``asset-manifest.json`` maps each logical name to its hashed one.
+    ``precompress`` writes ``.gz``/``.br`` siblings of the page and the text
+    assets it references for servers that serve them directly.
+    """
+    profiler = profiler or Profiler()
     html_dir = Path(html_output_dir)
     html_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(yaml_file, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-
-    env = _create_html_env()
-    template = env.get_template(template_name)
+    manifest = {}
+    if hash_names:
+        # Without a separate source the media already sits in the output
+        with profiler.stage("media_copy"):
+            mapping, stats = fingerprint_media(
+                referenced_media(data),
+                media_source_dir if media_source_dir is not None else html_dir / "media",
+                html_dir / "media",
+                media_mode,
+            )
+        for name, amount in stats.items():
+            profiler.count(f"media_{name}", amount)
+        data = rewrite_media_paths(data, mapping)
+        manifest = {
+            MEDIA_PREFIX + name: MEDIA_PREFIX + hashed for name, hashed in sorted(mapping.items())
+        }
 
-    html_content = template.render(data=data)
+    with profiler.stage("render"):
+        env = env or get_html_env()
+        template = env.get_template(template_name)
+        charts = chart_options(data)
+        assets = asset_context(asset_mode, html_dir, echarts_path, with_echarts=bool(charts))
+        html_content = template.render(data=data, charts=charts, assets=assets)
+    # ``get`` leaves the bundle alone when the template never asked for it
+    vendored = assets.get("echarts_src")
+    if vendored and vendored.startswith(ASSETS_DIRNAME):
+        manifest[f"{ASSETS_DIRNAME}/{ECHARTS_FILENAME}"] = vendored
 
     filename = output_filename or f"{data['title']}.html"
     html_output_path = html_dir / filename
@@ -38,15 +136,59 @@ def yaml_to_html(
     with open(html_output_path, "w", encoding="utf-8") as f:
         f.write(html_content)
 
-    media_dir = yaml_file.parent / "media"
-    if media_dir.exists():
-        output_media_dir = html_dir / "media"
-        output_media_dir.mkdir(exist_ok=True)
+    if hash_names:
+        with open(html_dir / ASSET_MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    elif media_source_dir is not None and media_source_dir.exists():
+        with profiler.stage("media_copy"):
+            stats = sync_media(
+                referenced_media(data), media_source_dir, html_dir / "media", media_mode
+            )
+        for name, amount in stats.items():
+            profiler.count(f"media_{name}", amount)
 
-        for media_file in media_dir.iterdir():
-            if media_file.is_file():
-                dst = output_media_dir / media_file.name
-                if media_file != dst:
-                    shutil.copy2(media_file, dst)
+    if precompress:
+        outputs = [html_output_path, html_dir / ASSET_MANIFEST_FILENAME]
+        outputs += [html_dir / "media" / name for name in referenced_media(data)]
+        if vendored and vendored.startswith(ASSETS_DIRNAME):
+            outputs.append(html_dir / vendored)
+        with profiler.stage("precompress"):
+            stats = write_precompressed(outputs)
+        profiler.count("precompressed_files", stats["written"])
+        profiler.count("precompressed_bytes_in", stats["bytes_in"])
+        profiler.count("precompressed_bytes_out", stats["bytes_out"])
 
     return str(html_output_path)
+
+
+def yaml_to_html(
+    yaml_path: str,
+    html_output_dir: str,
+    template_name: str = "index.html",
+    output_filename: str | None = None,
+    env: Environment | None = None,
+    media_mode: str = "copy",
+    profiler: Profiler | None = None,
+    asset_mode: str = "cdn",
+    echarts_path: str | None = None,
+    hash_names: bool = False,
+    precompress: bool = False,
+) -> str:
+    profiler = profiler or Profiler()
+    yaml_file = Path(yaml_path)
+    with profiler.stage("load"):
+        data = load_deck(yaml_file)
+    return render_deck(
+        data,
+        yaml_file.parent / "media",
+        html_output_dir,
+        template_name,
+        output_filename=output_filename,
+        env=env,
+        media_mode=media_mode,
+        profiler=profiler,
+        asset_mode=asset_mode,
+        echarts_path=echarts_path,
+        hash_names=hash_names,
+        precompress=precompress,
+    )
@@ -0,0 +1,54 @@
+import importlib
+import io
+
+import pytest
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+# The package re-exports the ``yaml_to_html`` function under the module's name
+yaml_to_html_module = importlib.import_module("ppt_to_web.yaml_to_html")
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep caches written by the code under test out of the user's home."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("PPT_TO_WEB_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(yaml_to_html_module, "_html_env", None)
+    return cache_dir
+
+
+@pytest.fixture
+def png():
+    """Encode a solid-colour PNG, so decks can embed real pictures."""
+
+    def encode(color, size=(1, 1)) -> bytes:
+        buffer = io.BytesIO()
+        Image.new("RGB", size, color).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    return encode
+
+
+@pytest.fixture
+def make_deck():
+    """Save a deck with one title-and-content slide per title and return its path.
+
+    Each body reads ``body`` formatted with the slide's title; ``pictures``
+    maps slide indexes to PNG bytes placed on those slides.
+    """
+
+    def save(path, titles=("Title",), pictures=None, body="Body of {title}"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        prs = Presentation()
+        for idx, title in enumerate(titles):
+            slide = prs.slides.add_slide(prs.slide_layouts[1])
+            slide.shapes.title.text = title
+            slide.placeholders[1].text = body.format(title=title)
+            if pictures and idx in pictures:
+                slide.shapes.add_picture(io.BytesIO(pictures[idx]), Inches(1), Inches(1))
+        prs.save(path)
+        return path
+
+    return save
@@ -0,0 +1,100 @@
+"""Tests for assets module."""
+
+import urllib.error
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ppt_to_web.assets import (
+    ECHARTS_URL,
+    EChartsDownloadError,
+    asset_context,
+    echarts_bundle,
+    hashed_filename,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_bundle_cache():
+    echarts_bundle.cache_clear()
+    yield
+    echarts_bundle.cache_clear()
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "echarts.min.js"
+    path.write_text('var echarts = {}; var s = "</script>";', encoding="utf-8")
+    return path
+
+
+class TestHashedFilename:
+    def test_hash_after_first_dot(self):
+        name = hashed_filename("echarts.min.js", b"code")
+        base, digest, rest = name.split(".", 2)
+        assert (base, rest) == ("echarts", "min.js")
+        assert len(digest) == 12
+
+    def test_content_changes_name(self):
+        assert hashed_filename("a.js", b"1") != hashed_filename("a.js", b"2")
+
+
+class TestEchartsBundle:
+    def test_local_path(self, bundle):
+        assert echarts_bundle(str(bundle)).startswith(b"var echarts")
+
+    def test_download_cached(self, isolated_cache_dir):
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = b"downloaded"
+        with patch("ppt_to_web.assets.urllib.request.urlopen", return_value=response) as urlopen:
+            assert echarts_bundle() == b"downloaded"
+            echarts_bundle.cache_clear()
+            assert echarts_bundle() == b"downloaded"
+        urlopen.assert_called_once()
+
+    def test_download_failure(self, isolated_cache_dir):
+        offline = urllib.error.URLError("Name or service not known")
+        with patch("ppt_to_web.assets.urllib.request.urlopen", side_effect=offline):
+            with pytest.raises(EChartsDownloadError, match="Name or service not known"):
+                echarts_bundle()
+        assert not list(isolated_cache_dir.rglob("echarts-*"))
+
+
+class TestAssetContext:
+    def test_cdn(self, tmp_path):
+        assets = asset_context("cdn", tmp_path)
+        assert assets["echarts_src"] == ECHARTS_URL
+        assert assets["web_fonts"] is True
+
+    def test_vendor_writes_hashed_file(self, tmp_path, bundle):
+        assets = asset_context("vendor", tmp_path / "out", str(bundle))
+        assert assets["echarts_src"].startswith("assets/echarts.")
+        assert (tmp_path / "out" / assets["echarts_src"]).read_bytes() == bundle.read_bytes()
+        assert assets["web_fonts"] is False
+
+    def test_inline_escapes_script_end(self, tmp_path, bundle):
+        assets = asset_context("inline", tmp_path, str(bundle))
+        assert "</script" not in assets["echarts_inline"]
+        assert "<\\/script>" in assets["echarts_inline"]
+
+    def test_without_charts_loads_nothing(self, tmp_path):
+        assets = asset_context("vendor", tmp_path, with_echarts=False)
+        assert assets["echarts_src"] is None and assets["echarts_inline"] is None
+        assert not (tmp_path / "assets").exists()
+
+    @patch("ppt_to_web.assets.echarts_bundle")
+    def test_bundle_resolved_on_lookup(self, mock_bundle, tmp_path):
+        mock_bundle.return_value = b"code"
+        assets = asset_context("vendor", tmp_path)
+        assert assets["web_fonts"] is False
+        assert assets.get("echarts_src") is None
+        mock_bundle.assert_not_called()
+        assert not (tmp_path / "assets").exists()
+
+        assert assets["echarts_src"].startswith("assets/echarts.")
+        assert assets["echarts_inline"] is None
+        mock_bundle.assert_called_once_with(None)
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            asset_context("ftp", tmp_path)
@@ -0,0 +1,107 @@
+"""Tests for batch module."""
+
+import json
+from unittest.mock import patch
+
+from ppt_to_web.batch import SUMMARY_FILENAME, _output_dirs, convert_batch, find_decks
+from ppt_to_web.budget import DeckBudget
+from ppt_to_web.profiling import Profiler
+
+
+class TestFindDecks:
+    def test_directory_recursive(self, tmp_path, make_deck):
+        a = make_deck(tmp_path / "a.pptx")
+        b = make_deck(tmp_path / "nested" / "b.pptx")
+        (tmp_path / "notes.txt").write_text("x")
+        assert find_decks([str(tmp_path)]) == [a, b]
+
+    def test_glob_and_file(self, tmp_path, make_deck):
+        a = make_deck(tmp_path / "a.pptx")
+        b = make_deck(tmp_path / "b.pptx")
+        assert find_decks([str(tmp_path / "a*.pptx"), str(b), str(a)]) == [a, b]
+
+    def test_skips_office_lock_files(self, tmp_path, make_deck):
+        make_deck(tmp_path / "~$a.pptx")
+        assert find_decks([str(tmp_path)]) == []
+
+
+class TestOutputDirs:
+    def test_repeated_names_disambiguated(self, tmp_path):
+        decks = [tmp_path / "x" / "deck.pptx", tmp_path / "y" / "deck.pptx"]
+        assert _output_dirs(decks, tmp_path / "out") == [
+            tmp_path / "out" / "deck",
+            tmp_path / "out" / "deck_2",
+        ]
+
+
+class TestConvertBatch:
+    def test_converts_all_decks(self, tmp_path, make_deck):
+        decks = [make_deck(tmp_path / "in" / f"deck{i}.pptx", [f"Deck {i}"]) for i in range(3)]
+        output = tmp_path / "out"
+
+        results = convert_batch(decks, str(output), jobs=2)
+
+        assert [entry["status"] for entry in results] == ["ok"] * 3
+        for i in range(3):
+            html = (output / f"deck{i}" / f"deck{i}.html").read_text(encoding="utf-8")
+            assert f"Deck {i}" in html
+            assert (output / f"deck{i}" / f"deck{i}.yaml").exists()
+        summary = json.loads((output / SUMMARY_FILENAME).read_text())
+        assert summary["total"] == 3
+        assert summary["failed"] == 0
+        assert all(entry["seconds"] >= 0 for entry in summary["decks"])
+
+    def test_failure_recorded_and_others_continue(self, tmp_path, make_deck):
+        good = make_deck(tmp_path / "good.pptx")
+        bad = tmp_path / "bad.pptx"
+        bad.write_bytes(b"not a zip")
+
+        results = convert_batch([bad, good], str(tmp_path / "out"))
+
+        assert results[0]["status"] == "failed"
+        assert "error" in results[0]
+        assert results[1]["status"] == "ok"
+
+    def test_shares_resources_across_decks(self, tmp_path, make_deck):
+        decks = [make_deck(tmp_path / f"deck{i}.pptx") for i in range(2)]
+
+        with patch("ppt_to_web.batch.ppt_to_html", return_value="out.html") as convert:
+            convert_batch(decks, str(tmp_path / "out"), cache="shared-cache")
+
+        converters = {id(call.kwargs["converter"]) for call in convert.call_args_list}
+        envs = {id(call.kwargs["env"]) for call in convert.call_args_list}
+        assert len(converters) == 1
+        assert len(envs) == 1
+        assert all(call.kwargs["cache"] == "shared-cache" for call in convert.call_args_list)
+
+    def test_slide_timings_kept_per_deck(self, tmp_path, make_deck):
+        decks = [make_deck(tmp_path / f"deck{i}.pptx") for i in range(2)]
+        profiler = Profiler()
+
+        convert_batch(decks, str(tmp_path / "out"), jobs=2, profiler=profiler)
+
+        report = profiler.to_dict()
+        assert set(report["decks"]) == {str(deck) for deck in decks}
+        assert all(list(d["slides"]) == ["1"] for d in report["decks"].values())
+        assert report["counters"]["slides"] == 2
+
+    def test_each_deck_timed_by_its_own_budget(self, tmp_path, make_deck):
+        decks = [make_deck(tmp_path / f"deck{i}.pptx") for i in range(2)]
+        budgets = []
+
+        def convert(deck, output, *args, budget, **kwargs):
+            budgets.append(budget)
+            if deck.endswith("deck1.pptx"):
+                budget.degrade({"path": "media/slide_0_shape_1.png"}, "image", "original", 1)
+            return "out.html"
+
+        budget = DeckBudget(deck_seconds=60, item_seconds=5)
+        with patch("ppt_to_web.batch.ppt_to_html", side_effect=convert):
+            results = convert_batch(decks, str(tmp_path / "out"), budget=budget)
+
+        assert len({id(b) for b in budgets}) == 2 and budget not in budgets
+        assert all((b.deck_seconds, b.item_seconds) == (60, 5) for b in budgets)
+        assert "degraded" not in results[0]
+        assert results[1]["degraded"][0]["fallback"] == "original"
+        summary = json.loads((tmp_path / "out" / SUMMARY_FILENAME).read_text())
+        assert summary["degraded"] == 1
@@ -0,0 +1,107 @@
+"""Tests for budget module."""
+
+import time
+
+from ppt_to_web.budget import TIMED_OUT, DeckBudget, map_with_deadlines
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestDeckBudget:
+    def test_unlimited(self):
+        budget = DeckBudget()
+        assert not budget.limited
+        assert budget.remaining() is None
+        assert not budget.expired()
+        assert budget.item_timeout() is None
+        assert budget.item_timeout(60, 3) == 180
+
+    def test_deck_clock(self):
+        clock = FakeClock()
+        budget = DeckBudget(deck_seconds=10, clock=clock)
+        clock.now += 4
+        assert budget.remaining() == 6
+        clock.now += 6
+        assert budget.expired()
+        assert budget.remaining() == 0
+
+    def test_item_timeout_capped_by_deck(self):
+        clock = FakeClock()
+        budget = DeckBudget(deck_seconds=10, item_seconds=3, clock=clock)
+        assert budget.item_timeout(60) == 3
+        assert budget.item_timeout(60, 2) == 6
+        clock.now += 8
+        assert budget.item_timeout(60, 2) == 2
+
+    def test_renew_restarts_clock(self):
+        clock = FakeClock()
+        budget = DeckBudget(deck_seconds=10, item_seconds=2, clock=clock)
+        budget.degrade({"path": "media/a.png"}, "image", "original", 1)
+        clock.now += 20
+        renewed = budget.renew()
+        assert budget.expired() and not renewed.expired()
+        assert (renewed.deck_seconds, renewed.item_seconds) == (10, 2)
+        assert renewed.degradations == []
+
+    def test_degrade_records_item_and_reason(self):
+        clock = FakeClock()
+        budget = DeckBudget(deck_seconds=10, item_seconds=2, clock=clock)
+        item = {"path": "media/slide_0_shape_1.png"}
+        budget.degrade(item, "image", "original", 1)
+        clock.now += 10
+        other = {"path": "media/slide_2_shape_0.svg"}
+        budget.degrade(other, "vector", "placeholder", 3)
+
+        assert item["degraded"] == {
+            "stage": "image",
+            "reason": "item deadline",
+            "fallback": "original",
+        }
+        assert budget.degradations == [
+            {"slide": 1, "path": "media/slide_0_shape_1.png", **item["degraded"]},
+            {"slide": 3, "path": "media/slide_2_shape_0.svg", **other["degraded"]},
+        ]
+        assert other["degraded"]["reason"] == "deck budget"
+
+    def test_ran_out(self):
+        clock = FakeClock()
+        budget = DeckBudget(deck_seconds=10, clock=clock)
+        budget.record_timeout(["a.emf"])
+        assert budget.ran_out("a.emf") and not budget.ran_out("b.emf")
+        clock.now += 10
+        assert budget.ran_out("b.emf")
+
+
+class TestMapWithDeadlines:
+    def test_results_in_order(self):
+        budget = DeckBudget(item_seconds=30)
+        assert map_with_deadlines(_nap, [(0.05,), (0,), (0.01,)], 2, budget) == [0.05, 0, 0.01]
+
+    def test_straggler_killed_and_neighbours_rerun(self):
+        budget = DeckBudget(item_seconds=1)
+        start = time.monotonic()
+
+        results = map_with_deadlines(_nap, [(0.2,), (30,), (0.3,), (0.1,)], 2, budget)
+
+        assert results == [0.2, TIMED_OUT, 0.3, 0.1]
+        assert time.monotonic() - start < 10
+
+    def test_items_not_started_within_budget(self):
+        budget = DeckBudget(deck_seconds=0.5)
+        start = time.monotonic()
+
+        results = map_with_deadlines(_nap, [(0,), (30,), (0,)], 1, budget)
+
+        assert results == [0, TIMED_OUT, TIMED_OUT]
+        assert time.monotonic() - start < 10
@@ -0,0 +1,140 @@
+"""Tests for cache module."""
+
+import io
+import json
+
+from ppt_to_web.cache import INDEX_FILENAME, MediaCache, default_cache_dir
+
+
+def _file(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+class TestDefaultCacheDir:
+    def test_env_override(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PPT_TO_WEB_CACHE_DIR", str(tmp_path))
+        assert default_cache_dir() == tmp_path
+
+    def test_xdg_cache_home(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("PPT_TO_WEB_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert default_cache_dir() == tmp_path / "ppt-to-web"
+
+
+class TestMediaCacheKey:
+    def test_same_blob_same_key(self):
+        assert MediaCache.key(b"abc", "png") == MediaCache.key(b"abc", "png")
+
+    def test_params_change_key(self):
+        assert MediaCache.key(b"abc", "png") != MediaCache.key(b"abc", "jpg")
+
+    def test_params_not_concatenated(self):
+        assert MediaCache.key(b"abc", "ab", "c") != MediaCache.key(b"abc", "a", "bc")
+
+    def test_stream_key_matches_blob_key(self):
+        blob = bytes(range(256)) * 10
+        stream = io.BytesIO(blob)
+        assert MediaCache.stream_key(stream, "png", chunk_size=100) == MediaCache.key(blob, "png")
+
+
+class TestMediaCache:
+    def test_without_directory_stores_nothing(self, tmp_path):
+        cache = MediaCache()
+        cache.put("k", _file(tmp_path, "a.png", 3), 1, 1)
+        assert cache.get("k") is None
+        cache.save()
+
+    def test_put_and_get(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        cache.put("k", _file(tmp_path, "a.png", 3), 30, 20)
+
+        entry = cache.get("k")
+        assert entry["file"].read_bytes() == b"xxx"
+        assert entry["file"].suffix == ".png"
+        assert (entry["width"], entry["height"]) == (30, 20)
+        assert cache.hits == 1
+
+    def test_miss_counted(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        assert cache.get("missing") is None
+        assert cache.misses == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        cache.put("k", _file(tmp_path, "a.png", 3), 30, 20)
+        cache.save()
+
+        reopened = MediaCache(tmp_path / "cache")
+        assert reopened.get("k")["width"] == 30
+
+    def test_missing_object_is_a_miss(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        cache.put("k", _file(tmp_path, "a.png", 3))
+        (tmp_path / "cache" / "k.png").unlink()
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache", max_bytes=10)
+        cache.put("old", _file(tmp_path, "old.png", 6))
+        cache.put("new", _file(tmp_path, "new.png", 6))
+        cache._index["old"]["last_used"] = 0
+        cache.save()
+
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
+        assert not (tmp_path / "cache" / "old.png").exists()
+
+    def test_recent_access_protects_entry(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache", max_bytes=10)
+        cache.put("a", _file(tmp_path, "a.png", 6))
+        cache.put("b", _file(tmp_path, "b.png", 6))
+        cache._index["a"]["last_used"] = 0
+        cache._index["b"]["last_used"] = 1
+        cache.get("a")
+        cache.save()
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+    def test_corrupt_index_ignored(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        (cache_dir / INDEX_FILENAME).write_text("{not json")
+
+        cache = MediaCache(cache_dir)
+        assert cache.get("k") is None
+        cache.save()
+        assert json.loads((cache_dir / INDEX_FILENAME).read_text()) == {}
+
+    def test_variants_stored_with_entry(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        source = _file(tmp_path, "a.png", 3)
+        variants = [
+            {"file": source, "width": 30, "type": "image/png"},
+            {"file": _file(tmp_path, "a_10w.webp", 2), "width": 10, "type": "image/webp"},
+        ]
+        cache.put("k", source, 30, 20, variants)
+
+        entry = cache.get("k")
+        assert [v["suffix"] for v in entry["variants"]] == [".png", "_10w.webp"]
+        assert entry["variants"][1]["file"].read_bytes() == b"xx"
+        assert entry["variants"][1]["type"] == "image/webp"
+        assert cache._index["k"]["size"] == 5
+
+    def test_missing_variant_is_a_miss(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        source = _file(tmp_path, "a.png", 3)
+        variant = {"file": _file(tmp_path, "a.webp", 2), "width": 3, "type": "image/webp"}
+        cache.put("k", source, 3, 3, [variant])
+        (tmp_path / "cache" / "k.webp").unlink()
+        assert cache.get("k") is None
+
+    def test_eviction_removes_variants(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache", max_bytes=1)
+        source = _file(tmp_path, "a.png", 3)
+        variant = {"file": _file(tmp_path, "a.webp", 2), "width": 3, "type": "image/webp"}
+        cache.put("k", source, 3, 3, [variant])
+        cache.save()
+        assert not (tmp_path / "cache" / "k.webp").exists()
@@ -0,0 +1,157 @@
+"""Tests for charts module."""
+
+from ppt_to_web.charts import (
+    bin_indices,
+    chart_options,
+    downsample_chart,
+    echarts_option,
+    lttb_indices,
+)
+
+
+def _chart(**overrides):
+    chart = {
+        "type": "chart",
+        "chart_type": "bar",
+        "title": "Revenue",
+        "categories": ["Q1", "Q2"],
+        "series": [{"name": "Sales", "data": [10, 20]}],
+        "is_stacked": False,
+        "is_horizontal": False,
+        "is_area": False,
+        "chart_id": "chart_0_0",
+    }
+    chart.update(overrides)
+    return chart
+
+
+class TestEchartsOption:
+    def test_bar(self):
+        option = echarts_option(_chart())
+        assert option["tooltip"] == {"trigger": "axis"}
+        assert option["legend"]["data"] == ["Sales"]
+        assert option["xAxis"]["type"] == "category"
+        assert option["xAxis"]["data"] == ["Q1", "Q2"]
+        assert option["yAxis"] == {"type": "value"}
+        assert option["series"] == [{"name": "Sales", "type": "bar", "data": [10, 20]}]
+
+    def test_horizontal_swaps_axes(self):
+        option = echarts_option(_chart(is_horizontal=True))
+        assert option["yAxis"]["type"] == "category"
+        assert option["xAxis"] == {"type": "value"}
+
+    def test_stacked_area(self):
+        option = echarts_option(_chart(chart_type="line", is_stacked=True, is_area=True))
+        series = option["series"][0]
+        assert series["stack"] == "total"
+        assert series["areaStyle"] == {}
+
+    def test_pie_pairs_values_with_categories(self):
+        option = echarts_option(
+            _chart(chart_type="pie", series=[{"name": "Share", "data": [60]}])
+        )
+        assert option["tooltip"] == {"trigger": "item"}
+        assert "xAxis" not in option
+        assert option["series"][0]["data"] == [
+            {"value": 60, "name": "Q1"},
+            {"value": 0, "name": "Q2"},
+        ]
+
+    def test_radar_indicators(self):
+        option = echarts_option(_chart(chart_type="radar"))
+        assert option["radar"]["indicator"] == [
+            {"name": "Q1", "max": 20},
+            {"name": "Q2", "max": 20},
+        ]
+        assert option["series"][0]["data"] == [{"name": "Sales", "value": [10, 20]}]
+
+
+class TestChartOptions:
+    def test_collects_every_chart(self):
+        data = {
+            "slides": [
+                {"media": [_chart(), {"type": "image", "path": "media/a.png"}]},
+                {"media": [_chart(chart_id="chart_2_1")]},
+            ]
+        }
+        assert list(chart_options(data)) == ["chart_0_0", "chart_2_1"]
+
+    def test_no_charts(self):
+        assert chart_options({"slides": []}) == {}
+
+
+class TestLttbIndices:
+    def test_short_series_untouched(self):
+        assert lttb_indices([1, 2, 3], 10) == [0, 1, 2]
+
+    def test_keeps_endpoints_and_count(self):
+        values = [float(i % 7) for i in range(1000)]
+        indices = lttb_indices(values, 100)
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert indices == sorted(set(indices))
+
+    def test_preserves_spike(self):
+        values = [0.0] * 1000
+        values[500] = 100.0
+        assert 500 in lttb_indices(values, 20)
+
+
+class TestBinIndices:
+    def test_bounded_by_grid(self):
+        values = [float((i * 37) % 101) for i in range(10000)]
+        indices = bin_indices(values, 400)
+        assert 0 < len(indices) <= 400
+        assert indices == sorted(indices)
+
+    def test_constant_series(self):
+        assert len(bin_indices([5.0] * 1000, 100)) == 10
+
+
+class TestDownsampleChart:
+    def test_line_chart_downsampled_and_aligned(self):
+        chart = _chart(
+            chart_type="line",
+            categories=[str(i) for i in range(5000)],
+            series=[
+                {"name": "a", "data": [float(i % 13) for i in range(5000)]},
+                {"name": "b", "data": [float(i % 17) for i in range(5000)]},
+            ],
+        )
+        downsample_chart(chart, 100)
+
+        assert chart["point_count"] == 5000
+        assert 100 <= len(chart["categories"]) <= 200
+        assert len(chart["series"][0]["data"]) == len(chart["categories"])
+        assert len(chart["series"][1]["data"]) == len(chart["categories"])
+
+    def test_bar_chart_untouched(self):
+        chart = _chart(series=[{"name": "a", "data": [1.0] * 5000}])
+        downsample_chart(chart, 100)
+        assert len(chart["series"][0]["data"]) == 5000
+        assert "point_count" not in chart
+
+    def test_disabled(self):
+        chart = _chart(chart_type="scatter", series=[{"name": "a", "data": [1.0] * 5000}])
+        downsample_chart(chart, 0)
+        assert "point_count" not in chart
+
+
+class TestLargeSeriesOptions:
+    def test_long_line_uses_sampling(self):
+        option = echarts_option(
+            _chart(chart_type="line", series=[{"name": "a", "data": [1.0] * 1500}])
+        )
+        series = option["series"][0]
+        assert series["sampling"] == "lttb"
+        assert series["showSymbol"] is False
+        assert series["progressive"] == 500
+
+    def test_long_scatter_uses_large_mode(self):
+        option = echarts_option(
+            _chart(chart_type="scatter", series=[{"name": "a", "data": [1.0] * 1500}])
+        )
+        assert option["series"][0]["large"] is True
+
+    def test_short_series_plain(self):
+        assert "large" not in echarts_option(_chart())["series"][0]
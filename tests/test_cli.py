@@ -1,10 +1,14 @@
 """Tests for CLI commands."""
 
+import json
 from unittest.mock import patch
 
+import pytest
 from click.testing import CliRunner
 
+from ppt_to_web.assets import EChartsDownloadError
 from ppt_to_web.cli import cli
+from ppt_to_web.images import ImageOptions
 
 
 class TestCli:
@@ -38,20 +42,31 @@ class TestCli:
         assert "HTML file created" in result.output
         mock_build.assert_called_once()
 
-    @patch("ppt_to_web.cli.yaml_to_html")
-    @patch("ppt_to_web.cli.ppt_to_yaml")
-    def test_run_command(self, mock_convert, mock_build, tmp_path):
+    @patch("ppt_to_web.cli.ppt_to_html")
+    def test_run_command(self, mock_run, tmp_path):
         pptx_file = tmp_path / "test.pptx"
         pptx_file.touch()
-        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
-        mock_build.return_value = str(tmp_path / "output" / "test.html")
+        mock_run.return_value = str(tmp_path / "output" / "test.html")
 
         runner = CliRunner()
         result = runner.invoke(cli, ["run", str(pptx_file)])
         assert result.exit_code == 0
         assert "Conversion complete" in result.output
-        mock_convert.assert_called_once()
-        mock_build.assert_called_once()
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["intermediate_format"] is None
+
+    @patch("ppt_to_web.cli.ppt_to_html")
+    def test_run_write_yaml(self, mock_run, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_run.return_value = str(tmp_path / "output" / "test.html")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["run", str(pptx_file), "--write-yaml", "--format", "json"]
+        )
+        assert result.exit_code == 0
+        assert mock_run.call_args.kwargs["intermediate_format"] == "json"
 
     @patch("ppt_to_web.cli.yaml_to_html")
     def test_build_custom_template(self, mock_build, tmp_path):
@@ -62,9 +77,257 @@ class TestCli:
         runner = CliRunner()
         result = runner.invoke(cli, ["build", str(yaml_file), "-t", "cover_story.html"])
         assert result.exit_code == 0
-        mock_build.assert_called_once_with(str(yaml_file), "./output", "cover_story.html")
+        mock_build.assert_called_once_with(
+            str(yaml_file),
+            "./output",
+            "cover_story.html",
+            media_mode="copy",
+            profiler=None,
+            asset_mode="cdn",
+            echarts_path=None,
+            hash_names=False,
+            precompress=False,
+        )
+
+    @patch("ppt_to_web.cli.yaml_to_html")
+    def test_build_offline_assets(self, mock_build, tmp_path):
+        yaml_file = tmp_path / "test.yaml"
+        yaml_file.touch()
+        bundle = tmp_path / "echarts.min.js"
+        bundle.write_text("var echarts;")
+        mock_build.return_value = str(tmp_path / "output" / "test.html")
+
+        result = CliRunner().invoke(
+            cli,
+            ["build", str(yaml_file), "--assets", "vendor", "--echarts-path", str(bundle)],
+        )
+        assert result.exit_code == 0
+        assert mock_build.call_args.kwargs["asset_mode"] == "vendor"
+        assert mock_build.call_args.kwargs["echarts_path"] == str(bundle)
+
+    @patch("ppt_to_web.cli.yaml_to_html")
+    def test_build_offline_without_bundle(self, mock_build, tmp_path):
+        yaml_file = tmp_path / "test.yaml"
+        yaml_file.touch()
+        mock_build.side_effect = EChartsDownloadError("Could not download ECharts")
+
+        result = CliRunner().invoke(cli, ["build", str(yaml_file), "--assets", "inline"])
+        assert result.exit_code == 1
+        assert "Traceback" not in result.output
+        assert "--echarts-path" in result.output
+
+    @patch("ppt_to_web.cli.yaml_to_html")
+    def test_build_media_mode(self, mock_build, tmp_path):
+        yaml_file = tmp_path / "test.yaml"
+        yaml_file.touch()
+        mock_build.return_value = str(tmp_path / "output" / "test.html")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["build", str(yaml_file), "--media-mode", "hardlink"])
+        assert result.exit_code == 0
+        assert mock_build.call_args.kwargs["media_mode"] == "hardlink"
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_jobs_option(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["convert", str(pptx_file), "--jobs", "4"])
+        assert result.exit_code == 0
+        mock_convert.assert_called_once_with(
+            str(pptx_file),
+            "./output",
+            jobs=4,
+            cache=None,
+            incremental=False,
+            output_format="yaml",
+            profiler=None,
+            image_options=ImageOptions(),
+            max_chart_points=2000,
+            engine="pptx",
+            low_memory=False,
+            budget=None,
+            stream=False,
+        )
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_stream(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.jsonl")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["convert", str(pptx_file), "--stream", "--format", "json"])
+        assert result.exit_code == 0
+        assert mock_convert.call_args.kwargs["stream"] is True
+
+        result = runner.invoke(cli, ["convert", str(pptx_file), "--stream", "--incremental"])
+        assert result.exit_code != 0
+        assert "--incremental" in result.output
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_image_options(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        result = CliRunner().invoke(
+            cli, ["convert", str(pptx_file), "--widths", "640, 1280", "--image-formats", ""]
+        )
+        assert result.exit_code == 0
+        assert mock_convert.call_args.kwargs["image_options"] == ImageOptions((640, 1280), ())
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_encoding_options(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        result = CliRunner().invoke(
+            cli,
+            [
+                "convert",
+                str(pptx_file),
+                "--image-encoding",
+                "lossy",
+                "--quality",
+                "70",
+                "--keep-metadata",
+            ],
+        )
+        assert result.exit_code == 0
+        options = mock_convert.call_args.kwargs["image_options"]
+        assert (options.encoding, options.quality, options.strip_metadata) == ("lossy", 70, False)
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_resampling_options(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        result = CliRunner().invoke(
+            cli, ["convert", str(pptx_file), "--dpi", "96", "--max-width", "0"]
+        )
+        assert result.exit_code == 0
+        options = mock_convert.call_args.kwargs["image_options"]
+        assert (options.dpi, options.max_width) == (96, 0)
+
+    @pytest.mark.parametrize("widths", ["wide", "480,0", "-960"])
+    def test_convert_rejects_bad_widths(self, tmp_path, widths):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        result = CliRunner().invoke(cli, ["convert", str(pptx_file), "--widths", widths])
+        assert result.exit_code == 2
+        assert "--widths" in result.output
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_cache_dir_option(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli, ["convert", str(pptx_file), "--cache-dir", str(tmp_path / "cache")]
+        )
+        assert result.exit_code == 0
+        cache = mock_convert.call_args.kwargs["cache"]
+        assert cache.directory == tmp_path / "cache"
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_time_budget_options(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+
+        result = CliRunner().invoke(
+            cli, ["convert", str(pptx_file), "--time-budget", "120", "--item-deadline", "2.5"]
+        )
+        assert result.exit_code == 0
+        budget = mock_convert.call_args.kwargs["budget"]
+        assert (budget.deck_seconds, budget.item_seconds) == (120, 2.5)
+
+        result = CliRunner().invoke(cli, ["convert", str(pptx_file), "--item-deadline", "0"])
+        assert result.exit_code != 0
+
+    @patch("ppt_to_web.cli.ppt_to_html")
+    def test_run_incremental_option(self, mock_run, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_run.return_value = str(tmp_path / "output" / "test.html")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["run", str(pptx_file), "--incremental"])
+        assert result.exit_code == 0
+        assert mock_run.call_args.kwargs["incremental"] is True
+
+    def test_convert_rejects_zero_jobs(self, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["convert", str(pptx_file), "-j", "0"])
+        assert result.exit_code != 0
 
     def test_convert_missing_file(self):
         runner = CliRunner()
         result = runner.invoke(cli, ["convert", "nonexistent.pptx"])
         assert result.exit_code != 0
+
+    @patch("ppt_to_web.cli.convert_batch")
+    def test_batch_command(self, mock_batch, tmp_path):
+        (tmp_path / "a.pptx").touch()
+        (tmp_path / "b.pptx").touch()
+        mock_batch.return_value = [
+            {"deck": "a.pptx", "status": "ok", "seconds": 1.0},
+            {"deck": "b.pptx", "status": "ok", "seconds": 2.0},
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["batch", str(tmp_path), "-j", "2"])
+        assert result.exit_code == 0
+        assert "2 converted, 0 failed" in result.output
+        decks = mock_batch.call_args.args[0]
+        assert [d.name for d in decks] == ["a.pptx", "b.pptx"]
+        assert mock_batch.call_args.kwargs["jobs"] == 2
+
+    @patch("ppt_to_web.cli.convert_batch")
+    def test_batch_reports_failures(self, mock_batch, tmp_path):
+        (tmp_path / "a.pptx").touch()
+        mock_batch.return_value = [
+            {"deck": "a.pptx", "status": "failed", "seconds": 0.1, "error": "BadZipFile: x"},
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["batch", str(tmp_path)])
+        assert result.exit_code == 1
+        assert "BadZipFile" in result.output
+
+    def test_batch_no_decks(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["batch", str(tmp_path)])
+        assert result.exit_code != 0
+        assert "No .pptx files found" in result.output
+
+    def test_precompile_command(self, isolated_cache_dir):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["precompile"])
+        assert result.exit_code == 0
+        assert "Compiled cover_story.html" in result.output
+        assert "Compiled index.html" in result.output
+        assert str(isolated_cache_dir / "jinja") in result.output
+
+    @patch("ppt_to_web.cli.ppt_to_yaml")
+    def test_convert_profile_option(self, mock_convert, tmp_path):
+        pptx_file = tmp_path / "test.pptx"
+        pptx_file.touch()
+        mock_convert.return_value = str(tmp_path / "output" / "test.yaml")
+        profile_path = tmp_path / "profile.json"
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ["convert", str(pptx_file), "--profile", str(profile_path)])
+        assert result.exit_code == 0
+        assert mock_convert.call_args.kwargs["profiler"] is not None
+        assert "stages" in json.loads(profile_path.read_text())
@@ -0,0 +1,66 @@
+"""Tests for compress module."""
+
+import gzip
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ppt_to_web import compress
+from ppt_to_web.compress import write_precompressed
+
+TEXT = b"<html>" + b"repeated text " * 200 + b"</html>"
+
+
+class TestWritePrecompressed:
+    def test_writes_gzip_sibling(self, tmp_path):
+        page = tmp_path / "deck.html"
+        page.write_bytes(TEXT)
+        stats = write_precompressed([page])
+
+        assert gzip.decompress((tmp_path / "deck.html.gz").read_bytes()) == TEXT
+        assert stats["written"] >= 1
+        assert stats["bytes_out"] < stats["bytes_in"]
+
+    @pytest.mark.skipif(compress.brotli is None, reason="brotli is not installed")
+    def test_writes_brotli_sibling_when_available(self, tmp_path):
+        page = tmp_path / "deck.html"
+        page.write_bytes(TEXT)
+        write_precompressed([page])
+        assert compress.brotli.decompress((tmp_path / "deck.html.br").read_bytes()) == TEXT
+
+    def test_gzip_only_without_brotli(self, tmp_path):
+        page = tmp_path / "deck.html"
+        page.write_bytes(TEXT)
+        with patch.object(compress, "brotli", None):
+            stats = write_precompressed([page])
+        assert stats["written"] == 1
+        assert not (tmp_path / "deck.html.br").exists()
+
+    def test_skips_images(self, tmp_path):
+        image = tmp_path / "a.png"
+        image.write_bytes(TEXT)
+        svg = tmp_path / "b.svg"
+        svg.write_bytes(TEXT)
+        write_precompressed([image, svg, tmp_path / "missing.css"])
+        assert not (tmp_path / "a.png.gz").exists()
+        assert (tmp_path / "b.svg.gz").exists()
+
+    def test_up_to_date_sibling_skipped(self, tmp_path):
+        page = tmp_path / "deck.html"
+        page.write_bytes(TEXT)
+        with patch.object(compress, "brotli", None):
+            write_precompressed([page])
+            stats = write_precompressed([page])
+            assert stats == {"written": 0, "skipped": 1, "bytes_in": 0, "bytes_out": 0}
+
+            page.write_bytes(TEXT + b"<!-- changed -->")
+            os.utime(page, (0, (tmp_path / "deck.html.gz").stat().st_mtime + 10))
+            assert write_precompressed([page])["written"] == 1
+
+    def test_incompressible_file_left_alone(self, tmp_path):
+        tiny = tmp_path / "a.json"
+        tiny.write_bytes(b"{}")
+        stats = write_precompressed([tiny])
+        assert stats["written"] == 0
+        assert not (tmp_path / "a.json.gz").exists()
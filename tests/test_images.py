@@ -0,0 +1,263 @@
+"""Tests for images module."""
+
+import struct
+import sys
+import zlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ppt_to_web.images import (
+    ImageOptions,
+    apply_encoding,
+    choose_format,
+    probe_size,
+    responsive_sources,
+    supported_formats,
+    target_width,
+    trim_border,
+    variant_filename,
+    write_variants,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_supported_formats():
+    supported_formats.cache_clear()
+    yield
+    supported_formats.cache_clear()
+
+
+def _fake_image(width, height):
+    """A stand-in for a Wand image that records how its clones are saved."""
+    saved = []
+
+    def clone():
+        copy = MagicMock()
+        copy.__enter__.return_value = copy
+        copy.save.side_effect = lambda filename: saved.append(
+            (filename, copy.format, copy.resize.call_args)
+        )
+        return copy
+
+    img = MagicMock(width=width, height=height)
+    img.clone.side_effect = clone
+    return img, saved
+
+
+class TestImageOptions:
+    def test_cache_params_change_with_options(self):
+        assert ImageOptions().cache_params() != ImageOptions(widths=(640,)).cache_params()
+        assert ImageOptions().cache_params() != ImageOptions(formats=()).cache_params()
+
+    def test_avif_opt_in(self):
+        assert ImageOptions().formats == ("webp",)
+
+
+class TestSupportedFormats:
+    def test_filters_to_available_formats(self):
+        version = MagicMock()
+        version.formats.return_value = ["PNG", "WEBP"]
+        with patch.dict(sys.modules, {"wand.version": version}):
+            assert supported_formats(("avif", "webp")) == ("webp",)
+
+    def test_no_imagemagick(self):
+        version = MagicMock()
+        version.formats.side_effect = ImportError("MagickWand shared library not found")
+        with patch.dict(sys.modules, {"wand.version": version}):
+            assert supported_formats(("avif", "webp")) == ()
+
+
+class TestWriteVariants:
+    def test_variant_filename(self):
+        assert variant_filename("a", "webp") == "a.webp"
+        assert variant_filename("a", "png", 480) == "a_480w.png"
+
+    @patch("ppt_to_web.images.supported_formats", return_value=("webp",))
+    def test_writes_smaller_widths_and_modern_formats(self, mock_formats, tmp_path):
+        img, saved = _fake_image(1200, 600)
+        variants = write_variants(img, tmp_path / "a.png", ImageOptions((480, 960, 1920),))
+
+        assert [v["path"] for v in variants] == [
+            "media/a_480w.png",
+            "media/a_960w.png",
+            "media/a.png",
+            "media/a_480w.webp",
+            "media/a_960w.webp",
+            "media/a.webp",
+        ]
+        assert variants[0] == {"path": "media/a_480w.png", "width": 480, "type": "image/png"}
+        assert variants[2]["width"] == 1200
+        # The original is already on disk; every other variant is encoded once
+        assert len(saved) == 5
+        filename, fmt, resize = saved[0]
+        assert filename == str(tmp_path / "a_480w.png")
+        assert resize.args == (480, 240)
+        assert saved[-1][1:] == ("webp", None)
+
+    @patch("ppt_to_web.images.supported_formats", return_value=())
+    def test_small_image_without_modern_formats(self, mock_formats, tmp_path):
+        img, saved = _fake_image(300, 200)
+        assert write_variants(img, tmp_path / "a.png", ImageOptions()) == []
+        assert saved == []
+
+
+class TestResponsiveSources:
+    def test_groups_by_type(self):
+        media = {
+            "path": "media/a.png",
+            "variants": [
+                {"path": "media/a.png", "width": 1200, "type": "image/png"},
+                {"path": "media/a_480w.png", "width": 480, "type": "image/png"},
+                {"path": "media/a.webp", "width": 1200, "type": "image/webp"},
+                {"path": "media/a.avif", "width": 1200, "type": "image/avif"},
+            ],
+        }
+        result = responsive_sources(media)
+        assert result["srcset"] == "media/a_480w.png 480w, media/a.png 1200w"
+        assert result["sources"] == [
+            {"type": "image/avif", "srcset": "media/a.avif 1200w"},
+            {"type": "image/webp", "srcset": "media/a.webp 1200w"},
+        ]
+
+    def test_no_variants(self):
+        assert responsive_sources({"path": "media/a.png"}) == {"srcset": "", "sources": []}
+
+
+class TestChooseFormat:
+    @pytest.mark.parametrize(
+        "img_type, colors, source_ext, encoding, expected",
+        [
+            ("truecolor", 50000, "png", "auto", "jpg"),
+            ("palette", 12, "png", "auto", "png"),
+            ("truecolor", 12, "jpeg", "auto", "jpg"),
+            ("truecoloralpha", 50000, "jpg", "auto", "png"),
+            ("truecoloralpha", 50000, "png", "lossy", "png"),
+            ("truecolormatte", 50000, "jpg", "auto", "png"),
+            ("palettematte", 12, "png", "lossy", "png"),
+            ("grayscalematte", 50000, "jpeg", "lossy", "png"),
+            ("palette", 12, "png", "lossy", "jpg"),
+            ("truecolor", 50000, "jpg", "lossless", "png"),
+        ],
+    )
+    def test_policy(self, img_type, colors, source_ext, encoding, expected):
+        img = MagicMock(type=img_type, colors=colors)
+        options = ImageOptions(encoding=encoding)
+        assert choose_format(img, source_ext, options) == expected
+
+
+class TestApplyEncoding:
+    def test_lossy_sets_quality_and_strips(self):
+        img = MagicMock(options={})
+        apply_encoding(img, "jpg", ImageOptions(quality=70))
+        img.strip.assert_called_once()
+        assert img.format == "jpg"
+        assert img.compression_quality == 70
+
+    def test_png_maximum_compression(self):
+        img = MagicMock(options={})
+        apply_encoding(img, "png", ImageOptions(strip_metadata=False))
+        img.strip.assert_not_called()
+        assert img.options["png:compression-level"] == "9"
+
+    def test_lossless_webp(self):
+        img = MagicMock(options={})
+        apply_encoding(img, "webp", ImageOptions(), lossless=True)
+        assert img.options["webp:lossless"] == "true"
+
+
+class TestTargetWidth:
+    def test_display_size_at_dpi(self):
+        # 2 inches wide at 192 dpi
+        assert target_width(2 * 914400, 1.0, ImageOptions()) == 384
+
+    def test_cropped_picture_keeps_visible_part_sharp(self):
+        assert target_width(2 * 914400, 0.5, ImageOptions()) == 768
+
+    def test_capped_at_max_width(self):
+        assert target_width(20 * 914400, 1.0, ImageOptions()) == 1920
+
+    def test_unknown_extent_uses_max_width(self):
+        assert target_width(0, 1.0, ImageOptions(max_width=800)) == 800
+
+    def test_disabled(self):
+        assert target_width(2 * 914400, 1.0, ImageOptions(dpi=0, max_width=0)) is None
+
+
+class TestTrimBorder:
+    def test_single_trim_with_corner_colour(self):
+        img = MagicMock()
+        corner = img.__getitem__.return_value.__enter__.return_value
+        trim_border(img)
+        img.__getitem__.assert_called_once_with((0, 0))
+        img.trim.assert_called_once_with(background_color=corner, fuzz=0, reset_coords=True)
+        img.border.assert_not_called()
+
+
+def _png(width, height):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    chunk = b"IHDR" + ihdr
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + chunk
+        + struct.pack(">I", zlib.crc32(chunk))
+    )
+
+
+def _jpeg(width, height):
+    app0 = b"JFIF\x00" + b"\x00" * 9
+    exif = b"Exif\x00\x00" + b"\xff" * 300  # payload bytes that look like markers
+    sof = b"\x08" + struct.pack(">HH", height, width) + b"\x03" + b"\x00" * 9
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+        + b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+        + b"\xff\xff\xc2" + struct.pack(">H", len(sof) + 2) + sof
+    )
+
+
+def _webp(chunk, payload):
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+class TestProbeSize:
+    @pytest.mark.parametrize(
+        "content, size",
+        [
+            (_png(640, 480), (640, 480)),
+            (b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 20, (320, 200)),
+            (_jpeg(1024, 768), (1024, 768)),
+            (
+                _webp(b"VP8 ", b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", 300, 150)),
+                (300, 150),
+            ),
+            (
+                _webp(b"VP8L", b"\x2f" + ((299) | (149 << 14)).to_bytes(4, "little")),
+                (300, 150),
+            ),
+            (
+                _webp(
+                    b"VP8X",
+                    b"\x00" * 4 + (1999).to_bytes(3, "little") + (999).to_bytes(3, "little"),
+                ),
+                (2000, 1000),
+            ),
+        ],
+        ids=["png", "gif", "jpeg", "webp-lossy", "webp-lossless", "webp-extended"],
+    )
+    def test_reads_header(self, tmp_path, content, size):
+        path = tmp_path / "image"
+        path.write_bytes(content)
+        assert tuple(probe_size(path)) == size
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / "image.emf"
+        path.write_bytes(b"\x01\x00\x00\x00" + b"\x00" * 40)
+        assert probe_size(path) is None
+
+    def test_truncated_jpeg(self, tmp_path):
+        path = tmp_path / "image.jpg"
+        path.write_bytes(_jpeg(10, 10)[:40])
+        assert probe_size(path) is None
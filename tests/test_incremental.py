@@ -0,0 +1,152 @@
+"""Tests for incremental module."""
+
+from unittest.mock import MagicMock
+
+import yaml
+from pptx import Presentation
+
+from ppt_to_web.incremental import (
+    load_manifest,
+    manifest_path_for,
+    reusable_slides,
+    slide_fingerprint,
+    write_manifest,
+)
+from ppt_to_web.ppt_to_yaml import ppt_to_yaml
+
+
+def _slide(idx, *paths):
+    return {"media": [{"type": "image", "path": p} for p in paths], "slide_number": idx + 1}
+
+
+class TestSlideFingerprint:
+    def test_stable_and_content_sensitive(self, tmp_path, make_deck):
+        make_deck(tmp_path / "a.pptx", ["One", "Two"])
+        make_deck(tmp_path / "b.pptx", ["One", "Changed"])
+        a = [slide_fingerprint(s) for s in Presentation(str(tmp_path / "a.pptx")).slides]
+        a_again = [slide_fingerprint(s) for s in Presentation(str(tmp_path / "a.pptx")).slides]
+        b = [slide_fingerprint(s) for s in Presentation(str(tmp_path / "b.pptx")).slides]
+
+        assert a == a_again
+        assert a[0] == b[0]
+        assert a[1] != b[1]
+
+    def test_related_media_included(self, tmp_path, make_deck, png):
+        make_deck(tmp_path / "a.pptx", ["One"], {0: png("red")})
+        make_deck(tmp_path / "b.pptx", ["One"], {0: png("blue")})
+        a = slide_fingerprint(Presentation(str(tmp_path / "a.pptx")).slides[0])
+        b = slide_fingerprint(Presentation(str(tmp_path / "b.pptx")).slides[0])
+        assert a != b
+
+
+class TestManifest:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "deck.manifest.json"
+        write_manifest(path, ("p",), ["f1"], [{"title": "標題", "media": []}])
+        assert load_manifest(path, ("p",)) == [
+            {"fingerprint": "f1", "slide": {"title": "標題", "media": []}}
+        ]
+
+    def test_params_mismatch_discards(self, tmp_path):
+        path = tmp_path / "deck.manifest.json"
+        write_manifest(path, ("old",), ["f1"], [{"media": []}])
+        assert load_manifest(path, ("new",)) == []
+
+    def test_missing_or_corrupt(self, tmp_path):
+        assert load_manifest(tmp_path / "missing.json", ()) == []
+        (tmp_path / "bad.json").write_text("{")
+        assert load_manifest(tmp_path / "bad.json", ()) == []
+
+    def test_manifest_path_next_to_yaml(self, tmp_path):
+        assert manifest_path_for(tmp_path / "deck.yaml") == tmp_path / "deck.manifest.json"
+
+
+class TestReusableSlides:
+    def test_matching_fingerprints_reused(self, tmp_path):
+        previous = [
+            {"fingerprint": "a", "slide": _slide(0)},
+            {"fingerprint": "b", "slide": _slide(1)},
+        ]
+        assert reusable_slides(previous, ["a", "x"], tmp_path) == {0: previous[0]["slide"]}
+
+    def test_missing_media_not_reused(self, tmp_path):
+        previous = [{"fingerprint": "a", "slide": _slide(0, "media/slide_0_shape_1.png")}]
+        assert reusable_slides(previous, ["a"], tmp_path) == {}
+
+    def test_missing_variant_not_reused(self, tmp_path):
+        (tmp_path / "slide_0_shape_1.png").write_bytes(b"png")
+        slide = _slide(0, "media/slide_0_shape_1.png")
+        slide["media"][0]["variants"] = [
+            {"path": "media/slide_0_shape_1.webp", "width": 1, "type": "image/webp"}
+        ]
+        assert reusable_slides([{"fingerprint": "a", "slide": slide}], ["a"], tmp_path) == {}
+
+    def test_degraded_media_not_reused(self, tmp_path):
+        (tmp_path / "slide_0_shape_1.png").write_bytes(b"original")
+        slide = _slide(0, "media/slide_0_shape_1.png")
+        slide["media"][0]["degraded"] = {
+            "stage": "image",
+            "reason": "item deadline",
+            "fallback": "original",
+        }
+        assert reusable_slides([{"fingerprint": "a", "slide": slide}], ["a"], tmp_path) == {}
+
+    def test_shared_media_owner_must_be_reused(self, tmp_path):
+        (tmp_path / "slide_0_shape_1.png").write_bytes(b"logo")
+        previous = [
+            {"fingerprint": "a", "slide": _slide(0, "media/slide_0_shape_1.png")},
+            {"fingerprint": "b", "slide": _slide(1, "media/slide_0_shape_1.png")},
+            {"fingerprint": "c", "slide": _slide(2, "media/slide_1_shape_1.png")},
+        ]
+        (tmp_path / "slide_1_shape_1.png").write_bytes(b"photo")
+
+        # Slide 0 changed, so slide 1 (sharing its logo) and then slide 2
+        # (sharing slide 1's photo) must be re-extracted as well.
+        assert reusable_slides(previous, ["changed", "b", "c"], tmp_path) == {}
+        assert set(reusable_slides(previous, ["a", "b", "changed"], tmp_path)) == {0, 1}
+
+
+class TestIncrementalPptToYaml:
+    def _load(self, yaml_path):
+        with open(yaml_path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+
+    def test_unchanged_slides_reused(self, tmp_path, capsys, make_deck, png):
+        deck = tmp_path / "deck.pptx"
+        output = tmp_path / "output"
+        make_deck(deck, ["One", "Two", "Three"], {1: png("red")})
+
+        first = self._load(ppt_to_yaml(str(deck), str(output), incremental=True))
+        assert "reused 0 of 3 slides" in capsys.readouterr().out
+
+        make_deck(deck, ["One", "Two", "Three changed"], {1: png("red")})
+        second = self._load(ppt_to_yaml(str(deck), str(output), incremental=True))
+
+        assert "reused 2 of 3 slides" in capsys.readouterr().out
+        assert second["slides"][:2] == first["slides"][:2]
+        assert second["slides"][2]["title"] == "Three changed"
+
+    def test_reused_slide_not_reprocessed(self, tmp_path, mocker, make_deck, png):
+        deck = tmp_path / "deck.pptx"
+        output = tmp_path / "output"
+        make_deck(deck, ["One"], {0: png("red")})
+        ppt_to_yaml(str(deck), str(output), incremental=True)
+
+        process = mocker.patch("ppt_to_web.ppt_to_yaml._process_media", return_value=[])
+        data = self._load(ppt_to_yaml(str(deck), str(output), incremental=True))
+
+        assert process.call_args.args[0] == []
+        assert data["slides"][0]["media"][0]["path"] == "media/slide_0_shape_2.png"
+
+    def test_without_flag_no_manifest(self, tmp_path, make_deck):
+        deck = tmp_path / "deck.pptx"
+        make_deck(deck, ["One"])
+        ppt_to_yaml(str(deck), str(tmp_path / "output"))
+        assert not (tmp_path / "output" / "deck.manifest.json").exists()
+
+    def test_external_relationship_hashed(self):
+        rel = MagicMock(is_external=True, target_ref="https://example.com")
+        slide = MagicMock()
+        slide.part.blob = b"<p:sld/>"
+        slide.part.rels = {"rId2": rel}
+        assert len(slide_fingerprint(slide)) == 64
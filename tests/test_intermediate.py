@@ -0,0 +1,120 @@
+"""Tests for intermediate module."""
+
+import json
+
+import pytest
+import yaml
+
+from ppt_to_web.intermediate import (
+    assemble_deck,
+    dump_deck,
+    dump_deck_stream,
+    iter_deck_stream,
+    load_deck,
+)
+
+SAMPLE = {
+    "title": "deck",
+    "cover_title": "封面",
+    "hero_image": None,
+    "slides": [{"slide_number": 1, "media": [{"type": "chart", "series": [1.5, 2.0]}]}],
+    "total_slides": 1,
+}
+
+
+class TestDumpDeck:
+    def test_yaml_preserves_key_order_and_unicode(self, tmp_path):
+        path = tmp_path / "deck.yaml"
+        dump_deck(SAMPLE, path)
+        text = path.read_text(encoding="utf-8")
+        assert text.startswith("title: deck")
+        assert "封面" in text
+        assert yaml.safe_load(text) == SAMPLE
+
+    def test_json_is_compact(self, tmp_path):
+        path = tmp_path / "deck.json"
+        dump_deck(SAMPLE, path)
+        text = path.read_text(encoding="utf-8")
+        assert ", " not in text
+        assert "封面" in text
+        assert json.loads(text) == SAMPLE
+
+
+def _slide(number, title, highlighted=False):
+    return {
+        "slide_number": number,
+        "title": title,
+        "content": [{"type": "text", "value": "body"}] if title else [],
+        "media": [],
+        "is_highlighted": highlighted,
+        "layout": "",
+    }
+
+
+class TestAssembleDeck:
+    def test_summary_fields(self):
+        slides = [_slide(1, "First\nline"), _slide(2, ""), _slide(3, "Key", highlighted=True)]
+        data = assemble_deck("deck", iter(slides))
+        assert data["cover_title"] == "First line"
+        assert [slide["slide_number"] for slide in data["slides"]] == [1, 3]
+        assert data["highlighted_sections"] == [
+            {"slide_number": 3, "title": "Key", "content": [{"type": "text", "value": "body"}]}
+        ]
+        assert data["total_slides"] == 2
+
+    def test_cover_title_falls_back_to_name(self):
+        assert assemble_deck("deck", [])["cover_title"] == "deck"
+
+
+class TestDumpDeckStream:
+    @pytest.mark.parametrize("name", ["deck.yaml", "deck.jsonl"])
+    def test_round_trip(self, tmp_path, name):
+        path = tmp_path / name
+        slides = [_slide(1, "封面"), _slide(2, "Key", highlighted=True)]
+        assert dump_deck_stream("deck", iter(slides), path) == 2
+        assert load_deck(path) == assemble_deck("deck", slides)
+
+    def test_one_line_per_slide(self, tmp_path):
+        path = tmp_path / "deck.jsonl"
+        dump_deck_stream("deck", [_slide(1, "A"), _slide(2, "B")], path)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])["title"] == "deck"
+
+    def test_written_while_iterating(self, tmp_path):
+        path = tmp_path / "deck.yaml"
+
+        def slides():
+            yield _slide(1, "A")
+            # The first slide is on disk before the next one is produced
+            documents = list(iter_deck_stream(path))
+            assert documents[1]["title"] == "A"
+            yield _slide(2, "B")
+
+        dump_deck_stream("deck", slides(), path)
+        assert [doc["title"] for doc in iter_deck_stream(path)] == ["deck", "A", "B"]
+
+    def test_stream_without_header_rejected(self, tmp_path):
+        path = tmp_path / "deck.jsonl"
+        path.write_text(json.dumps(_slide(1, "A")) + "\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_deck(path)
+
+
+class TestLoadDeck:
+    @pytest.mark.parametrize("name", ["deck.yaml", "deck.yml", "deck.json"])
+    def test_round_trip(self, tmp_path, name):
+        path = tmp_path / name
+        dump_deck(SAMPLE, path)
+        assert load_deck(path) == SAMPLE
+
+    def test_sniffs_json_without_extension(self, tmp_path):
+        path = tmp_path / "deck.data"
+        path.write_text(json.dumps(SAMPLE), encoding="utf-8")
+        assert load_deck(path) == SAMPLE
+
+    def test_rejects_unsafe_yaml_tags(self, tmp_path):
+        path = tmp_path / "deck.yaml"
+        path.write_text("title: !!python/object/apply:os.system ['true']\n")
+        with pytest.raises(yaml.YAMLError):
+            load_deck(path)
@@ -0,0 +1,193 @@
+"""Tests for libreoffice module."""
+
+import subprocess
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from ppt_to_web.budget import DeckBudget
+from ppt_to_web.libreoffice import LibreOfficePool
+
+
+def _fake_popen(convert=lambda paths: paths, returncode=0, hang=False):
+    """Build a Popen replacement that writes PNGs for the files ``convert`` picks."""
+    calls = []
+
+    def popen(command, **kwargs):
+        outdir = Path(command[command.index("--outdir") + 1])
+        inputs = [Path(arg) for arg in command[command.index("--outdir") + 2 :]]
+        calls.append(inputs)
+        for path in convert(inputs):
+            (outdir / f"{path.stem}.png").write_bytes(b"png")
+        process = MagicMock()
+        process.pid = 123
+        if hang:
+            process.wait.side_effect = [subprocess.TimeoutExpired(command, 1), None]
+        else:
+            process.wait.return_value = returncode
+        return process
+
+    return popen, calls
+
+
+def _sources(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"slide_{i}_shape_0.emf"
+        path.write_bytes(b"emf")
+        paths.append(path)
+    return paths
+
+
+class TestLibreOfficePool:
+    def test_empty_input(self, tmp_path):
+        with LibreOfficePool() as pool:
+            assert pool.convert([], tmp_path) == {}
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value=None)
+    def test_missing_binary(self, mock_which, tmp_path):
+        paths = _sources(tmp_path, 2)
+        with LibreOfficePool() as pool:
+            assert pool.convert(paths, tmp_path) == {paths[0]: None, paths[1]: None}
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_converts_in_batches(self, mock_which, tmp_path):
+        popen, calls = _fake_popen()
+        paths = _sources(tmp_path, 5)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1, batch_size=2) as pool:
+                results = pool.convert(paths, tmp_path)
+
+        assert [len(batch) for batch in calls] == [2, 2, 1]
+        assert results == {path: tmp_path / f"{path.stem}.png" for path in paths}
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_output_of_earlier_run_not_reported(self, mock_which, tmp_path):
+        paths = _sources(tmp_path, 2)
+        for path in paths:
+            (tmp_path / f"{path.stem}.png").write_bytes(b"old png")
+        # soffice exits 0 but only converts the first file this time
+        popen, _ = _fake_popen(convert=lambda inputs: inputs[:1])
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1) as pool:
+                results = pool.convert(paths, tmp_path)
+
+        assert results == {paths[0]: tmp_path / f"{paths[0].stem}.png", paths[1]: None}
+        assert (tmp_path / f"{paths[0].stem}.png").read_bytes() == b"png"
+        assert not (tmp_path / f"{paths[1].stem}.png").exists()
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_source_converted_in_place_kept(self, mock_which, tmp_path):
+        source = tmp_path / "slide_0_shape_0.png"
+        source.write_bytes(b"broken png")
+        popen, _ = _fake_popen(convert=lambda inputs: [])
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1) as pool:
+                assert pool.convert([source], tmp_path) == {source: None}
+        assert source.read_bytes() == b"broken png"
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_workers_use_private_profiles(self, mock_which, tmp_path):
+        profiles = set()
+
+        def popen(command, **kwargs):
+            profiles.add(command[1])
+            process = MagicMock()
+            process.wait.return_value = 0
+            return process
+
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=2, batch_size=1) as pool:
+                pool.convert(_sources(tmp_path, 4), tmp_path)
+
+        assert all(p.startswith("-env:UserInstallation=file://") for p in profiles)
+        assert 1 <= len(profiles) <= 2
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_crashed_batch_retries_individually(self, mock_which, tmp_path):
+        # The batch dies after the first file; retries succeed one by one.
+        popen, calls = _fake_popen(
+            convert=lambda paths: paths[:1], returncode=-11
+        )
+        paths = _sources(tmp_path, 3)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1, batch_size=3) as pool:
+                results = pool.convert(paths, tmp_path)
+
+        assert calls == [paths, [paths[1]], [paths[2]]]
+        assert all(results[path] is not None for path in paths)
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_unconvertible_file_not_retried(self, mock_which, tmp_path):
+        popen, calls = _fake_popen(convert=lambda paths: paths[:1], returncode=0)
+        paths = _sources(tmp_path, 2)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1) as pool:
+                results = pool.convert(paths, tmp_path)
+
+        assert len(calls) == 1
+        assert results[paths[1]] is None
+
+    @patch("ppt_to_web.libreoffice.os.killpg")
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_timeout_kills_process_group(self, mock_which, mock_killpg, tmp_path):
+        popen, _ = _fake_popen(convert=lambda paths: [], hang=True)
+        paths = _sources(tmp_path, 1)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1, timeout=1) as pool:
+                results = pool.convert(paths, tmp_path)
+
+        mock_killpg.assert_called_once()
+        assert results[paths[0]] is None
+
+    @patch("ppt_to_web.libreoffice.os.killpg")
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_budget_sets_deadlines(self, mock_which, mock_killpg, tmp_path):
+        processes = []
+
+        def popen(command, **kwargs):
+            process = MagicMock()
+            process.wait.side_effect = [subprocess.TimeoutExpired(command, 1), None]
+            processes.append(process)
+            return process
+
+        paths = _sources(tmp_path, 2)
+        budget = DeckBudget(item_seconds=5)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1, batch_size=2, timeout=60) as pool:
+                results = pool.convert(paths, tmp_path, budget=budget)
+
+        # The batch and then each file on its own get the item deadline
+        assert [p.wait.call_args_list[0].kwargs["timeout"] for p in processes] == [10, 5, 5]
+        assert results == {paths[0]: None, paths[1]: None}
+        assert budget.ran_out(paths[0]) and budget.ran_out(paths[1])
+
+    @patch("ppt_to_web.libreoffice.shutil.which", return_value="/usr/bin/soffice")
+    def test_spent_budget_starts_nothing(self, mock_which, tmp_path):
+        popen, calls = _fake_popen()
+        paths = _sources(tmp_path, 2)
+        budget = DeckBudget(deck_seconds=0.001)
+        time.sleep(0.01)
+        with patch("ppt_to_web.libreoffice.subprocess.Popen", side_effect=popen):
+            with LibreOfficePool(size=1) as pool:
+                results = pool.convert(paths, tmp_path, budget=budget)
+
+        assert calls == []
+        assert results == {paths[0]: None, paths[1]: None}
+
+    def test_health_check_clears_stale_lock(self):
+        with LibreOfficePool(size=1) as pool:
+            profile = pool._profile_dir(0)
+            profile.mkdir(parents=True)
+            (profile / ".lock").write_text("stale")
+            pool._check_health(0)
+            assert profile.is_dir()
+            assert not (profile / ".lock").exists()
+
+    def test_close_removes_profiles(self):
+        pool = LibreOfficePool(size=1)
+        pool._check_health(0)
+        root = pool._root
+        assert root.is_dir()
+        pool.close()
+        assert not root.exists()
@@ -0,0 +1,198 @@
+"""Tests for media_sync module."""
+
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+
+from ppt_to_web.media_sync import (
+    _is_up_to_date,
+    fingerprint_media,
+    referenced_media,
+    rewrite_media_paths,
+    sync_media,
+)
+
+
+def _write(path, content=b"image"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+class TestReferencedMedia:
+    def test_collects_nested_media_paths(self):
+        data = {
+            "hero_image": "hero_images/cover.jpg",
+            "slides": [
+                {"media": [{"type": "image", "path": "media/a.png"}]},
+                {"media": [{"type": "chart", "chart_id": "chart_1_0"}]},
+                {"media": [{"type": "image", "path": "media/a.png", "extra": ["media/b.webp"]}]},
+            ],
+        }
+        assert referenced_media(data) == {"a.png", "b.webp"}
+
+    def test_empty(self):
+        assert referenced_media({"slides": []}) == set()
+
+
+class TestRewriteMediaPaths:
+    def test_renames_mapped_paths(self):
+        data = {
+            "hero_image": "hero_images/cover.jpg",
+            "slides": [{"media": [{"path": "media/a.png"}, {"path": "media/b.png"}]}],
+        }
+        result = rewrite_media_paths(data, {"a.png": "a.0123.png"})
+        assert result["slides"][0]["media"] == [
+            {"path": "media/a.0123.png"},
+            {"path": "media/b.png"},
+        ]
+        assert result["hero_image"] == "hero_images/cover.jpg"
+        assert data["slides"][0]["media"][0]["path"] == "media/a.png"
+
+
+class TestIsUpToDate:
+    def test_missing_destination(self, tmp_path):
+        assert not _is_up_to_date(_write(tmp_path / "a"), tmp_path / "b")
+
+    def test_size_differs(self, tmp_path):
+        src = _write(tmp_path / "a", b"one")
+        dst = _write(tmp_path / "b", b"three")
+        assert not _is_up_to_date(src, dst)
+
+    def test_same_size_and_mtime(self, tmp_path):
+        src = _write(tmp_path / "a", b"one")
+        dst = _write(tmp_path / "b", b"one")
+        os.utime(dst, (src.stat().st_atime, src.stat().st_mtime))
+        with patch("ppt_to_web.media_sync._file_hash") as file_hash:
+            assert _is_up_to_date(src, dst)
+        file_hash.assert_not_called()
+
+    def test_mtime_drift_settled_by_hash(self, tmp_path):
+        src = _write(tmp_path / "a", b"one")
+        dst = _write(tmp_path / "b", b"one")
+        os.utime(dst, (0, 0))
+        assert _is_up_to_date(src, dst)
+        assert int(dst.stat().st_mtime) == int(src.stat().st_mtime)
+
+    def test_same_size_different_content(self, tmp_path):
+        src = _write(tmp_path / "a", b"one")
+        dst = _write(tmp_path / "b", b"two")
+        os.utime(dst, (0, 0))
+        assert not _is_up_to_date(src, dst)
+
+
+class TestSyncMedia:
+    def test_copies_named_files_only(self, tmp_path):
+        _write(tmp_path / "src" / "a.png")
+        _write(tmp_path / "src" / "unused.png")
+
+        stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+
+        assert stats["copied"] == 1
+        assert (tmp_path / "dst" / "a.png").exists()
+        assert not (tmp_path / "dst" / "unused.png").exists()
+
+    def test_second_sync_skips(self, tmp_path):
+        _write(tmp_path / "src" / "a.png")
+        sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+
+        stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+
+        assert stats == {"copied": 0, "linked": 0, "skipped": 1, "missing": 0}
+
+    def test_changed_source_recopied(self, tmp_path):
+        src = _write(tmp_path / "src" / "a.png", b"old")
+        sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+        src.write_bytes(b"newer")
+
+        stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+
+        assert stats["copied"] == 1
+        assert (tmp_path / "dst" / "a.png").read_bytes() == b"newer"
+
+    def test_hardlink(self, tmp_path):
+        src = _write(tmp_path / "src" / "a.png")
+
+        stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst", "hardlink")
+
+        assert stats["linked"] == 1
+        assert (tmp_path / "dst" / "a.png").stat().st_ino == src.stat().st_ino
+
+    def test_link_failure_falls_back_to_copy(self, tmp_path):
+        _write(tmp_path / "src" / "a.png")
+
+        with patch("ppt_to_web.media_sync.os.link", side_effect=OSError("EXDEV")):
+            stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst", "hardlink")
+
+        assert stats["copied"] == 1
+        assert (tmp_path / "dst" / "a.png").read_bytes() == b"image"
+
+    def test_reflink_falls_back_when_unsupported(self, tmp_path):
+        _write(tmp_path / "src" / "a.png")
+
+        with patch("ppt_to_web.media_sync._reflink", side_effect=OSError("EOPNOTSUPP")):
+            stats = sync_media({"a.png"}, tmp_path / "src", tmp_path / "dst", "reflink")
+
+        assert stats["copied"] == 1
+
+    def test_missing_source_counted(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        stats = sync_media({"gone.png"}, tmp_path / "src", tmp_path / "dst")
+        assert stats["missing"] == 1
+
+    def test_same_directory_is_noop(self, tmp_path):
+        _write(tmp_path / "media" / "a.png")
+        stats = sync_media({"a.png"}, tmp_path / "media", tmp_path / "media")
+        assert stats["skipped"] == 1
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            sync_media({"a.png"}, tmp_path, tmp_path / "dst", "symlink")
+
+
+class TestFingerprintMedia:
+    def test_names_follow_content(self, tmp_path):
+        _write(tmp_path / "src" / "a.png", b"one")
+        _write(tmp_path / "src" / "b_480w.webp", b"two")
+        names = {"a.png", "b_480w.webp"}
+        mapping, stats = fingerprint_media(names, tmp_path / "src", tmp_path / "dst")
+
+        assert re.fullmatch(r"[0-9a-f]{12}\.png", mapping["a.png"])
+        assert re.fullmatch(r"[0-9a-f]{12}\.webp", mapping["b_480w.webp"])
+        assert (tmp_path / "dst" / mapping["a.png"]).read_bytes() == b"one"
+        assert stats["copied"] == 2
+
+        _write(tmp_path / "src" / "a.png", b"changed")
+        changed, stats = fingerprint_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+        assert changed["a.png"] != mapping["a.png"]
+        assert stats["copied"] == 1
+
+    def test_names_ignore_slide_position(self, tmp_path):
+        _write(tmp_path / "src" / "slide_0_shape_1.png", b"logo")
+        _write(tmp_path / "src" / "slide_3_shape_2.png", b"logo")
+        names = {"slide_0_shape_1.png", "slide_3_shape_2.png"}
+        mapping, stats = fingerprint_media(names, tmp_path / "src", tmp_path / "dst")
+
+        assert mapping["slide_0_shape_1.png"] == mapping["slide_3_shape_2.png"]
+        assert [p.name for p in (tmp_path / "dst").iterdir()] == [mapping["slide_0_shape_1.png"]]
+        assert stats["copied"] == 1 and stats["skipped"] == 1
+
+    def test_unchanged_file_skipped(self, tmp_path):
+        _write(tmp_path / "src" / "a.png")
+        fingerprint_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+        _, stats = fingerprint_media({"a.png"}, tmp_path / "src", tmp_path / "dst")
+        assert stats["skipped"] == 1
+
+    def test_in_place(self, tmp_path):
+        _write(tmp_path / "media" / "a.png")
+        mapping, _ = fingerprint_media({"a.png"}, tmp_path / "media", tmp_path / "media")
+        assert (tmp_path / "media" / mapping["a.png"]).exists()
+        assert (tmp_path / "media" / "a.png").exists()
+
+    def test_missing_source_counted(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        mapping, stats = fingerprint_media({"gone.png"}, tmp_path / "src", tmp_path / "dst")
+        assert mapping == {}
+        assert stats["missing"] == 1
@@ -0,0 +1,296 @@
+"""Tests for metafile module."""
+
+import gzip
+import struct
+from pathlib import Path
+
+import pptx
+import pytest
+from lxml import etree
+
+from ppt_to_web.metafile import metafile_to_svg, placeholder_svg
+
+OFFICE_ICONS = Path(pptx.__file__).parent / "templates"
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _record(record_type, payload=b""):
+    return struct.pack("<II", record_type, 8 + len(payload)) + payload
+
+
+def _emf(*records, frame=(0, 0, 2540, 2540)):
+    """An EMF on a 10 px/mm reference device; a 25.4 mm frame is 254 device units."""
+    body = b"".join(records) + _record(14, struct.pack("<3I", 0, 16, 20))
+    header = struct.pack("<4i4i", 0, 0, 254, 254, *frame)
+    header += b" EMF" + struct.pack("<IIIHHIII", 0x10000, 0, 0, 0, 0, 0, 0, 0)
+    header += struct.pack("<4i", 1000, 1000, 100, 100)
+    return _record(1, header) + body
+
+
+def _poly16(record_type, points):
+    values = [v for point in points for v in point]
+    return _record(
+        record_type,
+        struct.pack("<4i", 0, 0, 0, 0)
+        + struct.pack(f"<I{len(values)}h", len(points), *values),
+    )
+
+
+def _brush(index, color):
+    return _record(39, struct.pack("<4I", index, 0, color, 0))
+
+
+def _select(index):
+    return _record(37, struct.pack("<I", index))
+
+
+def _font(index, face, height=-20):
+    logfont = struct.pack("<5i8B", height, 0, 0, 0, 700, 0, 0, 0, 0, 0, 0, 0, 0)
+    face = face.encode("utf-16-le").ljust(64, b"\0")
+    return _record(82, struct.pack("<I", index) + logfont + face)
+
+
+def _text(x, y, string, dx=None):
+    encoded = string.encode("utf-16-le")
+    encoded += b"\0" * (-len(encoded) % 4)
+    string_offset = 76
+    dx_offset = string_offset + len(encoded) if dx else 0
+    payload = struct.pack("<4iIff", 0, 0, 0, 0, 1, 1.0, 1.0)
+    payload += struct.pack("<2i3I4iI", x, y, len(string), string_offset, 0, 0, 0, 0, 0, dx_offset)
+    payload += encoded
+    if dx:
+        payload += struct.pack(f"<{len(dx)}i", *dx)
+    return _record(84, payload)
+
+
+def _svg(data):
+    result = metafile_to_svg(data)
+    assert result is not None
+    svg, width, height = result
+    return etree.fromstring(svg.encode("utf-8")), width, height
+
+
+class TestEmf:
+    def test_filled_polygon(self):
+        root, width, height = _svg(
+            _emf(_brush(1, 0x0000FF), _select(1), _poly16(86, [(10, 10), (100, 10), (100, 100)]))
+        )
+
+        assert (width, height) == (96, 96)
+        assert root.get("viewBox") == "0 0 254 254"
+        path = root.find(f"{SVG}path")
+        assert path.get("d") == "M10 10L100 10 100 100Z"
+        assert path.get("fill") == "#f00"
+        assert path.get("fill-rule") == "evenodd"
+        assert path.get("stroke") == "#000"
+
+    def test_connected_lines_merged(self):
+        root, _, _ = _svg(
+            _emf(
+                _record(27, struct.pack("<2i", 0, 0)),
+                _record(54, struct.pack("<2i", 10, 0)),
+                _record(54, struct.pack("<2i", 10, 10)),
+                _poly16(89, [(0, 10), (0, 0)]),
+            )
+        )
+
+        paths = root.findall(f"{SVG}path")
+        assert len(paths) == 1
+        assert paths[0].get("d") == "M0 0L10 0 10 10 0 10 0 0"
+        assert paths[0].get("fill") == "none"
+
+    def test_window_mapped_to_viewport(self):
+        root, _, _ = _svg(
+            _emf(
+                _record(17, struct.pack("<I", 8)),  # MM_ANISOTROPIC
+                _record(9, struct.pack("<2i", 100, 100)),
+                _record(11, struct.pack("<2i", 200, -200)),
+                _record(12, struct.pack("<2i", 0, 200)),
+                _record(43, struct.pack("<4i", 10, 10, 50, 60)),
+            )
+        )
+
+        assert root.find(f"{SVG}path").get("d") == "M20 180L100 180 100 80 20 80Z"
+
+    def test_ellipse_as_curves(self):
+        root, _, _ = _svg(_emf(_record(42, struct.pack("<4i", 0, 0, 100, 50))))
+
+        d = root.find(f"{SVG}path").get("d")
+        assert d.startswith("M100 25C") and d.endswith("Z")
+        assert d.count(" 0 25") == 1  # passes through the leftmost point
+
+    def test_text_with_advances(self):
+        root, _, _ = _svg(
+            _emf(
+                _font(1, "Arial"),
+                _select(1),
+                _record(22, struct.pack("<I", 24 | 6)),  # TA_BASELINE | TA_CENTER
+                _record(24, struct.pack("<I", 0x00336699)),
+                _text(100, 50, "Hi <3", dx=[10, 4, 6, 8, 8]),
+            )
+        )
+
+        text = root.find(f"{SVG}text")
+        assert text.text == "Hi <3"
+        assert text.get("x") == "82 92 96 102 110"
+        assert text.get("y") == "50"
+        assert text.get("font-family") == "'Arial', sans-serif"
+        assert text.get("font-size") == "20"
+        assert text.get("font-weight") == "bold"
+        assert text.get("fill") == "#963"
+
+    def test_clip_restored_with_dc(self):
+        root, _, _ = _svg(
+            _emf(
+                _record(33),  # SAVEDC
+                _record(30, struct.pack("<4i", 0, 0, 50, 50)),
+                _record(43, struct.pack("<4i", 10, 10, 100, 100)),
+                _record(34, struct.pack("<i", -1)),
+                _record(43, struct.pack("<4i", 0, 0, 5, 5)),
+            )
+        )
+
+        clip = root.find(f"{SVG}defs/{SVG}clipPath")
+        group = root.find(f"{SVG}g")
+        assert group.get("clip-path") == f"url(#{clip.get('id')})"
+        assert len(group) == 1
+        assert root[-1].tag == f"{SVG}path"
+
+    def test_bitmap_embedded_as_png(self):
+        bmi = struct.pack("<IiiHHIIiiII", 40, 2, 2, 1, 24, 0, 16, 0, 0, 0, 0)
+        bits = bytes([0, 0, 255, 0, 255, 0, 0, 0, 255, 0, 0, 0, 255, 255, 255, 0])
+        payload = struct.pack("<4i", 0, 0, 0, 0)
+        payload += struct.pack("<6i", 10, 20, 0, 0, 2, 2)
+        payload += struct.pack("<4I", 80, len(bmi), 80 + len(bmi), len(bits))
+        payload += struct.pack("<2I2i", 0, 0x00CC0020, 40, 30)
+        root, _, _ = _svg(_emf(_record(81, payload + bmi + bits)))
+
+        image = root.find(f"{SVG}image")
+        assert (image.get("x"), image.get("y"), image.get("width"), image.get("height")) == (
+            "10",
+            "20",
+            "40",
+            "30",
+        )
+        assert image.get("href").startswith("data:image/png;base64,")
+
+    def test_unsupported_record_falls_back(self):
+        gradient_fill = _record(118, b"\0" * 28)
+        assert metafile_to_svg(_emf(_record(43, b"\0" * 16), gradient_fill)) is None
+
+    def test_emf_plus_only_falls_back(self):
+        comment = _record(70, struct.pack("<I", 4) + b"EMF+")
+        assert metafile_to_svg(_emf(comment)) is None
+
+    def test_gzipped(self):
+        data = _emf(_record(43, struct.pack("<4i", 0, 0, 5, 5)))
+        assert metafile_to_svg(gzip.compress(data)) == metafile_to_svg(data)
+
+    def test_not_a_metafile(self):
+        assert metafile_to_svg(b"\x89PNG\r\n\x1a\n" + b"\0" * 64) is None
+
+
+class TestOfficeIcons:
+    def test_icon_with_clip_path_bitmap_and_text(self):
+        data = (OFFICE_ICONS / "docx-icon.emf").read_bytes()
+        root, width, height = _svg(data)
+
+        assert (width, height) == (100, 62)
+        assert root.find(f"{SVG}defs/{SVG}clipPath") is not None
+        assert root.find(f".//{SVG}image") is not None
+        assert "".join(t.text for t in root.iter(f"{SVG}text")) == "Microsoft Word Document"
+        assert len(etree.tostring(root)) < len(data) / 10
+
+    def test_masked_icon_falls_back(self):
+        # Drawn with SRCAND/SRCINVERT mask blits, which only a rasterizer reproduces
+        assert metafile_to_svg((OFFICE_ICONS / "generic-icon.emf").read_bytes()) is None
+
+
+def _wmf(*records, placeable=(0, 0, 1440, 720), inch=1440):
+    body = b"".join(records) + struct.pack("<IH", 3, 0)
+    header = struct.pack("<HHHIHIH", 1, 9, 0x300, 0, 0, 0, 0)
+    if placeable is None:
+        return header + body
+    return struct.pack("<IH4hHIH", 0x9AC6CDD7, 0, *placeable, inch, 0, 0) + header + body
+
+
+def _wmf_record(function, *shorts, raw=b""):
+    params = struct.pack(f"<{len(shorts)}h", *shorts) + raw
+    return struct.pack("<IH", 3 + len(params) // 2, function) + params
+
+
+class TestWmf:
+    def test_window_mapped_onto_placeable_frame(self):
+        root, width, height = _svg(
+            _wmf(
+                _wmf_record(0x020B, 0, 0),  # SETWINDOWORG y, x
+                _wmf_record(0x020C, 72, 144),  # SETWINDOWEXT y, x
+                _wmf_record(0x02FC, raw=struct.pack("<HIH", 0, 0x00FF00, 0)),
+                _wmf_record(0x012D, 0),
+                _wmf_record(0x0324, 3, 0, 0, 144, 0, 144, 72),
+            )
+        )
+
+        assert (width, height) == (96, 48)
+        assert root.get("viewBox") == "0 0 1440 720"
+        path = root.find(f"{SVG}path")
+        assert path.get("d") == "M0 0L1440 0 1440 720Z"
+        assert path.get("fill") == "#0f0"
+
+    def test_text_in_font_charset(self):
+        face = "新細明體".encode("cp950").ljust(32, b"\0")
+        font = struct.pack("<5h8B", -200, 0, 0, 0, 400, 0, 0, 0, 136, 0, 0, 0, 0) + face
+        string = "簡報".encode("cp950")
+        root, _, _ = _svg(
+            _wmf(
+                _wmf_record(0x02FB, raw=font),
+                _wmf_record(0x012D, 0),
+                _wmf_record(0x012E, 24),
+                _wmf_record(0x0521, len(string), raw=string + struct.pack("<2h", 400, 100)),
+            )
+        )
+
+        text = root.find(f"{SVG}text")
+        assert text.text == "簡報"
+        assert (text.get("x"), text.get("y")) == ("100", "400")
+        assert text.get("font-family") == "'新細明體', sans-serif"
+
+    def test_frame_from_window_without_placeable_header(self):
+        root, _, _ = _svg(
+            _wmf(
+                _wmf_record(0x020C, -100, 200),  # y points up
+                _wmf_record(0x041B, -100, 200, 0, 0),  # RECTANGLE bottom, right, top, left
+                placeable=None,
+            )
+        )
+
+        assert root.get("viewBox") == "0 0 200 100"
+        assert root.find(f"{SVG}path").get("d") == "M0 0L200 0 200 100 0 100Z"
+
+    def test_pattern_blit_without_bitmap(self):
+        # DIBBITBLT with PATCOPY and no bitmap fills with the brush
+        params = struct.pack("<I7h", 0x00F00021, 0, 0, 0, 50, 60, 10, 20)
+        root, _, _ = _svg(_wmf(struct.pack("<IH", 3 + len(params) // 2, 0x0940) + params))
+
+        assert root.find(f"{SVG}path").get("d") == "M20 10L80 10 80 60 20 60Z"
+
+    @pytest.mark.parametrize("rop", [0x008800C6, 0x00660046])
+    def test_mask_blit_falls_back(self, rop):
+        params = struct.pack("<I7h", rop, 0, 0, 0, 50, 60, 10, 20)
+        record = struct.pack("<IH", 3 + len(params) // 2, 0x0940) + params
+        assert metafile_to_svg(_wmf(record)) is None
+
+
+class TestPlaceholderSvg:
+    def test_sized_from_emf_frame(self):
+        data = gzip.compress(_emf(_record(118, b"\0" * 28), frame=(0, 0, 5080, 2540)))
+        svg, width, height = placeholder_svg(data)
+
+        assert (width, height) == (192, 96)
+        assert etree.fromstring(svg.encode("utf-8")).get("viewBox") == "0 0 192 96"
+
+    def test_sized_from_wmf_placeable_header(self):
+        assert placeholder_svg(_wmf(placeable=(0, 0, 2880, 1440)))[1:] == (192, 96)
+
+    def test_unknown_size(self):
+        assert placeholder_svg(_wmf(placeable=None))[1:] == (320, 240)
@@ -0,0 +1,214 @@
+"""Tests for ooxml module: the fast engine must match python-pptx extraction."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.dml.color import RGBColor
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.enum.shapes import MSO_CONNECTOR, MSO_SHAPE
+from pptx.util import Inches
+
+from ppt_to_web.budget import DeckBudget
+from ppt_to_web.ooxml import OoxmlPackage, PackagePart
+from ppt_to_web.ppt_to_yaml import _make_media_result, extract_deck
+
+
+@pytest.fixture
+def deck_path(tmp_path, png):
+    """A deck exercising text, pictures, charts, groups, tables and empty slides."""
+
+    def _png(color):
+        return io.BytesIO(png(color, (64, 48)))
+
+    prs = Presentation()
+
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Quarterly\nReview"
+    slide.placeholders[1].text_frame.text = "封面 subtitle"
+
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Results"
+    body = slide.placeholders[1].text_frame
+    body.text = "First point"
+    body.add_paragraph().text = "Second point"
+    box = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, Inches(2), Inches(1))
+    box.fill.solid()
+    box.fill.fore_color.rgb = RGBColor(0xFF, 0xCC, 0x00)
+    box.text_frame.text = "Key takeaway"
+    slide.shapes.add_picture(_png("red"), Inches(1), Inches(1), width=Inches(3))
+    cropped = slide.shapes.add_picture(_png("blue"), Inches(4), Inches(1), width=Inches(2))
+    cropped.crop_left, cropped.crop_right = 0.1, 0.25
+    # The same image again is deduplicated by the media stage
+    slide.shapes.add_picture(_png("red"), Inches(1), Inches(4), width=Inches(1))
+
+    data = CategoryChartData()
+    data.categories = ["Q1", "Q2", "Q3"]
+    data.add_series("Revenue", (1.5, 2.0, 3.25))
+    data.add_series("Cost", (1.0, None, 2.0))
+    chart = slide.shapes.add_chart(
+        XL_CHART_TYPE.BAR_STACKED, 0, Inches(5), Inches(4), Inches(2), data
+    ).chart
+    chart.has_title = True
+    chart.chart_title.text_frame.text = "Revenue and cost"
+
+    prs.slides.add_slide(prs.slide_layouts[6])  # blank: dropped by both engines
+
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Details"
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(0, 0, Inches(1), Inches(1)).text_frame.text = "grouped"
+    slide.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, 0, 0, Inches(1), Inches(1))
+    slide.shapes.add_table(2, 2, 0, Inches(2), Inches(2), Inches(1))
+    pie = CategoryChartData()
+    pie.categories = ["A", "B"]
+    pie.add_series("Share", (60, 40))
+    slide.shapes.add_chart(XL_CHART_TYPE.PIE, 0, 0, Inches(3), Inches(3), pie)
+    line = CategoryChartData()
+    line.categories = [str(i) for i in range(50)]
+    line.add_series("Trend", [float(i % 7) for i in range(50)])
+    slide.shapes.add_chart(XL_CHART_TYPE.LINE_MARKERS, 0, 0, Inches(3), Inches(3), line)
+    xy = XyChartData()
+    series = xy.add_series("Points")
+    for x in range(5):
+        series.add_data_point(x, x * x)
+    slide.shapes.add_chart(XL_CHART_TYPE.XY_SCATTER, 0, 0, Inches(3), Inches(3), xy)
+
+    path = tmp_path / "deck.pptx"
+    prs.save(path)
+    return path
+
+
+def _fake_web_image(blob, path, *args):
+    path.write_bytes(blob.read() if isinstance(blob, PackagePart) else blob)
+    return _make_media_result(f"media/{path.name}", 64, 48)
+
+
+class TestFastEngine:
+    @pytest.mark.parametrize("max_chart_points", [2000, 10])
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_matches_python_pptx(self, mock_web, deck_path, tmp_path, max_chart_points):
+        expected = extract_deck(
+            str(deck_path), str(tmp_path / "pptx"), max_chart_points=max_chart_points
+        )
+        actual = extract_deck(
+            str(deck_path),
+            str(tmp_path / "fast"),
+            max_chart_points=max_chart_points,
+            engine="fast",
+        )
+
+        assert actual == expected
+        assert expected["total_slides"] == 3
+        assert [m["type"] for m in expected["slides"][1]["media"]] == ["image"] * 3 + ["chart"]
+        assert sorted(p.name for p in (tmp_path / "fast" / "media").iterdir()) == sorted(
+            p.name for p in (tmp_path / "pptx" / "media").iterdir()
+        )
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_display_extent_passed_to_resampling(self, mock_web, deck_path, tmp_path):
+        extract_deck(str(deck_path), str(tmp_path / "fast"), engine="fast")
+        widths = sorted(call.args[4] for call in mock_web.call_args_list)
+        # 1in and 3in at 192 dpi, and 2in showing 65% of the image
+        assert widths == [192, 576, 591]
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_incremental_reuses_slides(self, mock_web, deck_path, tmp_path, capsys):
+        for _ in range(2):
+            extract_deck(str(deck_path), str(tmp_path), incremental=True, engine="fast")
+        assert "reused 4 of 4 slides" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("engine", ["pptx", "fast"])
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_charts_left_out_once_budget_runs_out(
+        self, mock_web, deck_path, tmp_path, capsys, engine
+    ):
+        budget = DeckBudget(deck_seconds=0)
+        data = extract_deck(
+            str(deck_path), str(tmp_path), incremental=True, engine=engine, budget=budget
+        )
+
+        assert not any(m["type"] == "chart" for s in data["slides"] for m in s["media"])
+        charts = [entry for entry in budget.degradations if entry["stage"] == "chart"]
+        assert [(entry["slide"], entry["path"]) for entry in charts] == [
+            (2, "chart_1_6"),
+            (4, "chart_3_4"),
+            (4, "chart_3_5"),
+            (4, "chart_3_6"),
+        ]
+        assert "chart_1_6 on slide 2 was left out (deck budget" in capsys.readouterr().out
+
+        # Slides missing a chart are extracted again once there is time
+        extract_deck(str(deck_path), str(tmp_path), incremental=True, engine=engine)
+        assert "reused 2 of 4 slides" in capsys.readouterr().out
+
+    def test_unknown_engine(self, deck_path, tmp_path):
+        with pytest.raises(ValueError):
+            extract_deck(str(deck_path), str(tmp_path), engine="turbo")
+
+
+class TestLowMemory:
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_matches_python_pptx(self, mock_web, deck_path, tmp_path):
+        expected = extract_deck(str(deck_path), str(tmp_path / "pptx"))
+        actual = extract_deck(str(deck_path), str(tmp_path / "low"), low_memory=True)
+
+        assert actual == expected
+        for name in ("slide_1_shape_3.png", "slide_1_shape_4.png"):
+            assert (tmp_path / "low" / "media" / name).read_bytes() == (
+                tmp_path / "pptx" / "media" / name
+            ).read_bytes()
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", side_effect=_fake_web_image)
+    def test_workers_receive_parts(self, mock_web, deck_path, tmp_path):
+        extract_deck(str(deck_path), str(tmp_path), low_memory=True)
+        parts = [call.args[0] for call in mock_web.call_args_list]
+        assert all(isinstance(part, PackagePart) for part in parts)
+        assert {part.name for part in parts} == {"ppt/media/image1.png", "ppt/media/image2.png"}
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", return_value=None)
+    def test_unprocessed_images_copied_from_archive(self, mock_web, deck_path, tmp_path):
+        data = extract_deck(str(deck_path), str(tmp_path), low_memory=True)
+
+        media = data["slides"][1]["media"][0]
+        assert media["path"] == "media/slide_1_shape_3.png"
+        with OoxmlPackage(deck_path) as package:
+            original = package.read("ppt/media/image1.png")
+        assert (tmp_path / media["path"]).read_bytes() == original
+        assert not list((tmp_path / "media").glob("*.tmp"))
+
+
+class TestPackagePart:
+    def test_reads_on_demand(self, deck_path, tmp_path):
+        with OoxmlPackage(deck_path) as package:
+            part = package.part("ppt/media/image1.png")
+            blob = package.read("ppt/media/image1.png")
+
+        assert part.size == len(blob)
+        assert part.read() == blob
+        assert part.image_ext() == "png"
+        part.copy_to(tmp_path / "copy.png")
+        assert (tmp_path / "copy.png").read_bytes() == blob
+
+
+class TestOoxmlPackage:
+    def test_slide_parts_in_presentation_order(self, deck_path):
+        with OoxmlPackage(deck_path) as package:
+            assert package.slide_parts() == [f"ppt/slides/slide{i}.xml" for i in range(1, 5)]
+            assert package.layout_name("ppt/slides/slide1.xml") == "Title Slide"
+
+    def test_top_level_shapes_only(self, deck_path):
+        with OoxmlPackage(deck_path) as package:
+            shapes = package.slide_shapes("ppt/slides/slide4.xml")
+        # title, group, connector, table and three charts; the grouped text box is not listed
+        assert len(shapes) == 7
+        assert shapes[0].text == "Details"
+        assert [shape.has_chart for shape in shapes] == [False] * 4 + [True] * 3
+        assert all(shape.chart_part for shape in shapes[4:])
+
+    def test_fingerprint_tracks_related_parts(self, deck_path):
+        with OoxmlPackage(deck_path) as package:
+            fingerprints = [package.fingerprint(part) for part in package.slide_parts()]
+        assert len(set(fingerprints)) == 4
@@ -0,0 +1,47 @@
+"""Tests for pipeline module."""
+
+from unittest.mock import patch
+
+from ppt_to_web.pipeline import ppt_to_html
+from ppt_to_web.ppt_to_yaml import extract_deck
+from ppt_to_web.profiling import Profiler
+
+
+class TestPptToHtml:
+    def test_renders_without_intermediate(self, tmp_path, make_deck):
+        deck = make_deck(tmp_path / "deck.pptx", ["Quarterly Review"], body="Revenue grew")
+        output = tmp_path / "output"
+
+        with patch("ppt_to_web.yaml_to_html.load_deck") as load:
+            html_path = ppt_to_html(str(deck), str(output))
+
+        load.assert_not_called()
+        assert html_path == str(output / "deck.html")
+        assert "Revenue grew" in (output / "deck.html").read_text(encoding="utf-8")
+        assert not (output / "deck.yaml").exists()
+        assert (output / "media").is_dir()
+
+    def test_writes_intermediate_on_request(self, tmp_path, make_deck):
+        deck = make_deck(tmp_path / "deck.pptx", ["Quarterly Review"], body="Revenue grew")
+        output = tmp_path / "output"
+
+        ppt_to_html(str(deck), str(output), intermediate_format="json")
+
+        assert (output / "deck.json").exists()
+
+    def test_forwards_extract_options(self, tmp_path, make_deck):
+        deck = make_deck(tmp_path / "deck.pptx", ["Quarterly Review"], body="Revenue grew")
+
+        with patch("ppt_to_web.pipeline.extract_deck", wraps=extract_deck) as extract:
+            ppt_to_html(str(deck), str(tmp_path / "output"), "cover_story.html", jobs=2)
+
+        assert extract.call_args.kwargs["jobs"] == 2
+
+    def test_profiler_covers_both_halves(self, tmp_path, make_deck):
+        deck = make_deck(tmp_path / "deck.pptx", ["Quarterly Review"], body="Revenue grew")
+        profiler = Profiler()
+
+        ppt_to_html(str(deck), str(tmp_path / "output"), profiler=profiler)
+
+        assert {"parse", "extract", "media", "render"} <= profiler.stages.keys()
+        assert profiler.counters["slides"] == 1
@@ -1,11 +1,26 @@
 """Tests for ppt_to_yaml module."""
 
+import struct
+import time
+from pathlib import Path
 from unittest.mock import MagicMock, PropertyMock, patch
 
+import pptx
 import pytest
+from pptx.chart.data import CategoryChartData
 from pptx.enum.chart import XL_CHART_TYPE
-
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Inches
+
+from ppt_to_web.budget import TIMED_OUT, DeckBudget
+from ppt_to_web.cache import MediaCache
+from ppt_to_web.images import ImageOptions
+from ppt_to_web.intermediate import load_deck
+from ppt_to_web.profiling import Profiler
 from ppt_to_web.ppt_to_yaml import (
+    _convert_vector_media,
+    _display_extent,
     _extract_chart,
     _extract_chart_categories,
     _extract_chart_series,
@@ -14,6 +29,13 @@ from ppt_to_web.ppt_to_yaml import (
     _is_highlighted,
     _make_media_result,
     _map_chart_type,
+    _map_jobs,
+    _media_params,
+    _NEEDS_CONVERSION,
+    _MediaTask,
+    _process_media,
+    extract_deck,
+    iter_slides,
     ppt_to_yaml,
 )
 
@@ -180,11 +202,24 @@ class TestExtractChartCategories:
 # --- _extract_chart_series ---
 
 
+def _ser(values):
+    """A ``c:ser`` element caching ``values``, with no point for None."""
+    points = "".join(
+        f'<c:pt idx="{idx}"><c:v>{value}</c:v></c:pt>'
+        for idx, value in enumerate(values)
+        if value is not None
+    )
+    return parse_xml(
+        f"<c:ser {nsdecls('c')}><c:val><c:numRef><c:f>Sheet1!$B$2</c:f><c:numCache>"
+        f'<c:ptCount val="{len(values)}"/>{points}</c:numCache></c:numRef></c:val></c:ser>'
+    )
+
+
 class TestExtractChartSeries:
     def test_single_series(self):
         series = MagicMock()
         series.name = "Revenue"
-        series.values = [10.0, 20.0, 30.0]
+        series._element = _ser([10.0, 20.0, 30.0])
         chart = MagicMock()
         chart.series = [series]
         result = _extract_chart_series(chart)
@@ -193,9 +228,9 @@ class TestExtractChartSeries:
         assert result[0]["data"] == [10.0, 20.0, 30.0]
 
     def test_multiple_series(self):
-        s1 = MagicMock(name="A", values=[1.0, 2.0])
+        s1 = MagicMock(_element=_ser([1.0, 2.0]))
         s1.name = "A"
-        s2 = MagicMock(name="B", values=[3.0, 4.0])
+        s2 = MagicMock(_element=_ser([3.0, 4.0]))
         s2.name = "B"
         chart = MagicMock()
         chart.series = [s1, s2]
@@ -205,7 +240,7 @@ class TestExtractChartSeries:
     def test_none_values_become_zero(self):
         series = MagicMock()
         series.name = "Data"
-        series.values = [1.0, None, 3.0]
+        series._element = _ser([1.0, None, 3.0])
         chart = MagicMock()
         chart.series = [series]
         result = _extract_chart_series(chart)
@@ -214,7 +249,7 @@ class TestExtractChartSeries:
     def test_unnamed_series(self):
         series = MagicMock()
         series.name = None
-        series.values = [1.0]
+        series._element = _ser([1.0])
         chart = MagicMock()
         chart.series = [series]
         result = _extract_chart_series(chart)
@@ -225,6 +260,24 @@ class TestExtractChartSeries:
         chart.series = []
         assert _extract_chart_series(chart) == []
 
+    def test_long_series_read_in_linear_time(self):
+        count = 10_000
+        data = CategoryChartData()
+        data.categories = [str(i) for i in range(count)]
+        data.add_series("Signal", [None if i % 5 == 0 else float(i % 7) for i in range(count)])
+        prs = pptx.Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        chart = slide.shapes.add_chart(
+            XL_CHART_TYPE.LINE, 0, 0, Inches(4), Inches(3), data
+        ).chart
+
+        start = time.perf_counter()
+        result = _extract_chart_series(chart)
+        # python-pptx's per-point lookups take about a minute at this size
+        assert time.perf_counter() - start < 2
+        assert result[0]["data"][:6] == [0, 1.0, 2.0, 3.0, 4.0, 0]
+        assert len(result[0]["data"]) == count
+
 
 # --- _extract_chart ---
 
@@ -238,7 +291,7 @@ class TestExtractChart:
     def test_valid_chart(self):
         series = MagicMock()
         series.name = "Sales"
-        series.values = [10.0, 20.0]
+        series._element = _ser([10.0, 20.0])
         chart = MagicMock()
         chart.chart_type = XL_CHART_TYPE.COLUMN_CLUSTERED
         chart.has_title = True
@@ -260,10 +313,29 @@ class TestExtractChart:
         assert result["is_stacked"] is False
         assert result["is_horizontal"] is False
 
+    def test_long_line_series_downsampled(self):
+        series = MagicMock()
+        series.name = "Signal"
+        series._element = _ser([float(i % 10) for i in range(3000)])
+        chart = MagicMock()
+        chart.chart_type = XL_CHART_TYPE.LINE
+        chart.has_title = False
+        chart.plots.__getitem__(0).categories = [str(i) for i in range(3000)]
+        chart.series = [series]
+
+        shape = MagicMock()
+        shape.has_chart = True
+        shape.chart = chart
+
+        result = _extract_chart(shape, 0, 0, max_points=300)
+        assert result["point_count"] == 3000
+        assert len(result["series"][0]["data"]) == 300
+        assert len(result["categories"]) == 300
+
     def test_stacked_bar(self):
         series = MagicMock()
         series.name = "Data"
-        series.values = [1.0]
+        series._element = _ser([1.0])
         chart = MagicMock()
         chart.chart_type = XL_CHART_TYPE.BAR_STACKED
         chart.has_title = False
@@ -282,7 +354,7 @@ class TestExtractChart:
     def test_area_chart(self):
         series = MagicMock()
         series.name = "Data"
-        series.values = [1.0]
+        series._element = _ser([1.0])
         chart = MagicMock()
         chart.chart_type = XL_CHART_TYPE.AREA
         chart.has_title = False
@@ -347,7 +419,12 @@ class TestPptToYaml:
                 shape.has_chart = shape_cfg.get("has_chart", False)
 
                 # Image - remove 'image' attribute if not an image shape
-                if not shape_cfg.get("has_image", False):
+                if shape_cfg.get("has_image", False):
+                    shape.image.blob = shape_cfg.get("blob", b"image bytes")
+                    shape.image.ext = shape_cfg.get("ext", "png")
+                    shape.width = shape_cfg.get("width", 0)
+                    shape.crop_left = shape.crop_right = 0.0
+                else:
                     del shape.image
 
                 # Highlight
@@ -454,6 +531,110 @@ class TestPptToYaml:
         assert data["slides"][0]["title"] == "Title 1"
         assert data["slides"][1]["title"] == "Title 2"
 
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_media_order_preserved(self, mock_prs_cls, mock_web, tmp_path):
+        mock_prs_cls.return_value = self._make_presentation(
+            [
+                {
+                    "shapes": [
+                        {"text": "Title"},
+                        {"has_image": True, "blob": b"first"},
+                        {"has_image": True, "blob": b"second"},
+                    ]
+                },
+            ]
+        )
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 10, 10
+        )
+
+        pptx_path = tmp_path / "images.pptx"
+        pptx_path.touch()
+        yaml_path = ppt_to_yaml(str(pptx_path), str(tmp_path / "output"))
+
+        import yaml
+
+        with open(yaml_path) as f:
+            data = yaml.safe_load(f)
+
+        media = data["slides"][0]["media"]
+        assert [m["path"] for m in media] == [
+            "media/slide_0_shape_1.png",
+            "media/slide_0_shape_2.png",
+        ]
+        assert media[0]["type"] == "image"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", return_value=None)
+    @patch("ppt_to_web.ppt_to_yaml._finish_media", return_value=None)
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_slide_with_only_failed_media_dropped(
+        self, mock_prs_cls, mock_finish, mock_web, tmp_path
+    ):
+        mock_prs_cls.return_value = self._make_presentation(
+            [{"shapes": [{"has_image": True}]}, {"shapes": [{"text": "Kept"}]}]
+        )
+
+        pptx_path = tmp_path / "failed.pptx"
+        pptx_path.touch()
+        yaml_path = ppt_to_yaml(str(pptx_path), str(tmp_path / "output"))
+
+        import yaml
+
+        with open(yaml_path) as f:
+            data = yaml.safe_load(f)
+
+        assert data["total_slides"] == 1
+        assert data["slides"][0]["title"] == "Kept"
+
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_extract_deck_returns_data_without_writing(self, mock_prs_cls, tmp_path):
+        mock_prs_cls.return_value = self._make_presentation(
+            [{"shapes": [{"text": "Title"}]}]
+        )
+
+        data = extract_deck(str(tmp_path / "deck.pptx"), str(tmp_path / "output"))
+
+        assert data["slides"][0]["title"] == "Title"
+        assert [p.name for p in (tmp_path / "output").iterdir()] == ["media"]
+
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_json_output_format(self, mock_prs_cls, tmp_path):
+        mock_prs_cls.return_value = self._make_presentation(
+            [{"shapes": [{"text": "Title"}]}]
+        )
+
+        pptx_path = tmp_path / "deck.pptx"
+        pptx_path.touch()
+        json_path = ppt_to_yaml(str(pptx_path), str(tmp_path / "output"), output_format="json")
+
+        import json
+
+        assert json_path.endswith("deck.json")
+        with open(json_path) as f:
+            assert json.load(f)["slides"][0]["title"] == "Title"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image", return_value=None)
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_profiler_records_stages_and_counters(self, mock_prs_cls, mock_web, tmp_path):
+        mock_prs_cls.return_value = self._make_presentation(
+            [
+                {"shapes": [{"text": "Title"}, {"has_image": True, "blob": b"a"}]},
+                {"shapes": [{"text": "Two"}, {"has_image": True, "blob": b"a"}]},
+            ]
+        )
+        profiler = Profiler()
+
+        ppt_to_yaml(str(tmp_path / "deck.pptx"), str(tmp_path / "output"), profiler=profiler)
+
+        assert {"parse", "extract", "extract.text", "media", "media.wand", "dump"} <= set(
+            profiler.stages
+        )
+        assert set(profiler.slides) == {1, 2}
+        assert profiler.counters["images"] == 2
+        assert profiler.counters["duplicate_images"] == 1
+        assert profiler.counters["cache_misses"] == 1
+
     @patch("ppt_to_web.ppt_to_yaml.Presentation")
     def test_creates_media_directory(self, mock_prs_cls, tmp_path):
         mock_prs_cls.return_value = self._make_presentation(
@@ -488,3 +669,439 @@ class TestPptToYaml:
         expected_keys = {"title", "cover_title", "hero_image", "slides", "highlighted_sections", "total_slides"}
         assert set(data.keys()) == expected_keys
         assert data["hero_image"] is None
+
+
+# --- _convert_vector_media ---
+
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_iter_slides_yields_as_extracted(self, mock_prs_cls, mock_web, tmp_path):
+        mock_prs_cls.return_value = self._make_presentation(
+            [
+                {"shapes": [{"text": "One"}, {"has_image": True, "blob": b"logo"}]},
+                {"shapes": []},
+                {"shapes": [{"text": "Two"}, {"has_image": True, "blob": b"logo"}]},
+            ]
+        )
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 10, 10
+        )
+
+        slides = iter_slides(str(tmp_path / "deck.pptx"), str(tmp_path / "output"))
+        first = next(slides)
+        assert first["title"] == "One"
+        assert mock_web.call_count == 1
+
+        rest = list(slides)
+        assert [slide["title"] for slide in rest] == ["Two"]
+        # The logo repeated on a later slide reuses the first slide's file
+        assert mock_web.call_count == 1
+        assert rest[0]["media"][0]["path"] == "media/slide_0_shape_1.png"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    @patch("ppt_to_web.ppt_to_yaml.ProcessPoolExecutor")
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_iter_slides_processes_media_by_window(
+        self, mock_prs_cls, mock_pool_cls, mock_web, tmp_path
+    ):
+        mock_prs_cls.return_value = self._make_presentation(
+            [
+                {
+                    "shapes": [
+                        {"text": f"Slide {i}"},
+                        {"has_image": True, "blob": f"photo {i}".encode()},
+                        {"has_image": True, "blob": f"art {i}".encode(), "ext": "emf"},
+                    ]
+                }
+                for i in range(5)
+            ]
+        )
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 10, 10
+        )
+        mock_pool_cls.return_value.__enter__.return_value.map.side_effect = map
+        converter = MagicMock()
+        converter.convert.side_effect = lambda paths, output_dir, budget=None: {p: None for p in paths}
+        cache = MediaCache(tmp_path / "cache")
+
+        with patch.object(cache, "save") as save:
+            slides = list(
+                iter_slides(
+                    str(tmp_path / "deck.pptx"),
+                    str(tmp_path / "output"),
+                    converter=converter,
+                    jobs=2,
+                    cache=cache,
+                    window=2,
+                )
+            )
+
+        assert [slide["title"] for slide in slides] == [f"Slide {i}" for i in range(5)]
+        # One pool for the deck, one LibreOffice batch per window, one cache save
+        mock_pool_cls.assert_called_once_with(max_workers=2)
+        assert [len(call.args[0]) for call in converter.convert.call_args_list] == [2, 2, 1]
+        save.assert_called_once()
+
+    @pytest.mark.parametrize("output_format", ["yaml", "json"])
+    @patch("ppt_to_web.ppt_to_yaml.Presentation")
+    def test_stream_matches_whole_deck(self, mock_prs_cls, output_format, tmp_path):
+        config = [
+            {"shapes": [{"text": "Title"}, {"text": "Body"}]},
+            {"shapes": [{"text": "Important", "highlighted": True}]},
+        ]
+        mock_prs_cls.return_value = self._make_presentation(config)
+        pptx_path = tmp_path / "deck.pptx"
+        whole = ppt_to_yaml(str(pptx_path), str(tmp_path / "whole"), output_format=output_format)
+
+        mock_prs_cls.return_value = self._make_presentation(config)
+        streamed = ppt_to_yaml(
+            str(pptx_path), str(tmp_path / "stream"), output_format=output_format, stream=True
+        )
+
+        assert streamed.endswith(".jsonl" if output_format == "json" else ".yaml")
+        assert load_deck(Path(streamed)) == load_deck(Path(whole))
+
+    def test_stream_rejects_incremental(self, tmp_path):
+        with pytest.raises(ValueError):
+            ppt_to_yaml(
+                str(tmp_path / "deck.pptx"), str(tmp_path), incremental=True, stream=True
+            )
+
+
+def _staged(path):
+    return {**_make_media_result(path), _NEEDS_CONVERSION: True}
+
+
+class TestConvertVectorMedia:
+    def test_converts_vector_sources_in_one_batch(self, tmp_path):
+        (tmp_path / "slide_0_shape_1.emf").write_bytes(b"emf")
+        (tmp_path / "slide_1_shape_0.wmf").write_bytes(b"wmf")
+        results = [
+            _staged("media/slide_0_shape_1.emf"),
+            _staged("media/slide_1_shape_0.wmf"),
+        ]
+        converter = MagicMock()
+
+        def convert(paths, output_dir, budget=None):
+            converted = {}
+            for path in paths:
+                png_path = output_dir / f"{path.stem}.png"
+                png_path.write_bytes(b"png")
+                converted[path] = png_path
+            return converted
+
+        converter.convert.side_effect = convert
+        with patch(
+            "ppt_to_web.ppt_to_yaml._get_image_dimensions", return_value=(40, 20, 2.0)
+        ):
+            _convert_vector_media(results, tmp_path, converter)
+
+        converter.convert.assert_called_once()
+        assert results[0]["path"] == "media/slide_0_shape_1.png"
+        assert results[0]["aspect_ratio"] == 2.0
+        assert results[1]["path"] == "media/slide_1_shape_0.png"
+        assert not (tmp_path / "slide_0_shape_1.emf").exists()
+
+    def test_dimensions_read_from_png_header(self, tmp_path):
+        (tmp_path / "slide_0_shape_0.emf").write_bytes(b"emf")
+        results = [_staged("media/slide_0_shape_0.emf")]
+        converter = MagicMock()
+
+        def convert(paths, output_dir, budget=None):
+            png_path = output_dir / "slide_0_shape_0.png"
+            png_path.write_bytes(
+                b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 400, 200)
+            )
+            return {paths[0]: png_path}
+
+        converter.convert.side_effect = convert
+        _convert_vector_media(results, tmp_path, converter)
+        assert (results[0]["width"], results[0]["height"]) == (400, 200)
+        assert results[0]["aspect_ratio"] == 2.0
+
+    def test_failed_conversion_keeps_source(self, tmp_path):
+        (tmp_path / "slide_0_shape_0.emf").write_bytes(b"emf")
+        results = [_staged("media/slide_0_shape_0.emf")]
+        converter = MagicMock()
+        converter.convert.return_value = {tmp_path / "slide_0_shape_0.emf": None}
+
+        _convert_vector_media(results, tmp_path, converter)
+
+        assert results[0]["path"] == "media/slide_0_shape_0.emf"
+        assert (tmp_path / "slide_0_shape_0.emf").exists()
+
+    def test_no_vector_media_skips_converter(self, tmp_path):
+        results = [_make_media_result("media/slide_0_shape_0.png")]
+        converter = MagicMock()
+
+        _convert_vector_media(results, tmp_path, converter)
+
+        converter.convert.assert_not_called()
+
+
+# --- _map_jobs / _process_media ---
+
+
+class TestDisplayExtent:
+    def test_width_and_crop(self):
+        shape = MagicMock(width=914400, crop_left=0.25, crop_right=0.25)
+        assert _display_extent(shape) == (914400, 0.5)
+
+    def test_without_extent(self):
+        assert _display_extent(object()) == (0, 1.0)
+
+
+class TestMapJobs:
+    def test_inline_when_single_job(self):
+        assert _map_jobs(pow, [(2, 3), (3, 2)], 1) == [8, 9]
+
+    def test_process_pool_keeps_order(self):
+        assert _map_jobs(pow, [(2, i) for i in range(6)], 3) == [1, 2, 4, 8, 16, 32]
+
+
+class TestProcessMedia:
+    def _task(self, shape_idx, ext="png", blob=None):
+        blob = blob if blob is not None else f"blob {shape_idx}".encode()
+        return _MediaTask(0, shape_idx, blob, ext, {"type": "image"})
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_fills_placeholders(self, mock_web, tmp_path):
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 4, 2
+        )
+        tasks = [self._task(0), self._task(1, "jpg")]
+
+        assert _process_media(tasks, tmp_path) == []
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.png"
+        assert tasks[1].item["path"] == "media/slide_0_shape_1.png"
+        assert tasks[1].item["type"] == "image"
+
+    def test_vector_images_batched_through_converter(self, tmp_path):
+        tasks = [self._task(0, "emf"), self._task(1, "wmf")]
+        converter = MagicMock()
+        converter.convert.side_effect = lambda paths, output_dir, budget=None: {p: None for p in paths}
+
+        assert _process_media(tasks, tmp_path, converter=converter) == []
+        converter.convert.assert_called_once()
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.emf"
+        assert (tmp_path / "slide_0_shape_0.emf").read_bytes() == b"blob 0"
+
+    def test_non_web_raster_converted_by_libreoffice(self, tmp_path):
+        tasks = [self._task(0, "tiff"), self._task(1, "bmp")]
+        converter = MagicMock()
+
+        def convert(paths, output_dir, budget=None):
+            png_path = output_dir / f"{paths[0].stem}.png"
+            png_path.write_bytes(
+                b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 300, 100)
+            )
+            return {paths[0]: png_path, paths[1]: None}
+
+        converter.convert.side_effect = convert
+
+        assert _process_media(tasks, tmp_path, converter=converter) == []
+        sources = converter.convert.call_args.args[0]
+        assert [p.name for p in sources] == ["slide_0_shape_0.tiff", "slide_0_shape_1.bmp"]
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.png"
+        assert (tasks[0].item["width"], tasks[0].item["height"]) == (300, 100)
+        assert not (tmp_path / "slide_0_shape_0.tiff").exists()
+        # A failed conversion keeps the source, without the staging flag
+        assert tasks[1].item["path"] == "media/slide_0_shape_1.bmp"
+        assert _NEEDS_CONVERSION not in tasks[1].item
+
+    def test_translatable_metafile_written_as_svg(self, tmp_path):
+        emf = (Path(pptx.__file__).parent / "templates" / "docx-icon.emf").read_bytes()
+        tasks = [self._task(0, "wmf", blob=emf), self._task(1, "emf")]
+        converter = MagicMock()
+        converter.convert.side_effect = lambda paths, output_dir, budget=None: {p: None for p in paths}
+
+        assert _process_media(tasks, tmp_path, converter=converter) == []
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.svg"
+        assert (tasks[0].item["width"], tasks[0].item["height"]) == (100, 62)
+        assert (tmp_path / "slide_0_shape_0.svg").read_text().startswith("<svg")
+        (sources, _), _ = converter.convert.call_args
+        assert sources == [tmp_path / "slide_0_shape_1.emf"]
+
+    @patch("ppt_to_web.ppt_to_yaml.map_with_deadlines")
+    def test_timed_out_image_written_unchanged(self, mock_map, tmp_path):
+        mock_map.side_effect = lambda func, arg_lists, jobs, budget: [TIMED_OUT] * len(arg_lists)
+        tasks = [self._task(0, "jpg"), self._task(1, "jpg", blob=b"blob 0")]
+        budget = DeckBudget(item_seconds=5)
+        cache = MediaCache(tmp_path / "cache")
+
+        assert _process_media(tasks, tmp_path, cache=cache, budget=budget) == []
+        assert tasks[0].item["path"] == tasks[1].item["path"] == "media/slide_0_shape_0.jpg"
+        assert (tmp_path / "slide_0_shape_0.jpg").read_bytes() == b"blob 0"
+        assert tasks[1].item["degraded"] == {
+            "stage": "image",
+            "reason": "item deadline",
+            "fallback": "original",
+        }
+        assert [entry["slide"] for entry in budget.degradations] == [1]
+        assert not list((tmp_path / "cache").glob("*.jpg"))
+
+    def test_vector_out_of_time_gets_placeholder(self, tmp_path):
+        emf = (Path(pptx.__file__).parent / "templates" / "generic-icon.emf").read_bytes()
+        tasks = [self._task(0, "emf", blob=emf), self._task(1, "wmf")]
+        budget = DeckBudget(item_seconds=5)
+
+        def convert(paths, output_dir, budget=None):
+            budget.record_timeout(paths[:1])
+            return {p: None for p in paths}
+
+        converter = MagicMock()
+        converter.convert.side_effect = convert
+
+        assert _process_media(tasks, tmp_path, converter=converter, budget=budget) == []
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.svg"
+        assert (tasks[0].item["width"], tasks[0].item["height"]) == (104, 67)
+        assert tasks[0].item["degraded"]["fallback"] == "placeholder"
+        assert not (tmp_path / "slide_0_shape_0.emf").exists()
+        # A conversion that failed without running out of time is left as it was
+        assert tasks[1].item["path"] == "media/slide_0_shape_1.wmf"
+        assert "degraded" not in tasks[1].item
+        assert len(budget.degradations) == 1
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_duplicates_processed_once(self, mock_web, tmp_path):
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 4, 2
+        )
+        tasks = [self._task(i, blob=b"logo") for i in range(3)]
+
+        _process_media(tasks, tmp_path)
+
+        mock_web.assert_called_once()
+        assert {t.item["path"] for t in tasks} == {"media/slide_0_shape_0.png"}
+        assert len({id(t.item) for t in tasks}) == 3
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_persistent_cache_reused_across_runs(self, mock_web, tmp_path):
+        def process(blob, path, *args):
+            path.write_bytes(b"processed")
+            return _make_media_result(f"media/{path.name}", 4, 2)
+
+        mock_web.side_effect = process
+        cache_dir = tmp_path / "cache"
+        first_media = tmp_path / "first"
+        first_media.mkdir()
+        _process_media([self._task(0)], first_media, cache=MediaCache(cache_dir))
+
+        second_media = tmp_path / "second"
+        second_media.mkdir()
+        task = self._task(5, blob=b"blob 0")
+        _process_media([task], second_media, cache=MediaCache(cache_dir))
+
+        mock_web.assert_called_once()
+        assert task.item["path"] == "media/slide_0_shape_5.png"
+        assert task.item["width"] == 4
+        assert (second_media / "slide_0_shape_5.png").read_bytes() == b"processed"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_raw_fallback_not_cached(self, mock_web, tmp_path):
+        cache_dir = tmp_path / "cache"
+        mock_web.return_value = None  # Wand unavailable or failing
+        first_media = tmp_path / "first"
+        first_media.mkdir()
+        task = self._task(0)
+        _process_media([task], first_media, cache=MediaCache(cache_dir))
+        assert (first_media / "slide_0_shape_0.png").read_bytes() == b"blob 0"
+
+        def process(blob, path, *args):
+            path.write_bytes(b"processed")
+            return _make_media_result(f"media/{path.name}", 4, 2)
+
+        mock_web.side_effect = process
+        second_media = tmp_path / "second"
+        second_media.mkdir()
+        task = self._task(0)
+        _process_media([task], second_media, cache=MediaCache(cache_dir))
+
+        assert mock_web.call_count == 2
+        assert task.item["width"] == 4
+        assert (second_media / "slide_0_shape_0.png").read_bytes() == b"processed"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_cached_variants_restored(self, mock_web, tmp_path):
+        def process(blob, path, *args):
+            path.write_bytes(b"png")
+            path.with_name(f"{path.stem}_480w.webp").write_bytes(b"webp")
+            result = _make_media_result(f"media/{path.name}", 800, 400)
+            result["variants"] = [
+                {"path": f"media/{path.name}", "width": 800, "type": "image/png"},
+                {"path": f"media/{path.stem}_480w.webp", "width": 480, "type": "image/webp"},
+            ]
+            return result
+
+        mock_web.side_effect = process
+        cache_dir = tmp_path / "cache"
+        first_media = tmp_path / "first"
+        first_media.mkdir()
+        _process_media([self._task(0)], first_media, cache=MediaCache(cache_dir))
+
+        second_media = tmp_path / "second"
+        second_media.mkdir()
+        task = self._task(3, blob=b"blob 0")
+        _process_media([task], second_media, cache=MediaCache(cache_dir))
+
+        mock_web.assert_called_once()
+        assert [v["path"] for v in task.item["variants"]] == [
+            "media/slide_0_shape_3.png",
+            "media/slide_0_shape_3_480w.webp",
+        ]
+        assert (second_media / "slide_0_shape_3_480w.webp").read_bytes() == b"webp"
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_resampled_to_display_size(self, mock_web, tmp_path):
+        mock_web.side_effect = lambda blob, path, *args: _make_media_result(
+            f"media/{path.name}", 4, 2
+        )
+        small = _MediaTask(0, 0, b"photo", "jpg", {"type": "image"}, 914400, 1.0)
+        large = _MediaTask(0, 1, b"photo", "jpg", {"type": "image"}, 4 * 914400, 1.0)
+
+        _process_media([small, large], tmp_path)
+
+        # One picture shown at two sizes is resampled once per size
+        assert sorted(call.args[4] for call in mock_web.call_args_list) == [192, 768]
+        assert small.item["path"] != large.item["path"]
+
+    @patch("ppt_to_web.ppt_to_yaml._process_web_image")
+    def test_reports_bytes_saved(self, mock_web, tmp_path, capsys):
+        def process(blob, path, *args):
+            path = path.with_suffix(".jpg")
+            path.write_bytes(b"j" * 100)
+            return _make_media_result(f"media/{path.name}", 4, 2)
+
+        mock_web.side_effect = process
+        profiler = Profiler()
+        tasks = [self._task(0, "jpg", blob=b"x" * 1000), self._task(1, "jpg", blob=b"x" * 1000)]
+
+        _process_media(tasks, tmp_path, profiler=profiler)
+
+        assert tasks[0].item["path"] == "media/slide_0_shape_0.jpg"
+        assert profiler.counters["image_bytes_in"] == 1000
+        assert profiler.counters["image_bytes_out"] == 100
+        assert "1000 B embedded, 100 B written (900 B saved)" in capsys.readouterr().out
+
+    def test_unconverted_vector_not_cached(self, tmp_path):
+        cache = MediaCache(tmp_path / "cache")
+        converter = MagicMock()
+        converter.convert.side_effect = lambda paths, output_dir, budget=None: {p: None for p in paths}
+
+        _process_media([self._task(0, "emf")], tmp_path, converter=converter, cache=cache)
+
+        assert cache.get(cache.key(b"blob 0", "emf", "width=None", *_media_params(ImageOptions()))) is None
+
+    def test_parallel_jobs_deterministic(self, tmp_path):
+        # Wand fails on these fake blobs in the workers, so every image falls
+        # back to being staged under its own deterministic name.
+        tasks = [self._task(i) for i in range(4)]
+        converter = MagicMock()
+        converter.convert.side_effect = lambda paths, output_dir, budget=None: {p: None for p in paths}
+
+        _process_media(tasks, tmp_path, jobs=2, converter=converter)
+
+        assert [t.item["path"] for t in tasks] == [
+            f"media/slide_0_shape_{i}.png" for i in range(4)
+        ]
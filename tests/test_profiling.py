@@ -0,0 +1,83 @@
+"""Tests for profiling module."""
+
+import json
+import pstats
+
+import pytest
+
+from ppt_to_web.profiling import Profiler, profile_run
+
+
+class TestProfiler:
+    def test_stage_accumulates(self):
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.stage("extract.text"):
+                pass
+        assert profiler.stages["extract.text"]["calls"] == 3
+        assert profiler.stages["extract.text"]["seconds"] >= 0
+
+    def test_stage_recorded_on_error(self):
+        profiler = Profiler()
+        with pytest.raises(ValueError):
+            with profiler.stage("render"):
+                raise ValueError("boom")
+        assert profiler.stages["render"]["calls"] == 1
+
+    def test_slide_and_counters(self):
+        profiler = Profiler()
+        with profiler.slide(2):
+            profiler.count("images", 3)
+        profiler.count("images")
+        report = profiler.to_dict()
+        assert list(report["slides"]) == ["2"]
+        assert report["counters"] == {"images": 4}
+
+    def test_report_shape(self, tmp_path):
+        profiler = Profiler()
+        with profiler.stage("parse"):
+            pass
+        profiler.write(tmp_path / "profile.json")
+
+        report = json.loads((tmp_path / "profile.json").read_text())
+        assert set(report) == {
+            "total_seconds",
+            "stages",
+            "slides",
+            "counters",
+            "peak_rss_mb",
+            "peak_children_rss_mb",
+        }
+        assert report["peak_rss_mb"] is None or report["peak_rss_mb"] > 0
+
+
+    def test_merge_keeps_slides_per_deck(self):
+        profiler = Profiler()
+        for deck in ("b.pptx", "a.pptx"):
+            deck_profiler = Profiler()
+            with deck_profiler.stage("extract"), deck_profiler.slide(1):
+                pass
+            deck_profiler.count("slides")
+            profiler.merge(deck_profiler, deck)
+
+        report = profiler.to_dict()
+        assert report["stages"]["extract"]["calls"] == 2
+        assert report["counters"] == {"slides": 2}
+        assert report["slides"] == {}
+        assert list(report["decks"]) == ["a.pptx", "b.pptx"]
+        assert list(report["decks"]["a.pptx"]["slides"]) == ["1"]
+
+
+class TestProfileRun:
+    def test_disabled_yields_none(self, tmp_path):
+        with profile_run() as profiler:
+            assert profiler is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_writes_requested_reports(self, tmp_path):
+        with profile_run(tmp_path / "profile.json", tmp_path / "run.prof") as profiler:
+            with profiler.stage("render"):
+                sum(range(1000))
+
+        assert "render" in json.loads((tmp_path / "profile.json").read_text())["stages"]
+        assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
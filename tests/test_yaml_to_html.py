@@ -1,8 +1,20 @@
 """Tests for yaml_to_html module."""
 
+import json
+import os
+import re
+from unittest.mock import patch
+
+import pytest
 import yaml
 
-from ppt_to_web.yaml_to_html import _create_html_env, yaml_to_html
+from ppt_to_web.yaml_to_html import (
+    _create_html_env,
+    get_html_env,
+    precompile_templates,
+    render_deck,
+    yaml_to_html,
+)
 
 
 class TestCreateHtmlEnv:
@@ -29,6 +41,38 @@ class TestCreateHtmlEnv:
         assert template is not None
 
 
+class TestGetHtmlEnv:
+    def test_reused_across_calls(self):
+        assert get_html_env() is get_html_env()
+
+    def test_bytecode_cache_under_cache_dir(self, isolated_cache_dir):
+        env = get_html_env()
+        assert env.bytecode_cache is not None
+        env.get_template("index.html")
+        assert list((isolated_cache_dir / "jinja").iterdir())
+
+    def test_unwritable_cache_dir_disables_bytecode_cache(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        env = _create_html_env(blocker / "jinja")
+        assert env.bytecode_cache is None
+        assert env.get_template("index.html") is not None
+
+
+class TestPrecompileTemplates:
+    def test_compiles_shipped_templates(self, isolated_cache_dir):
+        names = precompile_templates()
+        assert names == ["_picture.html", "cover_story.html", "index.html"]
+        assert len(list((isolated_cache_dir / "jinja").iterdir())) == 3
+
+    def test_fresh_environment_loads_from_bytecode(self, isolated_cache_dir):
+        precompile_templates()
+        env = _create_html_env(isolated_cache_dir / "jinja")
+        with patch.object(env, "compile", wraps=env.compile) as compile_:
+            env.get_template("cover_story.html")
+        compile_.assert_not_called()
+
+
 class TestYamlToHtml:
     def _make_yaml(self, tmp_path, data):
         tmp_path.mkdir(parents=True, exist_ok=True)
@@ -88,6 +132,9 @@ class TestYamlToHtml:
 
     def test_copies_media_directory(self, tmp_path):
         data = self._sample_data()
+        data["slides"][0]["media"] = [
+            {"type": "image", "path": "media/test_image.png", "aspect_ratio": 1.0}
+        ]
         yaml_dir = tmp_path / "yaml_dir"
         yaml_path = self._make_yaml(yaml_dir, data)
 
@@ -101,6 +148,60 @@ class TestYamlToHtml:
 
         assert (output_dir / "media" / "test_image.png").exists()
 
+    def test_skips_unreferenced_media(self, tmp_path):
+        data = self._sample_data()
+        yaml_dir = tmp_path / "yaml_dir"
+        yaml_path = self._make_yaml(yaml_dir, data)
+        media_dir = yaml_dir / "media"
+        media_dir.mkdir()
+        (media_dir / "stale.png").write_bytes(b"old")
+
+        output_dir = tmp_path / "html_output"
+        yaml_to_html(yaml_path, str(output_dir))
+
+        assert not (output_dir / "media" / "stale.png").exists()
+
+    def test_copies_image_variants(self, tmp_path):
+        data = self._sample_data()
+        data["slides"][0]["media"] = [
+            {
+                "type": "image",
+                "path": "media/a.png",
+                "variants": [{"path": "media/a.webp", "width": 10, "type": "image/webp"}],
+            }
+        ]
+        yaml_dir = tmp_path / "yaml_dir"
+        yaml_path = self._make_yaml(yaml_dir, data)
+        (yaml_dir / "media").mkdir()
+        (yaml_dir / "media" / "a.png").write_bytes(b"png")
+        (yaml_dir / "media" / "a.webp").write_bytes(b"webp")
+
+        output_dir = tmp_path / "html_output"
+        yaml_to_html(yaml_path, str(output_dir))
+
+        assert (output_dir / "media" / "a.webp").read_bytes() == b"webp"
+
+    def test_uses_given_environment(self, tmp_path):
+        data = self._sample_data()
+        yaml_path = self._make_yaml(tmp_path / "yaml_dir", data)
+        env = _create_html_env()
+        env.globals["unused_marker"] = True
+
+        with patch("ppt_to_web.yaml_to_html.get_html_env") as create:
+            html_path = yaml_to_html(yaml_path, str(tmp_path / "html_output"), env=env)
+
+        create.assert_not_called()
+        assert html_path.endswith(".html")
+
+    def test_json_intermediate_detected(self, tmp_path):
+        data = self._sample_data()
+        json_path = tmp_path / "test.json"
+        json_path.write_text(json.dumps(data), encoding="utf-8")
+
+        html_path = yaml_to_html(str(json_path), str(tmp_path / "html_output"))
+        with open(html_path, encoding="utf-8") as f:
+            assert "Hello World" in f.read()
+
     def test_no_media_dir_ok(self, tmp_path):
         data = self._sample_data()
         yaml_dir = tmp_path / "yaml_dir"
@@ -145,3 +246,203 @@ class TestYamlToHtml:
         with open(html_path, encoding="utf-8") as f:
             content = f.read()
         assert "chart_0_0" in content
+        # Charts start lazily through the shared bootstrap, not one by one
+        assert "IntersectionObserver" in content
+        assert content.count("addEventListener('resize'") == 1
+        assert content.count("<script>") == 2
+
+        payload = content.split('<script type="application/json" id="ppt-web-charts">')[1]
+        options = json.loads(payload.split("</script>")[0])
+        assert options["chart_0_0"]["series"][0]["data"] == [10, 20]
+        assert options["chart_0_0"]["xAxis"]["data"] == ["Q1", "Q2"]
+
+    def test_chart_payload_cannot_close_script(self, tmp_path):
+        data = self._sample_data()
+        data["slides"][0]["media"] = [
+            {
+                "type": "chart",
+                "chart_type": "pie",
+                "title": "",
+                "categories": ["</script><b>"],
+                "series": [{"name": "S", "data": [1]}],
+                "chart_id": "chart_0_0",
+            }
+        ]
+        html_path = render_deck(data, None, str(tmp_path), "cover_story.html")
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        assert "</script><b>" not in content
+        assert "\\u003c/script\\u003e\\u003cb\\u003e" in content
+
+
+class TestRenderDeck:
+    def test_renders_in_memory_data(self, tmp_path):
+        data = TestYamlToHtml()._sample_data()
+        html_path = render_deck(data, None, str(tmp_path), "cover_story.html")
+        with open(html_path, encoding="utf-8") as f:
+            assert "Hello World" in f.read()
+        assert not (tmp_path / "media").exists()
+
+    @pytest.mark.parametrize("template_name", ["index.html", "cover_story.html"])
+    def test_responsive_picture(self, tmp_path, template_name):
+        data = TestYamlToHtml()._sample_data()
+        data["slides"][0]["media"] = [
+            {
+                "type": "image",
+                "path": "media/a.png",
+                "aspect_ratio": 1.5,
+                "variants": [
+                    {"path": "media/a_480w.png", "width": 480, "type": "image/png"},
+                    {"path": "media/a.png", "width": 1200, "type": "image/png"},
+                    {"path": "media/a_480w.webp", "width": 480, "type": "image/webp"},
+                    {"path": "media/a.webp", "width": 1200, "type": "image/webp"},
+                ],
+            }
+        ]
+        html_path = render_deck(data, None, str(tmp_path), template_name)
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+
+        assert content.startswith("<!DOCTYPE html>")
+        assert '<source type="image/webp" srcset="media/a_480w.webp 480w, media/a.webp 1200w"' in content
+        assert 'srcset="media/a_480w.png 480w, media/a.png 1200w"' in content
+        assert content.count("<picture>") == 1
+
+    def test_plain_img_without_variants(self, tmp_path):
+        data = TestYamlToHtml()._sample_data()
+        data["slides"][0]["media"] = [{"type": "image", "path": "media/a.png"}]
+        html_path = render_deck(data, None, str(tmp_path))
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        assert '<img src="media/a.png" alt="Slide 1" loading="lazy" decoding="async">' in content
+        assert "<picture>" not in content
+
+    def test_image_dimensions_reserved(self, tmp_path):
+        data = TestYamlToHtml()._sample_data()
+        data["slides"][0]["media"] = [
+            {"type": "image", "path": "media/a.png", "width": 640, "height": 480}
+        ]
+        html_path = render_deck(data, None, str(tmp_path), "cover_story.html")
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        assert 'width="640" height="480" loading="lazy" decoding="async"' in content
+
+    def _chart_data(self):
+        data = TestYamlToHtml()._sample_data()
+        data["slides"][0]["media"] = [
+            {
+                "type": "chart",
+                "chart_type": "bar",
+                "title": "",
+                "categories": ["Q1"],
+                "series": [{"name": "S", "data": [1]}],
+                "chart_id": "chart_0_0",
+            }
+        ]
+        return data
+
+    def test_page_without_charts_skips_echarts(self, tmp_path):
+        data = TestYamlToHtml()._sample_data()
+        html_path = render_deck(data, None, str(tmp_path), "cover_story.html")
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        assert "echarts" not in content
+        assert "fonts.googleapis.com" in content
+
+    def test_vendored_echarts(self, tmp_path):
+        bundle = tmp_path / "echarts.min.js"
+        bundle.write_text("var echarts = {};")
+        out = tmp_path / "out"
+        html_path = render_deck(
+            self._chart_data(),
+            None,
+            str(out),
+            "cover_story.html",
+            asset_mode="vendor",
+            echarts_path=str(bundle),
+        )
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        vendored = list((out / "assets").iterdir())
+        assert len(vendored) == 1
+        assert f'<script defer src="assets/{vendored[0].name}"></script>' in content
+        assert "cdn.jsdelivr.net" not in content
+        assert "fonts.googleapis.com" not in content
+
+    @pytest.mark.parametrize("asset_mode", ["vendor", "inline"])
+    def test_template_without_echarts_skips_bundle(self, tmp_path, asset_mode):
+        out = tmp_path / "out"
+        with patch("ppt_to_web.assets.echarts_bundle") as mock_bundle:
+            render_deck(
+                self._chart_data(),
+                None,
+                str(out),
+                "index.html",
+                asset_mode=asset_mode,
+                hash_names=True,
+                precompress=True,
+            )
+        mock_bundle.assert_not_called()
+        assert not (out / "assets").exists()
+        assert json.loads((out / "asset-manifest.json").read_text()) == {}
+
+    def test_inlined_echarts(self, tmp_path):
+        bundle = tmp_path / "echarts.min.js"
+        bundle.write_text("var echarts = {a: 1 < 2};")
+        html_path = render_deck(
+            self._chart_data(),
+            None,
+            str(tmp_path / "out"),
+            "cover_story.html",
+            asset_mode="inline",
+            echarts_path=str(bundle),
+        )
+        with open(html_path, encoding="utf-8") as f:
+            assert "<script>var echarts = {a: 1 < 2};</script>" in f.read()
+
+    def test_hashed_names_and_manifest(self, tmp_path):
+        media_dir = tmp_path / "media"
+        media_dir.mkdir()
+        (media_dir / "a.png").write_bytes(b"image")
+        bundle = tmp_path / "echarts.min.js"
+        bundle.write_text("var echarts = {};")
+        data = self._chart_data()
+        data["slides"][0]["media"].append({"type": "image", "path": "media/a.png"})
+        out = tmp_path / "out"
+
+        html_path = render_deck(
+            data,
+            media_dir,
+            str(out),
+            "cover_story.html",
+            asset_mode="vendor",
+            echarts_path=str(bundle),
+            hash_names=True,
+        )
+        manifest = json.loads((out / "asset-manifest.json").read_text())
+        hashed = manifest["media/a.png"]
+        assert re.fullmatch(r"media/[0-9a-f]{12}\.png", hashed)
+        assert manifest["assets/echarts.min.js"].startswith("assets/echarts.")
+        assert (out / hashed).read_bytes() == b"image"
+        assert not (out / "media" / "a.png").exists()
+        with open(html_path, encoding="utf-8") as f:
+            content = f.read()
+        assert f'src="{hashed}"' in content
+        assert f'src="{manifest["assets/echarts.min.js"]}"' in content
+
+    def test_precompressed_outputs(self, tmp_path):
+        media_dir = tmp_path / "media"
+        media_dir.mkdir()
+        (media_dir / "a.png").write_bytes(b"image" * 100)
+        (media_dir / "b.svg").write_text("<svg>" + "<g/>" * 200 + "</svg>")
+        data = TestYamlToHtml()._sample_data()
+        data["slides"][0]["media"] = [
+            {"type": "image", "path": "media/a.png"},
+            {"type": "image", "path": "media/b.svg"},
+        ]
+        out = tmp_path / "out"
+
+        html_path = render_deck(data, media_dir, str(out), precompress=True)
+        assert (out / "media" / "b.svg.gz").exists()
+        assert not (out / "media" / "a.png.gz").exists()
+        assert os.path.exists(html_path + ".gz")